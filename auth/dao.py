@@ -1,9 +1,64 @@
 """DAO сервиса auth."""
+from typing import Any
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+
 from auth.models import User
 from db.base_dao import BaseDAO
+from db.database import read_session_maker, async_session_maker
 
 
 class UsersDAO(BaseDAO[User]):
     """Класс объекта доступа к БД для пользователя."""
 
     model = User
+
+
+class UserDatabase(SQLAlchemyUserDatabase):
+    """Пользователи FastAPI Users без сессии на время запроса.
+
+    Каждое обращение открывает короткую сессию: поиск пользователя - в пуле только для чтения,
+    изменения - через соединение записи, которое освобождается сразу после коммита. Иначе проверка
+    пользователя держала бы единственное соединение записи до конца запроса, и обработчики
+    с get_session_with_commit ждали бы его до тайм-аута пула.
+    """
+
+    def __init__(self,
+                 user_table: type[User] = User,
+                 read_maker: async_sessionmaker[AsyncSession] = read_session_maker,
+                 write_maker: async_sessionmaker[AsyncSession] = async_session_maker) -> None:
+        """Инициализация без общей сессии."""
+        super().__init__(None, user_table)
+        self.read_maker = read_maker
+        self.write_maker = write_maker
+
+    async def _get_user(self, statement: Select) -> User | None:
+        """Поиск пользователя в сессии только для чтения."""
+        async with self.read_maker() as session:
+            return (await session.execute(statement)).unique().scalar_one_or_none()
+
+    async def _save(self, user: User) -> User:
+        """Запись пользователя и чтение значений по умолчанию БД."""
+        async with self.write_maker() as session:
+            session.add(user)
+            await session.commit()
+            await session.refresh(user)
+        return user
+
+    async def create(self, create_dict: dict[str, Any]) -> User:
+        """Создание пользователя."""
+        return await self._save(self.user_table(**create_dict))
+
+    async def update(self, user: User, update_dict: dict[str, Any]) -> User:
+        """Изменение пользователя."""
+        for key, value in update_dict.items():
+            setattr(user, key, value)
+        return await self._save(user)
+
+    async def delete(self, user: User) -> None:
+        """Удаление пользователя."""
+        async with self.write_maker() as session:
+            await session.delete(user)
+            await session.commit()
@@ -92,6 +92,13 @@ current_active_user = fastapi_users.current_user(active=True)
 current_super_user = fastapi_users.current_user(active=True, superuser=True)
 
 
+async def get_admin_user(current_user: User = Depends(current_active_user)) -> User:
+    """Проверяем права пользователя как администратора."""
+    if current_user.role == UserRole.ADMIN:
+        return current_user
+    raise ForbiddenException
+
+
 async def get_techman_user(current_user: User = Depends(current_active_user)) -> User:
     """Проверяем права пользователя как технолога."""
     allowed_roles = (UserRole.TECHMAN, UserRole.ADMIN)
@@ -0,0 +1,56 @@
+"""Бенчмарк BaseDAO.bulk_update: UPDATE на каждую запись против executemany по группам полей.
+
+Запуск: python -m benchmarks.bulk_update
+"""
+import time
+import asyncio
+import tempfile
+
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from techman.dao import PartDAO
+from techman.models import Part
+from operator_worker.schemas import SPartDoneByFio
+from benchmarks.plasma_sqlite import create_plasma_db
+
+PARTS = 10_000
+
+
+async def loop_update(session: AsyncSession, records: list[SPartDoneByFio]) -> int:
+    """Прежняя реализация: отдельный UPDATE на каждую запись."""
+    updated_count = 0
+    for record in records:
+        record_dict = record.model_dump()
+        update_data = {k: v for k, v in record_dict.items() if k != "id"}
+        result = await session.execute(update(Part).filter_by(id=record_dict["id"]).values(**update_data))
+        updated_count += result.rowcount
+    return updated_count
+
+
+async def dao_update(session: AsyncSession, records: list[SPartDoneByFio]) -> int:
+    """BaseDAO.bulk_update: executemany по группам обновляемых полей."""
+    return await PartDAO(session).bulk_update(records)
+
+
+async def main() -> None:
+    """Запуск бенчмарка."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine, session_maker = await create_plasma_db(Path(tmp_dir) / "bench.db", programs=1, parts_per_program=PARTS)
+        try:
+            print(f"{'способ':>11} | {'записей':>7} | {'обновлено':>9} | {'мс':>8}")  # noqa T201
+            for label, doer_id, func in (("цикл", 1, loop_update), ("executemany", 2, dao_update)):
+                records = [SPartDoneByFio(id=part_id, done_by_fio_doer_id=doer_id) for part_id in range(1, PARTS + 1)]
+                async with session_maker() as session, session.begin():
+                    started = time.perf_counter()
+                    updated = await func(session, records)
+                    elapsed = time.perf_counter() - started
+                print(f"{label:>11} | {len(records):>7} | {updated:>9} | {elapsed * 1000:>8.1f}")  # noqa T201
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
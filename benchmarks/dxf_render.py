@@ -0,0 +1,84 @@
+"""Бенчмарк пакетной отрисовки DXF чертежей деталей.
+
+Сравнивает последовательную отрисовку в одном процессе с DxfRenderService при разном количестве
+процессов на синтетических чертежах деталей.
+Запуск: python -m benchmarks.dxf_render
+"""
+import os
+import time
+import random
+import asyncio
+import tempfile
+
+from pathlib import Path
+
+import ezdxf
+
+from utils.pics_utils.dxf_render import RenderOptions, DxfRenderService, _init_worker, _render_file
+
+PARTS = 24
+WORKERS = (1, 2, 4)
+
+
+def create_dxf(path: Path, seed: int) -> None:
+    """Синтетический чертёж детали: контур-полилиния, отверстия и дуги."""
+    rnd = random.Random(seed)  # noqa S311
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    width, height = rnd.uniform(200, 2000), rnd.uniform(100, 1000)
+    msp.add_lwpolyline([(0, 0), (width, 0), (width, height), (0, height)], close=True)
+    for _ in range(rnd.randint(10, 200)):
+        msp.add_circle((rnd.uniform(20, width - 20), rnd.uniform(20, height - 20)), rnd.uniform(2, 15))
+    for _ in range(rnd.randint(5, 50)):
+        msp.add_arc((rnd.uniform(0, width), rnd.uniform(0, height)), rnd.uniform(5, 50),
+                    rnd.uniform(0, 360), rnd.uniform(0, 360))
+    doc.saveas(path)
+
+
+def render_sequential(paths: list[Path], output_dir: Path) -> float:
+    """Отрисовка всех чертежей по очереди в текущем процессе."""
+    _init_worker()
+    started = time.perf_counter()
+    for path in paths:
+        _render_file(str(path), str(output_dir / f"{path.stem}.png"), RenderOptions())
+    return time.perf_counter() - started
+
+
+async def render_pool(paths: list[Path], output_dir: Path, workers: int) -> tuple[float, float]:
+    """Отрисовка чертежей пулом процессов: время с пустым кэшем и повторно из кэша."""
+    service = DxfRenderService(workers, output_dir)
+    try:
+        await service.start()
+        started = time.perf_counter()
+        await service.render_many({path.stem: str(path) for path in paths})
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        await service.render_many({path.stem: str(path) for path in paths})
+        cached = time.perf_counter() - started
+    finally:
+        service.shutdown()
+    return elapsed, cached
+
+
+def main() -> None:
+    """Запуск бенчмарка."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        paths = []
+        for index in range(PARTS):
+            path = tmp_dir / f"PART-{index}.dxf"
+            create_dxf(path, index)
+            paths.append(path)
+        print(f"деталей: {PARTS}, процессоров: {os.cpu_count()}")  # noqa T201
+        print(f"{'способ':>14} | {'с':>6} | {'деталей/с':>9} | {'из кэша, с':>10}")  # noqa T201
+        sequential_dir = tmp_dir / "sequential"
+        sequential_dir.mkdir()
+        elapsed = render_sequential(paths, sequential_dir)
+        print(f"{'1 процесс':>14} | {elapsed:>6.2f} | {PARTS / elapsed:>9.1f} | {'-':>10}")  # noqa T201
+        for workers in WORKERS:
+            elapsed, cached = asyncio.run(render_pool(paths, tmp_dir / f"pool-{workers}", workers))
+            print(f"{f'пул x{workers}':>14} | {elapsed:>6.2f} | {PARTS / elapsed:>9.1f} | {cached:>10.3f}")  # noqa T201
+
+
+if __name__ == "__main__":
+    main()
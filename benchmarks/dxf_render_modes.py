@@ -0,0 +1,63 @@
+"""Бенчмарк способов отрисовки DXF чертежей деталей.
+
+Сравнивает время отрисовки и размер файла: PNG matplotlib 300 dpi, SVG бэкендом ezdxf
+и SVG, растеризованный cairosvg (если в системе есть библиотека cairo).
+Запуск: python -m benchmarks.dxf_render_modes
+"""
+import time
+import tempfile
+import statistics
+
+from pathlib import Path
+
+from benchmarks.dxf_render import PARTS, create_dxf
+from utils.pics_utils.dxf_render import RenderMode, RenderOptions, _init_worker, _render_file
+
+
+def cairo_available() -> bool:
+    """Проверка наличия cairosvg и системной библиотеки cairo."""
+    try:
+        import cairosvg  # noqa F401 PLC0415
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def render_mode(paths: list[Path], output_dir: Path, options: RenderOptions) -> tuple[float, list[int]]:
+    """Отрисовка всех чертежей одним способом. Возвращает время и размеры файлов."""
+    started = time.perf_counter()
+    sizes = []
+    for path in paths:
+        output_path = output_dir / f"{path.stem}{options.suffix}"
+        _render_file(str(path), str(output_path), options)
+        sizes.append(output_path.stat().st_size)
+    return time.perf_counter() - started, sizes
+
+
+def main() -> None:
+    """Запуск бенчмарка."""
+    modes = [RenderMode.PNG, RenderMode.SVG]
+    if cairo_available():
+        modes.append(RenderMode.SVG_PNG)
+    else:
+        print("cairosvg недоступен: растеризация SVG пропущена")  # noqa T201
+    _init_worker()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        paths = []
+        for index in range(PARTS):
+            path = tmp_dir / f"PART-{index}.dxf"
+            create_dxf(path, index)
+            paths.append(path)
+        print(f"деталей: {PARTS}")  # noqa T201
+        print(f"{'способ':>8} | {'с':>6} | {'мс/деталь':>9} | {'медиана, КБ':>11} | {'всего, КБ':>9}")  # noqa T201
+        for mode in modes:
+            output_dir = tmp_dir / mode
+            output_dir.mkdir()
+            elapsed, sizes = render_mode(paths, output_dir, RenderOptions(mode=mode))
+            print(f"{mode:>8} | {elapsed:>6.2f} | {elapsed / PARTS * 1000:>9.1f} | "  # noqa T201
+                  f"{statistics.median(sizes) / 1024:>11.1f} | {sum(sizes) / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Бенчмарк формирования xlsx отчёта по деталям.
+
+Сравнивает прежнее формирование (обычная книга openpyxl, даты строками strftime, файл в BytesIO)
+с ExcelWriter (write-only лист, формат колонки, временный файл): время и пик памяти tracemalloc.
+Строки генерируются по одной, поэтому в пик памяти входит только сама книга.
+Запуск: python -m benchmarks.excel_export [строк, по умолчанию 200000]
+"""
+import io
+import sys
+import time
+import datetime
+import tracemalloc
+
+from decimal import Decimal
+from collections.abc import Callable, Iterator
+
+from openpyxl import Workbook
+
+from utils.excel_utils import ExcelWriter, infer_columns
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+CREATED = datetime.datetime(2025, 3, 1, 8, 30)  # noqa DTZ001
+
+
+def parts(count: int) -> Iterator[dict]:
+    """Строки полного отчёта по деталям."""
+    for index in range(count):
+        yield {"id": index, "PartName": f"PART-{index}", "ProgramName": f"P{index // 50}", "WONumber": "Z1",
+               "Material": "GS", "Thickness": 12.0, "QtyInProcess": 4, "qty_fact": 2,
+               "TrueWeight": Decimal("12.345"), "TotalCuttingTime": Decimal("1.25"),
+               "created_at": CREATED + datetime.timedelta(seconds=index), "done_by_fio_doer": "Иванов"}
+
+
+def legacy_excel(rows: Iterator[dict]) -> int:
+    """Прежнее формирование: все ячейки книги в памяти, файл собирается в BytesIO."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Orders"
+    first = next(rows)
+    headers = list(first.keys())
+    ws.append(headers)
+    for row in _chain(first, rows):
+        ws.append([row[key] if not isinstance(row[key], datetime.datetime) else row[key].strftime("%d.%m.%Y")
+                   for key in headers])
+    file_stream = io.BytesIO()
+    wb.save(file_stream)
+    return file_stream.getbuffer().nbytes
+
+
+def writer_excel(rows: Iterator[dict]) -> int:
+    """Формирование ExcelWriter: строки записываются на write-only лист без хранения ячеек."""
+    first = next(rows)
+    writer = ExcelWriter()
+    writer.add_sheet("Orders", infer_columns([first]))
+    writer.append("Orders", _chain(first, rows))
+    with writer.save() as file:
+        file.seek(0, io.SEEK_END)
+        return file.tell()
+
+
+def _chain(first: dict, rows: Iterator[dict]) -> Iterator[dict]:
+    """Первая строка и остальные."""
+    yield first
+    yield from rows
+
+
+def measure(export: Callable[[Iterator[dict]], int]) -> tuple[float, float, int]:
+    """Время, пик памяти в МБ и размер файла."""
+    started = time.perf_counter()
+    size = export(parts(ROWS))
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    export(parts(ROWS))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, size
+
+
+def main() -> None:
+    """Запуск бенчмарка."""
+    print(f"строк: {ROWS}")  # noqa T201
+    print(f"{'способ':>12} | {'с':>7} | {'пик, МБ':>8} | {'файл, МБ':>8}")  # noqa T201
+    for name, export in (("openpyxl", legacy_excel), ("write-only", writer_excel)):
+        elapsed, peak, size = measure(export)
+        print(f"{name:>12} | {elapsed:>7.2f} | {peak:>8.1f} | {size / 1024 / 1024:>8.2f}")  # noqa T201
+
+
+if __name__ == "__main__":
+    main()
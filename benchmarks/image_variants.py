@@ -0,0 +1,60 @@
+"""Бенчмарк сжатых вариантов картинок деталей.
+
+Сравнивает размер исходного BMP с миниатюрой и полноразмерной картинкой WebP и время преобразования
+на синтетических чертежах деталей.
+Запуск: python -m benchmarks.image_variants
+"""
+import time
+import random
+import tempfile
+
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from utils.pics_utils.image_variants import ImageVariant, build_variants
+
+PARTS = 20
+SIZES = ((800, 600), (1600, 1200), (2400, 1600))
+
+
+def create_drawing(path: Path, size: tuple[int, int], seed: int) -> None:
+    """Синтетический чертёж детали: контур, отверстия и размерные линии на белом фоне."""
+    rnd = random.Random(seed)  # noqa S311
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    draw.rectangle((40, 40, width - 40, height - 40), outline="black", width=3)
+    for _ in range(rnd.randint(5, 30)):
+        x, y, radius = rnd.randint(80, width - 80), rnd.randint(80, height - 80), rnd.randint(5, 40)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), outline="black", width=2)
+    for _ in range(rnd.randint(5, 15)):
+        draw.line((rnd.randint(0, width), rnd.randint(0, height), rnd.randint(0, width), rnd.randint(0, height)),
+                  fill="blue", width=1)
+    image.save(path, format="BMP")
+
+
+def main() -> None:
+    """Запуск бенчмарка."""
+    print(f"{'размер':>10} | {'BMP КБ':>8} | {'миниатюра КБ':>12} | {'полная КБ':>9} | {'мс/деталь':>9}")  # noqa T201
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for size in SIZES:
+            source_bytes = thumb_bytes = full_bytes = 0
+            elapsed = 0.0
+            for index in range(PARTS):
+                source_path = tmp_dir / f"PART-{size[0]}-{index}.bmp"
+                create_drawing(source_path, size, index)
+                started = time.perf_counter()
+                paths = build_variants(source_path, tmp_dir, source_path.stem)
+                elapsed += time.perf_counter() - started
+                source_bytes += source_path.stat().st_size
+                thumb_bytes += paths[ImageVariant.THUMB].stat().st_size
+                full_bytes += paths[ImageVariant.FULL].stat().st_size
+            print(f"{size[0]:>4}x{size[1]:<5} | {source_bytes / PARTS / 1024:>8.1f} | "  # noqa T201
+                  f"{thumb_bytes / PARTS / 1024:>12.1f} | {full_bytes / PARTS / 1024:>9.1f} | "
+                  f"{elapsed / PARTS * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Файловая БД PlasmaReport на sqlite для бенчмарков."""
+import datetime
+
+from typing import Any
+from decimal import Decimal
+from pathlib import Path
+from collections.abc import Mapping
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from auth.models import User  # noqa F401 регистрация таблицы users в metadata
+from db.database import Base, set_sqlite_pragmas
+from techman.dao import PartDAO
+from techman.models import WO, Program
+
+NOW = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001
+
+
+async def create_plasma_db(path: Path, programs: int, parts_per_program: int,
+                           pragmas: Mapping[str, Any] | None = None,
+                           ) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Создание БД с programs программами по parts_per_program деталей в каждой."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    if pragmas:
+        set_sqlite_pragmas(engine, pragmas)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session, session.begin():
+        wo = WO(WONumber="Z1", CustomerName="Customer", WODate=NOW, OrderDate=NOW, DateCreated=NOW)
+        program_rows = [
+            Program(ProgramName=f"P{index}", RepeatIDProgram="1", UsedArea=1.0, ScrapFraction=0.1, MachineName="M",
+                    CuttingTimeProgram=Decimal(1), PostDateTime=NOW, Material="GS", Thickness=12.0, SheetLength=1.0,
+                    SheetWidth=1.0, ArchivePacketID=1, TimeLineID=1, PostedByUserID=1, PierceQtyProgram=1)
+            for index in range(programs)
+        ]
+        session.add_all([wo, *program_rows])
+        await session.flush()
+        await PartDAO(session).insert_many([
+            {"PartName": f"PART-{program.id}-{index}", "QtyInProcess": 1, "PartLength": 1.0, "PartWidth": 1.0,
+             "TrueArea": 1.0, "RectArea": 1.0, "TrueWeight": 1.0, "RectWeight": 1.0, "CuttingTimePart": Decimal(1),
+             "CuttingLength": 1.0, "PierceQtyPart": 1, "NestedArea": 1.0, "TotalCuttingTime": Decimal(1),
+             "MasterPartQty": 1, "WOState": "1", "DueDate": NOW, "RevisionNumber": "1",
+             "PK_PIP": f"{program.id}-{index}", "Thickness": 1.0, "program_id": program.id, "wo_number_id": wo.id}
+            for program in program_rows for index in range(parts_per_program)
+        ])
+    return engine, session_maker
@@ -0,0 +1,58 @@
+"""Бенчмарк stream_parts_data_by_programs: один IN (...) против параллельных частей.
+
+Запуск: python -m benchmarks.sigma_parts_chunks
+"""
+import time
+import asyncio
+import tempfile
+
+from pathlib import Path
+
+import sigma_handlers.database as sigma_database
+
+from config import settings
+from utils.executors import executors
+from benchmarks.sigma_sqlite import create_sigma_db, create_sigma_pool
+from sigma_handlers.sigma_db import stream_parts_data_by_programs
+
+LATENCY = 0.01  # задержка сети до sigma nest на запрос, с
+PROGRAM_COUNTS = (10, 100, 1000)
+CHUNK_SIZES = (10_000, 500, 100, 50)  # 10_000 - без разбиения
+REPEATS = 3
+
+
+async def read_rows(programs: list[str]) -> int:
+    """Чтение всех частей результата. Возвращает количество строк."""
+    return sum([len(batch.rows) async for batch in stream_parts_data_by_programs(programs)])
+
+
+async def measure(programs: list[str]) -> tuple[float, int]:
+    """Среднее время запроса и количество строк."""
+    await read_rows(programs)  # прогрев пула соединений
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        rows = await read_rows(programs)
+    return (time.perf_counter() - started) / REPEATS, rows
+
+
+async def main() -> None:
+    """Запуск бенчмарка."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "sigma.db"
+        program_names = create_sigma_db(db_path, programs=max(PROGRAM_COUNTS))
+        sigma_database._sigma_pool = create_sigma_pool(db_path, LATENCY, max_size=settings.sigma_pool_size)  # noqa SLF001
+        print(f"{'программ':>9} | {'часть':>6} | {'строк':>6} | {'мс':>8}")  # noqa T201
+        for count in PROGRAM_COUNTS:
+            for chunk_size in CHUNK_SIZES:
+                if chunk_size >= count and chunk_size != max(CHUNK_SIZES):
+                    continue
+                settings.sigma_in_chunk_size = chunk_size
+                elapsed, rows = await measure(program_names[:count])
+                label = "все" if chunk_size >= count else chunk_size
+                print(f"{count:>9} | {label:>6} | {rows:>6} | {elapsed * 1000:>8.1f}")  # noqa T201
+        sigma_database.close_sigma_pool()
+    executors.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
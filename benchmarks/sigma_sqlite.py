@@ -0,0 +1,108 @@
+"""Локальная имитация БД sigma nest на sqlite для бенчмарков.
+
+Таблицы создаются в присоединённой схеме dbo, поэтому запросы из sigma_handlers.sql_queries выполняются
+без изменений. LatencyConnection добавляет к каждому запросу задержку сети до MSSQL сервера.
+"""
+import time
+import random
+import sqlite3
+import datetime
+
+from typing import Any
+from pathlib import Path
+
+from sigma_handlers.connection_pool import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE dbo.Users (userid INTEGER PRIMARY KEY, UserName TEXT, UserFirstName TEXT, UserLastName TEXT,
+                        UserEMail TEXT, LastLoginDate TIMESTAMP);
+CREATE TABLE dbo.WO (WONumber TEXT PRIMARY KEY, CustomerName TEXT, WODate TIMESTAMP, WOData1 TEXT, WOData2 TEXT,
+                     DateCreated TIMESTAMP, OrderDate TIMESTAMP);
+CREATE TABLE dbo.Program (ProgramName TEXT PRIMARY KEY, RepeatID INTEGER, UsedArea REAL, ScrapFraction REAL,
+                          MachineName TEXT, Thickness REAL, CuttingTime REAL, PostDateTime TIMESTAMP, Material TEXT,
+                          SheetLength REAL, SheetWidth REAL, ArchivePacketID INTEGER, TimeLineID INTEGER,
+                          Comment TEXT, PostedByUserID INTEGER, PierceQty INTEGER);
+CREATE TABLE dbo.PIP (ProgramName TEXT, WONumber TEXT, PartName TEXT, RepeatID INTEGER, QtyInProcess INTEGER,
+                      PartLength REAL, PartWidth REAL, TrueArea REAL, RectArea REAL, TrueWeight REAL,
+                      RectWeight REAL, CuttingTime REAL, CuttingLength REAL, PierceQty INTEGER, NestedArea REAL,
+                      TotalCuttingTime REAL, MasterPartQty INTEGER, WOState INTEGER, DueDate TIMESTAMP,
+                      RevisionNumber TEXT, PK_PIP TEXT);
+CREATE INDEX dbo.ix_pip_program ON PIP (ProgramName);
+CREATE TABLE dbo.PartsLibrary (PartName TEXT PRIMARY KEY, SourceFileName TEXT);
+"""
+
+
+def create_sigma_db(path: Path, programs: int, parts_per_program: int = 5, seed: int = 0) -> list[str]:
+    """Создание БД sigma nest с programs программами. Возвращает имена программ."""
+    rnd = random.Random(seed)  # noqa S311 воспроизводимые тестовые данные
+    now = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001 sigma nest хранит локальное время
+    program_names = [f"GS-{index % 30}-{140000 + index}" for index in range(programs)]
+    with sqlite3.connect(path) as connection:
+        connection.execute("ATTACH DATABASE ? AS dbo", (str(path.with_suffix(".dbo")),))
+        connection.executescript(SCHEMA)
+        connection.execute("INSERT INTO dbo.Users VALUES (1, 'user-1 User', 'user-1', 'User', 'u@omzit.ru', ?)",
+                           (now,))
+        wos = [f"{1000 + index} WO" for index in range(max(1, programs // 4))]
+        connection.executemany("INSERT INTO dbo.WO VALUES (?, 'Customer', ?, '4SV185x12', 'Plita', ?, ?)",
+                               [(wo, now, now, now) for wo in wos])
+        connection.executemany(
+            "INSERT INTO dbo.Program VALUES (?, 1, 10.5, 0.1, 'Voortman_V304', 12, 100.5, ?, 'GS', 6000, 1500,"
+            " 1, 1, '', 1, 10)",
+            [(name, now - datetime.timedelta(minutes=index)) for index, name in enumerate(program_names)],
+        )
+        part_names = set()
+        pip_rows = []
+        for name in program_names:
+            for part_index in range(parts_per_program):
+                part_name = f"PART-{rnd.randrange(programs * parts_per_program)}-{part_index}"
+                part_names.add(part_name)
+                pip_rows.append((name, rnd.choice(wos), part_name, 1, rnd.randint(1, 50), 100.0, 50.0, 0.5, 0.6,
+                                 3.5, 4.0, 12.25, 300.0, 2, 0.5, 24.5, 1, 1, now, "1", f"PK-{len(pip_rows)}"))
+        # в запрос подставляются только плейсхолдеры
+        connection.executemany(f"INSERT INTO dbo.PIP VALUES ({', '.join('?' * 21)})", pip_rows)  # noqa S608
+        connection.executemany("INSERT INTO dbo.PartsLibrary VALUES (?, ?)",
+                               [(part, f"M:\\dxf\\{part}.dxf") for part in part_names])
+    return program_names
+
+
+class LatencyCursor:
+    """Курсор sqlite3 с задержкой перед выполнением запроса."""
+
+    def __init__(self, cursor: sqlite3.Cursor, latency: float) -> None:
+        """Инициализация курсора."""
+        self._cursor = cursor
+        self._latency = latency
+
+    def execute(self, query: str, params: tuple = ()) -> "LatencyCursor":
+        """Выполнение запроса с задержкой."""
+        time.sleep(self._latency)
+        self._cursor.execute(query, params)
+        return self
+
+    def __getattr__(self, name: str) -> Any:  # noqa ANN401
+        """Остальные методы курсора sqlite3."""
+        return getattr(self._cursor, name)
+
+
+class LatencyConnection:
+    """Соединение sqlite3 с задержкой на установку соединения и на каждый запрос."""
+
+    def __init__(self, path: Path, latency: float) -> None:
+        """Инициализация соединения."""
+        time.sleep(latency * 3)  # рукопожатие с сервером
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("ATTACH DATABASE ? AS dbo", (str(path.with_suffix(".dbo")),))
+        self._latency = latency
+
+    def cursor(self) -> LatencyCursor:
+        """Создание курсора."""
+        return LatencyCursor(self._connection.cursor(), self._latency)
+
+    def __getattr__(self, name: str) -> Any:  # noqa ANN401
+        """Остальные методы соединения sqlite3."""
+        return getattr(self._connection, name)
+
+
+def create_sigma_pool(path: Path, latency: float, max_size: int = 8) -> ConnectionPool:
+    """Пул соединений к имитации sigma nest."""
+    return ConnectionPool(lambda: LatencyConnection(path, latency), max_size=max_size)
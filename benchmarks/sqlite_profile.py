@@ -0,0 +1,94 @@
+"""Бенчмарк параметров sqlite: параллельные чтение и запись при настройках по умолчанию и settings.sqlite_pragmas.
+
+Писатели повторяют нагрузку /operator и /logist (обновление деталей и статуса программы в одной транзакции),
+читатели - нагрузку /master (программы и их детали).
+Запуск: python -m benchmarks.sqlite_profile
+"""
+import time
+import random
+import asyncio
+import tempfile
+
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import settings
+from techman.dao import PartDAO, ProgramDAO
+from logger_config import log
+from techman.enums import ProgramStatus
+from benchmarks.plasma_sqlite import create_plasma_db
+
+PROGRAMS = 200
+PARTS_PER_PROGRAM = 20
+WRITERS = 4
+READERS = 8
+DURATION = 5.0  # с
+
+
+async def writer(session_maker: async_sessionmaker[AsyncSession], deadline: float, counters: dict) -> None:
+    """Обновление фактического количества деталей программы и её статуса."""
+    rnd = random.Random()  # noqa S311
+    while time.perf_counter() < deadline:
+        program_id = rnd.randint(1, PROGRAMS)
+        try:
+            async with session_maker() as session, session.begin():
+                parts = await PartDAO(session).get_parts_by_program_ids([program_id])
+                await PartDAO(session).bulk_update_by_field_name(
+                    [{"id": part["id"], "qty_fact": rnd.randint(0, 5)} for part in parts], "id")
+                await ProgramDAO(session).update_program_status(program_id, ProgramStatus.CALCULATING)
+        except OperationalError:
+            counters["write_errors"] += 1
+        else:
+            counters["writes"] += 1
+
+
+async def reader(session_maker: async_sessionmaker[AsyncSession], deadline: float, counters: dict) -> None:
+    """Чтение программ и их деталей."""
+    rnd = random.Random()  # noqa S311
+    while time.perf_counter() < deadline:
+        program_ids = rnd.sample(range(1, PROGRAMS + 1), 5)
+        started = time.perf_counter()
+        try:
+            async with session_maker() as session:
+                await ProgramDAO(session).find_programs_by_ids(program_ids)
+                await PartDAO(session).get_parts_by_program_ids(program_ids)
+        except OperationalError:
+            counters["read_errors"] += 1
+        else:
+            counters["reads"] += 1
+            counters["read_latencies"].append(time.perf_counter() - started)
+
+
+async def run_profile(path: Path, pragmas: dict) -> dict:
+    """Нагрузка на БД с параметрами pragmas."""
+    engine, session_maker = await create_plasma_db(path, PROGRAMS, PARTS_PER_PROGRAM, pragmas)
+    counters = dict.fromkeys(("reads", "writes", "read_errors", "write_errors"), 0)
+    counters["read_latencies"] = []
+    deadline = time.perf_counter() + DURATION
+    try:
+        await asyncio.gather(*(writer(session_maker, deadline, counters) for _ in range(WRITERS)),
+                             *(reader(session_maker, deadline, counters) for _ in range(READERS)))
+    finally:
+        await engine.dispose()
+    return counters
+
+
+async def main() -> None:
+    """Запуск бенчмарка."""
+    log.remove()  # логирование каждой операции DAO искажает замер
+    print(f"{'профиль':>11} | {'чтений/с':>8} | {'записей/с':>9} | {'чтение p95, мс':>14} | "  # noqa T201
+          f"{'чтение max, мс':>14} | ошибок")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, pragmas in (("умолчания", {}), ("настроенный", settings.sqlite_pragmas)):
+            counters = await run_profile(Path(tmp_dir) / f"{label}.db", pragmas)
+            latencies = sorted(counters["read_latencies"]) or [0.0]
+            p95 = latencies[int(len(latencies) * 0.95)]
+            print(f"{label:>11} | {counters['reads'] / DURATION:>8.1f} | {counters['writes'] / DURATION:>9.1f} | "  # noqa T201
+                  f"{p95 * 1000:>14.1f} | {latencies[-1] * 1000:>14.1f} | "
+                  f"{counters['read_errors'] + counters['write_errors']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Бенчмарк разделения строк sigma nest на программы, заказы и детали.
+
+Сравнивает построчные словари с frozenset-дедупликацией и SigmaDataSplitter на синтетическом результате PIP.
+Запуск: python -m benchmarks.techman_splitter
+"""
+import time
+import random
+import datetime
+import tracemalloc
+
+from operator import itemgetter
+from collections import defaultdict
+from collections.abc import Callable
+
+from techman.utils import SigmaDataSplitter
+from techman.constants import wo_fields, part_fields, program_fields
+
+ROWS = 100_000
+PROGRAMS = 2_000
+COLUMNS = tuple(dict.fromkeys((*program_fields, *wo_fields, *part_fields)))
+
+
+def create_rows(count: int, seed: int = 0) -> list[tuple]:
+    """Синтетический результат запроса PIP."""
+    rnd = random.Random(seed)  # noqa S311 воспроизводимые тестовые данные
+    now = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001 sigma nest хранит локальное время
+    rows = []
+    for index in range(count):
+        program = f"GS-{index % 30}-{140000 + index % PROGRAMS}"
+        values = {column: f"{column}-{index % 7}" for column in COLUMNS}
+        values.update(ProgramName=program, RepeatIDProgram=rnd.randint(1, 3), WONumber=f"{1000 + index % 400} WO",
+                      PartName=f"PART-{index % (count // 2)}", QtyInProcess=rnd.randint(1, 50),
+                      PartLength=rnd.random() * 1000, PostDateTime=now, DueDate=now)
+        rows.append(tuple(values[column] for column in COLUMNS))
+    return rows
+
+
+def split_dicts(rows: list[tuple]) -> dict:
+    """Прежняя реализация: словарь на строку и frozenset пар ключ-значение для дедупликации."""
+    wos, parts, seen_wos, seen_parts = [], [], set(), set()
+    max_programs = defaultdict(dict)
+    for row in rows:
+        line_dict = dict(zip(COLUMNS, row, strict=True))
+        program_name = line_dict["ProgramName"]
+        if (not max_programs[program_name]
+                or line_dict["RepeatIDProgram"] > max_programs[program_name]["RepeatIDProgram"]):
+            max_programs[program_name] = line_dict
+        wo_frozenset = frozenset((key, line_dict[key]) for key in wo_fields)
+        if wo_frozenset not in seen_wos:
+            seen_wos.add(wo_frozenset)
+            wos.append(dict(zip(wo_fields, itemgetter(*wo_fields)(line_dict), strict=True)))
+        part_frozenset = frozenset((key, line_dict[key]) for key in part_fields)
+        if part_frozenset not in seen_parts:
+            seen_parts.add(part_frozenset)
+            parts.append(dict(zip(part_fields, itemgetter(*part_fields)(line_dict), strict=True)))
+        if not all(key in line_dict for key in program_fields + wo_fields + part_fields):
+            raise ValueError
+    programs = [dict(zip(program_fields, itemgetter(*program_fields)(line), strict=True))
+                for line in max_programs.values()]
+    return {"programs": programs, "wos": wos, "parts": parts}
+
+
+def split_columns(rows: list[tuple]) -> dict:
+    """SigmaDataSplitter: проекции по индексам колонок и дедупликация по кортежам."""
+    splitter = SigmaDataSplitter()
+    for start in range(0, len(rows), 1000):
+        splitter.add_rows(COLUMNS, rows[start:start + 1000])
+    return splitter.result()
+
+
+def measure(func: Callable[[list[tuple]], dict], rows: list[tuple]) -> tuple[float, float, dict]:
+    """Время, пиковая дополнительная память и результат."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> None:
+    """Запуск бенчмарка."""
+    rows = create_rows(ROWS)
+    print(f"{'способ':>8} | {'мс':>8} | {'пик МБ':>7} | программ | заказов | деталей")  # noqa T201
+    results = []
+    for label, func in (("словари", split_dicts), ("колонки", split_columns)):
+        func(rows[:1000])  # прогрев
+        elapsed, peak, result = measure(func, rows)
+        results.append(result)
+        print(f"{label:>8} | {elapsed * 1000:>8.1f} | {peak / 2 ** 20:>7.1f} | {len(result['programs']):>8} | "  # noqa T201
+              f"{len(result['wos']):>7} | {len(result['parts']):>7}")
+    assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,60 @@ class Settings(BaseSettings):
 
     BASE_DIR: ClassVar = Path(__file__).parent
     DB_NAME: str
+    # параметры соединений sqlite БД приложения (PRAGMA)
+    sqlite_journal_mode: str = "WAL"  # читатели не блокируются записью
+    sqlite_synchronous: str = "NORMAL"  # в режиме WAL сохраняет целостность БД при сбое питания
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # размер отображения файла БД в память, байт
+    sqlite_cache_size: int = -64_000  # размер кэша страниц, отрицательное значение - в КиБ
+    sqlite_busy_timeout: int = 5_000  # ожидание снятия блокировки записи, мс
+    sqlite_temp_store: str = "MEMORY"  # временные таблицы и индексы в памяти
+    sqlite_foreign_keys: bool = True  # проверка внешних ключей
+    sqlite_read_pool_size: int = 10  # соединения только для чтения
+    sqlite_read_max_overflow: int = 10  # дополнительные соединения только для чтения при пиковой нагрузке
+    sqlite_write_pool_timeout: float = 30.0  # ожидание единственного соединения записи, с
     sigma_server: str
     sigma_database: str
     sigma_username: str
     sigma_password: str
+    # пул соединений sigma nest
+    sigma_pool_size: int = 8  # максимальное количество открытых соединений
+    sigma_pool_timeout: float = 30.0  # ожидание свободного соединения, с
+    sigma_pool_max_idle: float = 300.0  # время простоя соединения до закрытия, с
+    sigma_pool_health_check_after: float = 30.0  # время простоя соединения до проверки перед выдачей, с
+    sigma_fetch_batch_size: int = 1000  # количество строк, читаемых из курсора за раз
+    sigma_in_chunk_size: int = 500  # максимальное количество параметров IN (...) в одном запросе
+    # кэш запросов sigma nest
+    sigma_cache_max_entries: int = 256  # максимальное количество записей
+    sigma_cache_programs_ttl: float = 60.0  # время жизни списков программ, с
+    sigma_cache_orders_ttl: float = 300.0  # время жизни списков заказов, с
+    # инкрементальная синхронизация sigma nest
+    sigma_sync_enabled: bool = True
+    sigma_sync_interval: float = 60.0  # период синхронизации, с
+    sigma_sync_backfill_days: int = 90  # глубина первичной загрузки, дней
+    sigma_sync_max_lag: float = 300.0  # допустимое отставание локальной копии, с
+    sigma_sync_overlap: float = 86400.0  # повторный запрос строк за этот период до метки, с
+    # пулы потоков приложения
+    EXECUTOR_SIGMA_WORKERS: int = 8  # запросы к sigma nest
+    EXECUTOR_IMAGES_WORKERS: int = 4  # копирование и извлечение картинок
+    EXECUTOR_EXCEL_WORKERS: int = 2  # формирование excel файлов
+    IMAGES_RESOLVE_CONCURRENCY: int = 8  # одновременно получаемые картинки одного списка
+    IMAGES_MANIFEST_WATCH: bool = True  # отслеживание изменений static/images для индекса картинок
+    IMAGES_MISSING_TTL: float = 900.0  # время хранения отсутствующих на сетевом диске картинок, с
+    IMAGES_MISSING_MAX_ENTRIES: int = 50_000  # максимальное количество отсутствующих картинок в кэше
+    IMAGES_MISSING_RESCAN_INTERVAL: float = 300.0  # период перепроверки отсутствующих картинок, с (0 - выкл.)
+    IMAGES_MISSING_LIST_THRESHOLD: int = 200  # записей каталога, с которых перепроверка читает каталог целиком
+    IMAGES_THUMB_SIZE: int = 320  # максимальная сторона миниатюры картинки детали, px
+    IMAGES_WEBP_QUALITY: int = 80  # качество (для lossless - степень сжатия) картинок WebP
+    IMAGES_WEBP_LOSSLESS: bool = True  # полноразмерные картинки без потерь: чертежи - линии на однотонном фоне
+    DXF_RENDER_WORKERS: int = 2  # процессы отрисовки DXF чертежей деталей
+    DXF_RENDER_PREWARM: bool = True  # запуск и прогрев процессов отрисовки при старте приложения
+    DXF_RENDER_CACHE_MAX_MB: int = 512  # максимальный размер кэша отрисовок static/renders, МБ
+    IMAGES_PREWARM_WORKERS: int = 2  # обработчики фоновой подготовки картинок
+    IMAGES_PREWARM_RETRIES: int = 3  # повторы подготовки картинки при ошибке
+    IMAGES_PREWARM_RETRY_DELAY: float = 5.0  # начальная задержка повтора, с
+    REPORTS_PAGE_SIZE: int = 500  # деталей на странице отчёта при запросе по курсору без limit
+    REPORTS_PAGE_MAX: int = 5000  # максимальный размер страницы отчёта
+    REPORTS_STREAM_BATCH_SIZE: int = 1000  # деталей в одной части потокового отчёта (yield_per)
     SECRET_KEY: str
     ALGORITHM: str
     SUPER_USER_PASSWORD: str
@@ -24,6 +74,19 @@ class Settings(BaseSettings):
         """URL БД приложения."""
         return rf"sqlite+aiosqlite:///{self.BASE_DIR}/{self.DB_NAME}"
 
+    @property
+    def sqlite_pragmas(self) -> dict[str, str | int]:
+        """PRAGMA, выполняемые при открытии соединения с БД приложения."""
+        return {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "busy_timeout": self.sqlite_busy_timeout,
+            "temp_store": self.sqlite_temp_store,
+            "foreign_keys": "ON" if self.sqlite_foreign_keys else "OFF",
+        }
+
     model_config = SettingsConfigDict(env_file=f"{BASE_DIR}/.env", case_sensitive=False)
 
 
@@ -33,4 +96,5 @@ BASEDIR = settings.BASE_DIR
 PARTS_DIR = Path(r"M:\Xranenie\Sigma\Parts")
 REPORTS_DIR = Path(r"M:\Xranenie\Sigma\eReports")
 STATIC_IMAGES_DIR = BASEDIR / "static" / "images"
+STATIC_RENDERS_DIR = BASEDIR / "static" / "renders"
 STATIC_DIR = BASEDIR / "static"
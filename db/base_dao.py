@@ -1,10 +1,13 @@
 """Базовый класс объекта доступа к базе данных."""
 # TODO проверить резонность использования flush
+import functools
+
 from typing import Generic, TypeVar
-from collections.abc import Sequence
+from collections import defaultdict
+from collections.abc import Callable, Sequence, Awaitable
 
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy import func, bindparam
 from sqlalchemy import delete as sqlalchemy_delete
 from sqlalchemy import update as sqlalchemy_update
 from sqlalchemy.exc import SQLAlchemyError
@@ -17,6 +20,28 @@ from logger_config import log
 T = TypeVar("T", bound=Base)
 
 
+class ReadOnlySessionError(RuntimeError):
+    """Изменяющий метод DAO вызван в сессии только для чтения."""
+
+
+def writes[**P, R](method: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """Отметка метода DAO, изменяющего данные.
+
+    Вызов такого метода в сессии только для чтения (session.info["read_only"]) - ошибка программы.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: "BaseDAO", *args: P.args, **kwargs: P.kwargs) -> R:
+        if self._session.info.get("read_only"):
+            msg = f"{type(self).__name__}.{method.__name__} изменяет данные и требует сессию записи."
+            log.error(msg)
+            raise ReadOnlySessionError(msg)
+        return await method(self, *args, **kwargs)
+
+    wrapper.writes = True
+    return wrapper
+
+
 class BaseDAO(Generic[T]):
     """Базовый класс объекта доступа к данным."""
 
@@ -74,6 +99,7 @@ class BaseDAO(Generic[T]):
             log.info(f"Найдено {len(records)} записей.")
             return list(records)
 
+    @writes
     async def add(self, values: BaseModel) -> T:
         """Добавление записи в базу данных."""
         values_dict = values.model_dump(exclude_unset=True)
@@ -89,6 +115,7 @@ class BaseDAO(Generic[T]):
             await self._session.flush()
             return new_instance
 
+    @writes
     async def add_many(self, instances: list[BaseModel]) -> Sequence[T]:
         """Добавление нескольких записей в базу данных."""
         values_list = [item.model_dump(exclude_unset=True) for item in instances]
@@ -104,6 +131,7 @@ class BaseDAO(Generic[T]):
             await self._session.flush()
             return new_instances
 
+    @writes
     async def update(self, filters: BaseModel, values: BaseModel) -> int:
         """Обновление записей по фильтру."""
         filter_dict = filters.model_dump(exclude_unset=True)
@@ -126,6 +154,7 @@ class BaseDAO(Generic[T]):
             await self._session.flush()
             return int(result.rowcount)
 
+    @writes
     async def delete(self, filters: BaseModel) -> int:
         """Удаление записей по фильтру."""
         filter_dict = filters.model_dump(exclude_unset=True)
@@ -160,49 +189,33 @@ class BaseDAO(Generic[T]):
             log.info(f"Найдено {count} записей.")
             return count
 
+    @writes
     async def bulk_update(self, records: list[BaseModel]) -> int:
-        """Групповое обновление записей."""
-        log.info(f"Массовое обновление записей {self.model.__name__}")
-        try:
-            updated_count = 0
-            for record in records:
-                record_dict = record.model_dump()
-                if "id" not in record_dict:
-                    continue
-
-                update_data = {k: v for k, v in record_dict.items() if k != "id"}
-                stmt = (
-                    sqlalchemy_update(self.model)
-                    .filter_by(id=record_dict["id"])
-                    .values(**update_data)
-                )
-
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
-        except SQLAlchemyError as e:
-            log.error(f"Ошибка при массовом обновлении: {e}")
-            raise
-        else:
-            log.info(f"Обновлено {updated_count} записей")
-            await self._session.flush()
-            return updated_count
+        """Групповое обновление записей по id."""
+        return await self.bulk_update_by_field_name([record.model_dump() for record in records], "id")
 
+    @writes
     async def bulk_update_by_field_name(self, records: list[dict], update_field_name: str) -> int:
-        """Групповое обновление записей по имени поля."""
+        """Групповое обновление записей по имени поля.
+
+        Записи группируются по набору обновляемых полей, каждая группа обновляется одним executemany.
+        Записи без update_field_name пропускаются. Возвращает количество обновлённых строк.
+        """
         log.info(f"Массовое обновление записей {self.model.__name__}")
+        table = self.model.__table__
+        groups = defaultdict(list)
+        for record_dict in records:
+            if update_field_name not in record_dict:
+                continue
+            update_data = {field_name: field_value for field_name, field_value in record_dict.items()
+                           if field_name != update_field_name}
+            if update_data:
+                groups[tuple(sorted(update_data))].append({"b_key": record_dict[update_field_name], **update_data})
         try:
             updated_count = 0
-            for record_dict in records:
-                if update_field_name not in record_dict:
-                    continue
-
-                update_data = {field_name: field_value for field_name, field_value in record_dict.items()}  # noqa
-                stmt = (
-                    sqlalchemy_update(self.model)
-                    .filter_by(**{update_field_name: record_dict[update_field_name]})
-                    .values(**update_data)
-                )
-                result = await self._session.execute(stmt)
+            for params in groups.values():
+                stmt = sqlalchemy_update(table).where(table.c[update_field_name] == bindparam("b_key"))
+                result = await self._session.execute(stmt, params)
                 updated_count += result.rowcount
         except SQLAlchemyError as e:
             log.error(f"Ошибка при массовом обновлении: {e}")
@@ -211,5 +224,3 @@ class BaseDAO(Generic[T]):
             log.info(f"Обновлено {updated_count} записей")
             await self._session.flush()
             return updated_count
-
-
@@ -1,9 +1,10 @@
 """Настройка sqlalchemy для работы с базой данных."""
 import datetime
 
-from typing import Annotated
+from typing import Any, Annotated
+from collections.abc import Mapping
 
-from sqlalchemy import TIMESTAMP, Integer, func
+from sqlalchemy import TIMESTAMP, Integer, func, event
 from sqlalchemy.orm import (
     Mapped,
     DeclarativeBase,
@@ -13,6 +14,7 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -22,12 +24,37 @@ from config import settings
 
 database_url = settings.db_url
 
-engine = create_async_engine(url=database_url)
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: Mapping[str, Any]) -> None:
+    """Выполнение PRAGMA на каждом новом соединении engine."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:  # noqa ANN401 ARG001
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# sqlite допускает одного писателя: запись идёт через единственное соединение, остальные писатели ждут
+# его в пуле, а не повторяют попытки на блокировке файла БД
+engine = create_async_engine(url=database_url, pool_size=1, max_overflow=0,
+                             pool_timeout=settings.sqlite_write_pool_timeout)
+set_sqlite_pragmas(engine, settings.sqlite_pragmas)
+# чтение в режиме WAL не блокируется записью и идёт через отдельный пул соединений только для чтения
+read_engine = create_async_engine(url=database_url, pool_size=settings.sqlite_read_pool_size,
+                                  max_overflow=settings.sqlite_read_max_overflow)
+set_sqlite_pragmas(read_engine, {**settings.sqlite_pragmas, "query_only": "ON"})
 
 async_session_maker = async_sessionmaker(
     engine, class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session_maker = async_sessionmaker(
+    read_engine, class_=AsyncSession,
+    expire_on_commit=False,
+    info={"read_only": True},
+)
 uniq_string = Annotated[str, mapped_column(unique=True, nullable=False)]
 
 
@@ -8,7 +8,7 @@ from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
-from auth.dao import UsersDAO
+from auth.dao import UsersDAO, UserDatabase
 from exceptions import (
     TokenNoFound,
     NoJwtException,
@@ -17,7 +17,7 @@ from exceptions import (
     UserNotFoundException,
 )
 from auth.models import User
-from dependencies.dao_dep import get_async_session, get_session_without_commit
+from dependencies.dao_dep import get_session_without_commit
 
 
 def get_access_token(request: Request) -> str:
@@ -99,7 +99,7 @@ async def get_current_user(token: str = Depends(get_access_token),
 
 
 
-async def get_user_db(session: AsyncSession = Depends(get_async_session)) -> AsyncGenerator:
-    """Зависимость для получения пользователя из БД."""
+async def get_user_db() -> AsyncGenerator:
+    """Зависимость для получения пользователя из БД. Сессии открываются на время каждого обращения."""
     # yield SQLAlchemyUserDatabase(session, User)
-    yield User.get_db(session=session)
+    yield UserDatabase(User)
@@ -3,7 +3,7 @@ from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.database import async_session_maker
+from db.database import read_session_maker, async_session_maker
 
 
 async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
@@ -20,8 +20,8 @@ async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
-    """Асинхронная сессия без автоматического коммита."""
-    async with async_session_maker() as session:
+    """Асинхронная сессия без автоматического коммита только для чтения."""
+    async with read_session_maker() as session:
         try:
             yield session
         except Exception:
@@ -3,8 +3,9 @@ import { useState } from "react";
 import CloseIcon from '@mui/icons-material/Close';
 
 
-type ImageWidgetProps = { source: string | null };
-export function ImageWidget({ source }: ImageWidgetProps) {
+/** source - миниатюра в ячейке, fullSource - полноразмерная картинка для просмотра (если нет - миниатюра) */
+type ImageWidgetProps = { source: string | null; fullSource?: string | null };
+export function ImageWidget({ source, fullSource }: ImageWidgetProps) {
     const [openModal, setOpenModal] = useState(false)
     return (
         <>
@@ -60,7 +61,7 @@ export function ImageWidget({ source }: ImageWidgetProps) {
                     >
                         <Box
                             component="img"
-                            src={source ?? ""}
+                            src={fullSource ?? source ?? ""}
                             alt="full preview"
                             sx={{
                                 maxWidth: "none",
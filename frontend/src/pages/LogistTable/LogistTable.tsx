@@ -33,7 +33,7 @@ const columnFields = [
 type FilteredMasterProgramParts = Omit<
     Pick<MasterProgramPartsRecordType, (typeof columnFields)[number]>,
     "fio_doers"
-> & { fio_doers: string };
+> & { fio_doers: string; part_pic_full?: string | null };
 
 export function LogistTable() {
     const programInfo =  useProgramInfo()
@@ -76,7 +76,7 @@ export function LogistTable() {
                         ...col,
                         width: 130,
                         flex: 0,
-                        renderCell: (params) => <ImageWidget source={params.value} />,
+                        renderCell: (params) => <ImageWidget source={params.value} fullSource={params.row.part_pic_full} />,
                     };
                 }
 
@@ -109,6 +109,7 @@ export function LogistTable() {
                 return acc;
             }, {});
             preparedRow["part_pic"] = row.part_pic ? `${BASE_URL}${row.part_pic}` : null;
+            preparedRow["part_pic_full"] = row.part_pic_full ? `${BASE_URL}${row.part_pic_full}` : null;
             preparedRow["fio_doers"] = row["fio_doers"].map((item) => item.fio_doer).join(", ");
             return preparedRow;
         });
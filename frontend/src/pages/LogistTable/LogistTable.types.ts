@@ -69,5 +69,6 @@ export type MasterProgramPartsRecordType = {
     SourceFileName: string | null;
     program_pic:string | null;
     part_pic:string | null;
+    part_pic_full?:string | null;
 
 };
@@ -93,6 +93,7 @@ export function OperatorParts() {
                 return acc;
             }, {});
             preparedRow["part_pic"] = row.part_pic ? `${BASE_URL}${row.part_pic}` : null;
+            preparedRow["part_pic_full"] = row.part_pic_full ? `${BASE_URL}${row.part_pic_full}` : null;
             preparedRow["checkBox"] = {
                 checked: Boolean(row.done_by_fio_doer_id),
                 disabled: false,
@@ -180,7 +181,7 @@ export function OperatorParts() {
                     ...col,
                     width: 130,
                     flex: 0,
-                    renderCell: (params) => <ImageWidget source={params.value} />,
+                    renderCell: (params) => <ImageWidget source={params.value} fullSource={params.row.part_pic_full} />,
                 };
             }
 
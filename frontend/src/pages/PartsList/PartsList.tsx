@@ -43,6 +43,7 @@ const PartsList = () => {
                 return acc;
             }, {});
             row["part_pic"] = item.part_pic?`${BASE_URL}${item.part_pic}`: null;
+            row["part_pic_full"] = item.part_pic_full?`${BASE_URL}${item.part_pic_full}`: null;
             row["fio_doers"] = item.fio_doers.map((item) => item.fio_doer).join(", ");
             //////////////////////////
             // так быть не должно, нужно поле  id для деталей
@@ -64,7 +65,7 @@ const PartsList = () => {
                     ...col,
                     width: 130,
                     flex: 0,
-                    renderCell: (params) => <ImageWidget source={params.value} />,
+                    renderCell: (params) => <ImageWidget source={params.value} fullSource={params.row.part_pic_full} />,
                 };
             }
             
@@ -52,6 +52,7 @@ const PlasmaParts = () => {
             // так быть не должно, нужно поле  id для деталей
             row["id"] = item.PK_PIP;
             row["part_pic"] = item.part_pic?`${BASE_URL}${item.part_pic}`: null;
+            row["part_pic_full"] = item.part_pic_full?`${BASE_URL}${item.part_pic_full}`: null;
             return row;
         });
         return processedData;
@@ -99,7 +100,7 @@ const PlasmaParts = () => {
                     ...col,
                     width: 130,
                     flex: 0,
-                    renderCell: (params) => <ImageWidget source={params.value} />,
+                    renderCell: (params) => <ImageWidget source={params.value} fullSource={params.row.part_pic_full} />,
                 };
             }
 
@@ -0,0 +1 @@
+"""Сервис для работы с картинками программ и деталей."""
@@ -0,0 +1,78 @@
+"""Эндпоинты обслуживания картинок программ и деталей."""
+from typing import Annotated
+
+from fastapi import Depends, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.users import get_admin_user, get_techman_user, current_active_user
+from exceptions import EmptyAnswerError
+from auth.models import User
+from techman.dao import PartDAO
+from utils.executors import ExecutorName, executors
+from dependencies.dao_dep import get_session_without_commit
+from utils.pics_utils.dxf_render import RenderMode, RenderOptions, dxf_render_service
+from utils.pics_utils.image_prewarm import image_prewarm
+from utils.pics_utils.image_variants import ImageVariant
+from utils.pics_utils.missing_sources import missing_sources
+from utils.pics_utils.copy_pics_and_get_links import get_part_image
+
+router = APIRouter()
+
+
+@router.get("/missing_cache", tags=["images"])
+async def get_missing_cache_stats(user_data: Annotated[User, Depends(get_admin_user)],  # noqa ARG001
+                                  ) -> dict:
+    """Статистика кэша отсутствующих на сетевом диске картинок."""
+    return missing_sources.stats()
+
+
+@router.delete("/missing_cache", tags=["images"])
+async def invalidate_missing_cache(user_data: Annotated[User, Depends(get_admin_user)],  # noqa ARG001
+                                   rescan: bool = False,  # noqa FBT001 FBT002
+                                   ) -> dict:
+    """Очистка кэша отсутствующих картинок.
+
+    При `rescan=true` удаляются только записи файлов, появившихся на сетевом диске, и истекшие записи.
+    """
+    if rescan:
+        removed = await executors.run(ExecutorName.IMAGES, missing_sources.rescan)
+    else:
+        removed = missing_sources.invalidate()
+    return {"removed": removed}
+
+
+@router.get("/prewarm_status", tags=["images"])
+async def get_prewarm_status(user_data: Annotated[User, Depends(get_techman_user)],  # noqa ARG001
+                             ) -> dict:
+    """Ход фоновой подготовки картинок программ и деталей, загруженных из sigma nest."""
+    return image_prewarm.stats()
+
+
+@router.get("/parts/{part_name}", tags=["images"])
+async def get_part_pictures(part_name: str,
+                            user_data: Annotated[User, Depends(current_active_user)],  # noqa ARG001
+                            ) -> dict:
+    """Картинка детали для детального просмотра: полноразмерная картинка и миниатюра."""
+    part_pic = await get_part_image(part_name, ImageVariant.FULL)
+    if part_pic is None:
+        raise EmptyAnswerError(detail=f"Нет картинки детали {part_name}.")
+    return {"part_pic": part_pic, "part_pic_thumb": await get_part_image(part_name)}
+
+
+@router.get("/programs/{program_id}/renders", tags=["images"])
+async def render_program_parts(program_id: int,
+                               user_data: Annotated[User, Depends(current_active_user)],  # noqa ARG001
+                               select_session: Annotated[AsyncSession, Depends(get_session_without_commit)],
+                               mode: RenderMode = RenderMode.PNG,
+                               ) -> dict:
+    """Отрисовка DXF чертежей всех деталей программы с габаритными размерами.
+
+    Возвращает URL картинок по именам деталей. Неизменённые чертежи берутся из кэша отрисовок.
+    `mode=svg` - компактный векторный SVG, `mode=svg_png` - SVG, растеризованный в PNG.
+    """
+    parts = await PartDAO(select_session).get_parts_by_program_ids([program_id])
+    if not parts:
+        raise EmptyAnswerError(detail=f"Нет деталей программы с id {program_id}.")
+    renders = await dxf_render_service.render_many({part["PartName"]: part["SourceFileName"] for part in parts},
+                                                   RenderOptions(mode=mode))
+    return {"data": renders, "stats": dxf_render_service.stats()}
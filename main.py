@@ -6,14 +6,21 @@ from collections.abc import AsyncGenerator
 import uvicorn
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import BASEDIR
+from config import BASEDIR, settings
 from middlewares import CacheControlMiddleware
+from static_files import VersionedStaticFiles
 from logger_config import log
+from utils.executors import executors
 from admin_panel.admin import create_admin_panel
+from sigma_handlers.database import close_sigma_pool
 from settings.register_routers import register_routers
+from sigma_handlers.sigma_sync import sigma_sync
+from utils.pics_utils.dxf_render import dxf_render_service
+from utils.pics_utils.image_prewarm import image_prewarm
+from utils.pics_utils.image_manifest import image_manifest
+from utils.pics_utils.missing_sources import missing_sources
 
 # TODO
 #  переписать to_dict получение данных на to_dict схем pydantic, использовать to_dict в Base только для моделей
@@ -27,8 +34,26 @@ from settings.register_routers import register_routers
 async def lifespan(app: FastAPI) -> AsyncGenerator:  # noqa ARG001
     """Управление жизненным циклом приложения."""
     log.info("Инициализация приложения...")
+    executors.start()
+    image_manifest.load()
+    if settings.IMAGES_MANIFEST_WATCH:
+        image_manifest.start()
+    if settings.IMAGES_MISSING_RESCAN_INTERVAL > 0:
+        missing_sources.start(settings.IMAGES_MISSING_RESCAN_INTERVAL)
+    image_prewarm.start()
+    if settings.DXF_RENDER_PREWARM:
+        await dxf_render_service.start()
+    if settings.sigma_sync_enabled:
+        sigma_sync.start()
     yield
     log.info("Завершение работы приложения...")
+    await sigma_sync.stop()
+    await image_prewarm.stop()
+    await image_manifest.stop()
+    await missing_sources.stop()
+    dxf_render_service.shutdown()
+    executors.shutdown()
+    close_sigma_pool()
 
 
 app = FastAPI(
@@ -78,7 +103,7 @@ app.add_middleware(CacheControlMiddleware)
 static_path = BASEDIR / Path("static")
 app.mount(
     "/static",
-    StaticFiles(directory=static_path),
+    VersionedStaticFiles(directory=static_path),
     name="static",
 )
 
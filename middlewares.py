@@ -4,9 +4,18 @@ from collections.abc import Callable, Awaitable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from utils.pics_utils.image_variants import parse_variant_file_name
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
 
 class CacheControlMiddleware(BaseHTTPMiddleware):
-    """Middleware для добавления Cache-Control в ответы."""
+    """Middleware для добавления Cache-Control в ответы.
+
+    Картинки с версией в URL (хэш содержимого в имени файла или параметр v) кэшируются навсегда,
+    остальные картинки кэшируются с обязательной проверкой по ETag.
+    """
 
     async def dispatch(self,
                        request: Request,
@@ -15,6 +24,9 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
         """Добавляет Cache-Control в ответы."""
         response = await call_next(request)
         if request.url.path.startswith("/static/images"):
-            response.headers["Cache-Control"] = "public, max-age=31536000"
-            response.headers["Expires"] = "31536000"
+            file_name = request.url.path.rsplit("/", 1)[-1]
+            versioned = "v" in request.query_params or parse_variant_file_name(file_name) is not None
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE if versioned else REVALIDATE_CACHE
+        elif request.url.path.startswith("/static/renders"):  # имя файла - хэш содержимого DXF и параметров отрисовки
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
         return response
@@ -9,6 +9,7 @@ from alembic import context
 from config import db_url
 from auth.models import User
 from techman.models import Part, Program, WO
+from sigma_handlers.models import SigmaProgramStage, SigmaWoStage, SigmaSyncState
 from db.database import Base
 
 
@@ -1,12 +1,18 @@
 """Объект доступа к БД сервиса reports."""
-from datetime import date
+from datetime import date, datetime
+from collections.abc import AsyncIterator
 
-from sqlalchemy import and_, select
+from sqlalchemy import Float, Select, and_, cast, func, select, tuple_
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.base_dao import BaseDAO
-from techman.models import Part, Program
+from techman.models import WO, Part, FioDoer, Program
+
+# ключ постраничной выборки: server_default sqlite хранит created_at как 'YYYY-MM-DD HH:MM:SS', а курсор
+# и даты, заданные из python, передаются с микросекундами. Сравнение строк разного формата пропускало детали
+# с той же секундой, что и последняя деталь страницы, поэтому обе стороны приводятся к формату datetime()
+CREATED_AT_KEY = func.datetime(Part.created_at)
 
 
 class ReportPartDAO(BaseDAO):
@@ -14,10 +20,12 @@ class ReportPartDAO(BaseDAO):
 
     model = Part
 
-    async def get_full_part_data_start_end(self, start_date: date, end_date: date,
-                                           _session: AsyncSession = None) -> list[dict]:
-        """Получение существующих программ."""
-        query = (
+    def _full_part_query(self, start_date: date, end_date: date) -> Select:
+        """Запрос деталей за период с программой, исполнителями, заказом и местом хранения.
+
+        Детали упорядочены по (CREATED_AT_KEY, id) - ключу постраничной выборки.
+        """
+        return (
             select(self.model)
             .options(
                 joinedload(self.model.program)  # программы
@@ -26,6 +34,7 @@ class ReportPartDAO(BaseDAO):
                 ),
                 joinedload(self.model.wo_number),  # данные wo
                 joinedload(self.model.storage_cell),  # данные мест хранения
+                joinedload(self.model.done_by_fio_doer),  # исполнитель детали
             )
             .where(
                 and_(
@@ -33,32 +42,85 @@ class ReportPartDAO(BaseDAO):
                     Part.created_at <= end_date,  # Дата создания меньше или равна end_date
                 ),
             )
-            .order_by(self.model.created_at)  # Сортировка по created_at
+            .order_by(CREATED_AT_KEY, self.model.id)  # Сортировка по created_at
         )
 
-        # Выполнение запроса
+    @staticmethod
+    def _combine_part_data(part: Part) -> dict:
+        """Объединение данных детали, программы, заказа, места хранения и исполнителей в один словарь."""
+        combined_data = {
+            **(part.program.to_dict()),  # Данные программы
+            **(part.wo_number.to_dict()),  # Данные заказа
+            **(part.storage_cell.to_dict() if part.storage_cell else {}),  # Данные мест хранения
+            **part.to_dict(),  # Данные детали
+
+        }
+
+        if part.program:
+            combined_data["fio_doers"] = [
+                fio_doer.to_dict()
+                for fio_doer in part.program.fio_doers
+            ]
+            combined_data["done_by_fio_doer"] = part.done_by_fio_doer.to_dict() if part.done_by_fio_doer else None
+        else:
+            combined_data["fio_doers"] = []
+        return combined_data
+
+    async def get_full_part_data_start_end(self, start_date: date, end_date: date,
+                                           _session: AsyncSession = None) -> list[dict]:
+        """Получение существующих программ."""
+        result = await self._session.execute(self._full_part_query(start_date, end_date))
+        return [self._combine_part_data(part) for part in result.scalars().all()]
+
+    async def get_full_part_data_page(self, start_date: date, end_date: date, limit: int,
+                                      after: tuple[datetime, int] | None = None) -> list[dict]:
+        """Страница деталей за период: не более limit деталей после ключа after (created_at, id)."""
+        query = self._full_part_query(start_date, end_date).limit(limit)
+        if after is not None:
+            created_at, row_id = after
+            query = query.where(tuple_(CREATED_AT_KEY, Part.id) > tuple_(func.datetime(created_at), row_id))
+        result = await self._session.execute(query)
+        return [self._combine_part_data(part) for part in result.scalars().all()]
+
+    async def stream_full_part_data(self, start_date: date, end_date: date,
+                                    batch_size: int) -> AsyncIterator[list[dict]]:
+        """Потоковое получение деталей за период частями по batch_size.
+
+        Строки читаются курсором с yield_per, в памяти находится только текущая часть.
+        """
+        query = self._full_part_query(start_date, end_date).execution_options(yield_per=batch_size)
+        result = await self._session.stream(query)
+        async for parts in result.scalars().partitions():
+            # карта идентичности сессии хранит слабые ссылки: детали части освобождаются после преобразования
+            yield [self._combine_part_data(part) for part in parts]
+
+    async def get_parts_summary_columns(self, start_date: date, end_date: date) -> list[tuple]:
+        """Плоская выборка колонок деталей для сводного отчёта без создания ORM объектов.
+
+        Порядок колонок: reports.summary.KEY_COLUMNS, затем reports.summary.VALUE_COLUMNS.
+        """
+        query = (
+            select(
+                Program.ProgramName,
+                WO.WONumber,
+                Program.MachineName,
+                Program.Material,
+                func.coalesce(FioDoer.fio_doer, ""),
+                cast(Part.TotalCuttingTime, Float),
+                Part.TrueWeight,
+                Part.TrueArea,
+                Part.QtyInProcess,
+                func.coalesce(Part.qty_fact, 0),
+            )
+            .join(Program, Part.program_id == Program.id)
+            .join(WO, Part.wo_number_id == WO.id)
+            .outerjoin(FioDoer, Part.done_by_fio_doer_id == FioDoer.id)
+            .where(
+                and_(
+                    Part.created_at >= start_date,
+                    Part.created_at <= end_date,
+                ),
+            )
+        )
         result = await self._session.execute(query)
-        parts = result.scalars().all()
-        output = []
-        for part in parts:
-            # Объединяем данные детали, программы и заказа в один словарь
-            combined_data = {
-                **(part.program.to_dict()),  # Данные программы
-                **(part.wo_number.to_dict()),  # Данные заказа
-                **(part.storage_cell.to_dict() if part.storage_cell else {}),  # Данные мест хранения
-                **part.to_dict(),  # Данные детали
-
-            }
-
-            if part.program:
-                combined_data["fio_doers"] = [
-                    fio_doer.to_dict()
-                    for fio_doer in part.program.fio_doers
-                ]
-                combined_data["done_by_fio_doer"] = part.done_by_fio_doer.to_dict() if part.done_by_fio_doer else None
-            else:
-                combined_data["fio_doers"] = []
-
-            output.append(combined_data)
-
-        return output
+        return result.tuples().all()
@@ -0,0 +1,129 @@
+"""Постраничная и потоковая выдача отчётов."""
+import base64
+import binascii
+
+from decimal import Decimal
+from datetime import date, datetime
+from collections.abc import AsyncIterable, AsyncIterator
+
+import orjson
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import settings
+from exceptions import WrongInputError
+from db.database import read_session_maker
+from reports.dao import ReportPartDAO
+from utils.excel_utils import stream_excel
+from settings.translate_dict import translate_dict, get_translated_keys
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Курсор страницы: ключ (created_at, id) последней выданной строки в base64."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Ключ (created_at, id) из курсора страницы."""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise WrongInputError(detail=f"Неверный курсор страницы: {cursor}.", status_code=400) from e
+
+
+def _default(value: object) -> object:
+    """Сериализация типов, которые orjson не поддерживает."""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(type(value).__name__)
+
+
+def ndjson_line(row: dict) -> bytes:
+    """Строка NDJSON."""
+    return orjson.dumps(row, default=_default) + b"\n"
+
+
+async def prefetch_first_batch(batches: AsyncIterator[list[dict]]) -> AsyncIterator[list[dict]]:
+    """Получение первой части строк до начала потокового ответа.
+
+    Ошибки подключения и запроса возникают здесь, до отправки статуса 200, и возвращаются клиенту
+    ошибкой, а не обрывают уже начатый ответ. Возвращает поток из первой части и остальных.
+    """
+    first = await anext(batches, None)
+    return _with_first_batch(first, batches)
+
+
+async def _with_first_batch(first: list[dict] | None,
+                            batches: AsyncIterator[list[dict]]) -> AsyncIterator[list[dict]]:
+    """Поток частей, первая из которых уже получена."""
+    if first is None:
+        return
+    yield first
+    async for rows in batches:
+        yield rows
+
+
+async def stream_rows_json(batches: AsyncIterable[list[dict]]) -> AsyncIterator[bytes]:
+    """Документ {"data": [...], "headers": {...}} частями по мере получения строк.
+
+    Заголовки - переведённые ключи первой строки, как get_translated_keys, поэтому записываются после данных.
+    """
+    first_row = None
+    yield b'{"data":['
+    async for rows in batches:
+        if not rows:
+            continue
+        chunk = b",".join(orjson.dumps(row, default=_default) for row in rows)
+        if first_row is None:
+            first_row = rows[0]
+            yield chunk
+        else:
+            yield b"," + chunk
+    headers = get_translated_keys([first_row] if first_row is not None else [])
+    yield b'],"headers":' + orjson.dumps(headers) + b"}"
+
+
+async def stream_full_parts(start_date: date, end_date: date,
+                            session_maker: async_sessionmaker[AsyncSession] = read_session_maker,
+                            ) -> AsyncIterator[list[dict]]:
+    """Полный отчёт по деталям частями по REPORTS_STREAM_BATCH_SIZE.
+
+    Сессия открывается генератором: зависимости FastAPI закрывают сессию до отправки потокового ответа.
+    """
+    async with session_maker() as session:
+        async for parts in ReportPartDAO(session=session).stream_full_part_data(
+                start_date, end_date, settings.REPORTS_STREAM_BATCH_SIZE):
+            yield parts
+
+
+async def stream_full_parts_ndjson(start_date: date, end_date: date,
+                                   session_maker: async_sessionmaker[AsyncSession] = read_session_maker,
+                                   ) -> AsyncIterator[bytes]:
+    """Полный отчёт по деталям в NDJSON: первая строка - {"headers": ...}, далее по строке на деталь."""
+    headers_sent = False
+    async for parts in stream_full_parts(start_date, end_date, session_maker):
+        if not headers_sent:
+            yield ndjson_line({"headers": get_translated_keys(parts)})
+            headers_sent = True
+        yield b"".join(ndjson_line(part) for part in parts)
+
+
+def _excel_part(part: dict) -> dict:
+    """Деталь для excel: исполнители - именами."""
+    done_by = part.get("done_by_fio_doer")
+    return {**part,
+            "fio_doers": [fio_doer["fio_doer"] for fio_doer in part.get("fio_doers", [])],
+            "done_by_fio_doer": done_by["fio_doer"] if done_by else None}
+
+
+async def stream_full_parts_excel(start_date: date, end_date: date,
+                                  session_maker: async_sessionmaker[AsyncSession] = read_session_maker,
+                                  ) -> AsyncIterator[bytes]:
+    """Полный отчёт по деталям в xlsx. Колонки и заголовки - как у переведённых заголовков отчёта."""
+    batches = ([_excel_part(part) for part in parts]
+               async for parts in stream_full_parts(start_date, end_date, session_maker))
+    async for chunk in stream_excel(batches, "Детали", translate_dict):
+        yield chunk
@@ -3,13 +3,27 @@ from typing import Annotated
 from datetime import date
 
 from fastapi import Query, Depends, APIRouter
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import settings
 from exceptions import EmptyAnswerError
 from reports.dao import ReportPartDAO
+from reports.summary import SummaryGroup, build_parts_summary, summary_excel_sheets
+from utils.executors import ExecutorName, executors
+from utils.excel_utils import save_excel, stream_excel, excel_response, stream_saved_file
+from reports.pagination import (
+    NDJSON_MEDIA_TYPE,
+    decode_cursor,
+    encode_cursor,
+    stream_rows_json,
+    prefetch_first_batch,
+    stream_full_parts_excel,
+    stream_full_parts_ndjson,
+)
 from dependencies.dao_dep import get_session_without_commit
-from settings.translate_dict import get_translated_keys
-from sigma_handlers.sigma_db import get_parts_info_by_wo
+from settings.translate_dict import translate_dict, get_translated_keys
+from sigma_handlers.sigma_db import stream_parts_info_by_wo
 
 router = APIRouter()
 
@@ -21,28 +35,127 @@ async def get_full_parts_report(
         end_date: Annotated[date, Query(..., description="Конечная дата отчёта",
                                         example="2025-02-28")],
         # user_data: Annotated[User, Depends(get_current_techman_user)],
-        select_session: Annotated[AsyncSession, Depends(get_session_without_commit)]) -> dict:
-    """Получение полного отчёта по деталям."""
+        select_session: Annotated[AsyncSession, Depends(get_session_without_commit)],
+        limit: Annotated[int | None, Query(ge=1, le=settings.REPORTS_PAGE_MAX,
+                                           description="Размер страницы")] = None,
+        cursor: Annotated[str | None, Query(description="Курсор страницы из next_cursor")] = None,
+) -> dict:
+    """Получение полного отчёта по деталям.
+
+    Без `limit` и `cursor` возвращается весь период. С `limit` или `cursor` - страница деталей,
+    упорядоченных по дате создания и id, и `next_cursor` для следующей страницы (null на последней).
+    """
     parts_select_table = ReportPartDAO(session=select_session)
-    parts = await parts_select_table.get_full_part_data_start_end(start_date=start_date, end_date=end_date)
-    if not parts:
+    if limit is None and cursor is None:
+        parts = await parts_select_table.get_full_part_data_start_end(start_date=start_date, end_date=end_date)
+        if not parts:
+            raise EmptyAnswerError(detail="Нет деталей для отчёта в этом интервале времени.")
+        return {"data": parts, "headers": get_translated_keys(parts)}
+
+    limit = limit or settings.REPORTS_PAGE_SIZE
+    after = decode_cursor(cursor) if cursor else None
+    parts = await parts_select_table.get_full_part_data_page(start_date=start_date, end_date=end_date,
+                                                             limit=limit, after=after)
+    if not parts and after is None:
+        raise EmptyAnswerError(detail="Нет деталей для отчёта в этом интервале времени.")
+    next_cursor = encode_cursor(parts[-1]["created_at"], parts[-1]["id"]) if len(parts) == limit else None
+    return {"data": parts, "headers": get_translated_keys(parts) or {}, "next_cursor": next_cursor}
+
+
+@router.get("/parts_full/stream", tags=["reports"])
+async def stream_full_parts_report(
+        start_date: Annotated[date, Query(..., description="Начальная дата отчёта",
+                                          example="2025-02-01")],
+        end_date: Annotated[date, Query(..., description="Конечная дата отчёта",
+                                        example="2025-02-28")],
+) -> StreamingResponse:
+    """Полный отчёт по деталям потоком NDJSON.
+
+    Первая строка - переведённые заголовки `{"headers": {...}}`, далее по JSON объекту на деталь.
+    Детали читаются из БД частями, память сервера не зависит от длины периода.
+    """
+    return StreamingResponse(stream_full_parts_ndjson(start_date, end_date), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/parts_full/xlsx", tags=["reports"])
+async def export_full_parts_report(
+        start_date: Annotated[date, Query(..., description="Начальная дата отчёта",
+                                          example="2025-02-01")],
+        end_date: Annotated[date, Query(..., description="Конечная дата отчёта",
+                                        example="2025-02-28")],
+) -> StreamingResponse:
+    """Полный отчёт по деталям в excel. Детали читаются из БД и записываются в файл частями."""
+    return excel_response(stream_full_parts_excel(start_date, end_date),
+                          f"Отчёт по деталям {start_date:%d.%m.%Y}-{end_date:%d.%m.%Y}.xlsx")
+
+
+@router.get("/parts_summary", tags=["reports"])
+async def get_parts_summary(
+        start_date: Annotated[date, Query(..., description="Начальная дата отчёта",
+                                          example="2025-02-01")],
+        end_date: Annotated[date, Query(..., description="Конечная дата отчёта",
+                                        example="2025-02-28")],
+        select_session: Annotated[AsyncSession, Depends(get_session_without_commit)],
+        group_by: Annotated[list[SummaryGroup] | None, Query(description="Группировки, по умолчанию все")] = None,
+) -> dict:
+    """Сводный отчёт по деталям за период.
+
+    Итоги и суммы по программам, заказам, машинам, материалам и исполнителям: время резки,
+    вес и площадь на количество в работе, количество в работе, фактическое и оставшееся количество,
+    доля выполнения.
+    """
+    rows = await ReportPartDAO(session=select_session).get_parts_summary_columns(start_date=start_date,
+                                                                               end_date=end_date)
+    if not rows:
         raise EmptyAnswerError(detail="Нет деталей для отчёта в этом интервале времени.")
+    summary = build_parts_summary(rows, group_by or list(SummaryGroup))
+    summary["headers"] = get_translated_keys([summary["totals"]])
+    return summary
 
-    headers = get_translated_keys(parts)
 
-    return {"data": parts, "headers": headers}
+@router.get("/parts_summary/xlsx", tags=["reports"])
+async def export_parts_summary(
+        start_date: Annotated[date, Query(..., description="Начальная дата отчёта",
+                                          example="2025-02-01")],
+        end_date: Annotated[date, Query(..., description="Конечная дата отчёта",
+                                        example="2025-02-28")],
+        select_session: Annotated[AsyncSession, Depends(get_session_without_commit)],
+        group_by: Annotated[list[SummaryGroup] | None, Query(description="Группировки, по умолчанию все")] = None,
+) -> StreamingResponse:
+    """Сводный отчёт по деталям в excel: лист итогов и лист на каждую группировку."""
+    rows = await ReportPartDAO(session=select_session).get_parts_summary_columns(start_date=start_date,
+                                                                               end_date=end_date)
+    if not rows:
+        raise EmptyAnswerError(detail="Нет деталей для отчёта в этом интервале времени.")
+    summary = build_parts_summary(rows, group_by or list(SummaryGroup))
+    file = await executors.run(ExecutorName.EXCEL, save_excel, summary_excel_sheets(summary))
+    return excel_response(stream_saved_file(file),
+                          f"Сводный отчёт {start_date:%d.%m.%Y}-{end_date:%d.%m.%Y}.xlsx")
 
 
 @router.get("/get_wo_details", tags=["reports"])
 async def get_wo_details(wo_number: str,
                          # user_data: Annotated[User, Depends(get_techman_user)
-                         ) -> dict:
+                         ) -> StreamingResponse:
     """Получение деталей заказа.
 
     На вход подаётся строка имени заказа (wo_number).
     Пример ввода:
     ```1277 890WH-2G-GOF```
+
+    Ответ {"data": [...], "headers": {...}} отправляется частями по мере чтения результата sigma nest.
+    Первая часть читается до начала ответа, поэтому ошибка sigma nest возвращается статусом ошибки.
+    """
+    batches = await prefetch_first_batch(batch.to_dicts() async for batch in stream_parts_info_by_wo(wo_number))
+    return StreamingResponse(stream_rows_json(batches), media_type="application/json")
+
+
+@router.get("/get_wo_details/xlsx", tags=["reports"])
+async def export_wo_details(wo_number: str) -> StreamingResponse:
+    """Детали заказа в excel. Части результата sigma nest записываются в файл по мере получения.
+
+    Первая часть читается до начала ответа, поэтому ошибка sigma nest возвращается статусом ошибки.
     """
-    parts = await get_parts_info_by_wo(wo_number)
-    headers = get_translated_keys(parts)
-    return {"data": parts, "headers": headers}
+    batches = await prefetch_first_batch(batch.to_dicts() async for batch in stream_parts_info_by_wo(wo_number))
+    return excel_response(stream_excel(batches, "Детали заказа", translate_dict, only_titled=False),
+                          f"Детали заказа {wo_number}.xlsx")
@@ -0,0 +1,114 @@
+"""Сводный отчёт по деталям: агрегаты по колонкам NumPy."""
+import enum
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from utils.excel_utils import ColumnKind, ExcelColumn
+from settings.translate_dict import translate_dict
+
+# колонки выборки деталей для сводного отчёта в порядке ReportPartDAO.get_parts_summary_columns
+KEY_COLUMNS = ("ProgramName", "WONumber", "MachineName", "Material", "fio_doer")
+VALUE_COLUMNS = ("TotalCuttingTime", "TrueWeight", "TrueArea", "QtyInProcess", "qty_fact")
+SUMMARY_PRECISION = 3
+
+
+class SummaryGroup(enum.StrEnum):
+    """Группировка сводного отчёта по деталям."""
+
+    PROGRAM = "program"
+    WO = "wo"
+    MACHINE = "machine"
+    MATERIAL = "material"
+    DOER = "doer"  # исполнитель, отметивший изготовление детали
+
+
+GROUP_TITLES = {
+    SummaryGroup.PROGRAM: "Программы",
+    SummaryGroup.WO: "Заказы",
+    SummaryGroup.MACHINE: "Машины",
+    SummaryGroup.MATERIAL: "Материалы",
+    SummaryGroup.DOER: "Исполнители",
+}
+
+GROUP_COLUMNS = {
+    SummaryGroup.PROGRAM: "ProgramName",
+    SummaryGroup.WO: "WONumber",
+    SummaryGroup.MACHINE: "MachineName",
+    SummaryGroup.MATERIAL: "Material",
+    SummaryGroup.DOER: "fio_doer",
+}
+
+
+def rows_to_columns(rows: Sequence[Sequence]) -> dict[str, np.ndarray]:
+    """Строки выборки в колонки: ключи группировки - массивы строк, значения - массивы float."""
+    columns = list(zip(*rows, strict=True)) if rows else [()] * (len(KEY_COLUMNS) + len(VALUE_COLUMNS))
+    arrays = {name: np.array(values, dtype=object) for name, values in zip(KEY_COLUMNS, columns, strict=False)}
+    arrays.update({name: np.array(values, dtype=np.float64)
+                   for name, values in zip(VALUE_COLUMNS, columns[len(KEY_COLUMNS):], strict=True)})
+    return arrays
+
+
+def _measures(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Показатели каждой детали. Вес и площадь - на всё количество в работе."""
+    qty_in_process = columns["QtyInProcess"]
+    qty_fact = columns["qty_fact"]
+    return {
+        "cutting_time": columns["TotalCuttingTime"],
+        "weight": columns["TrueWeight"] * qty_in_process,
+        "weight_fact": columns["TrueWeight"] * qty_fact,
+        "area": columns["TrueArea"] * qty_in_process,
+        "QtyInProcess": qty_in_process,
+        "qty_fact": qty_fact,
+        "QtyRemaining": np.maximum(qty_in_process - qty_fact, 0),
+    }
+
+
+def _summary_row(sums: dict[str, float], parts_count: int) -> dict[str, float | int]:
+    """Строка отчёта: суммы показателей, количество деталей и доля выполнения."""
+    row = {"parts_count": parts_count}
+    row.update({name: round(float(value), SUMMARY_PRECISION) for name, value in sums.items()})
+    qty_in_process = sums["QtyInProcess"]
+    row["completion"] = round(float(sums["qty_fact"] / qty_in_process), SUMMARY_PRECISION) if qty_in_process else 0.0
+    return row
+
+
+def summary_totals(columns: dict[str, np.ndarray]) -> dict[str, float | int]:
+    """Итоги по всем деталям."""
+    measures = _measures(columns)
+    return _summary_row({name: values.sum() for name, values in measures.items()}, len(columns["QtyInProcess"]))
+
+
+def group_summary(columns: dict[str, np.ndarray], group: SummaryGroup) -> list[dict]:
+    """Суммы показателей по группе. Строки упорядочены по убыванию времени резки."""
+    keys = columns[GROUP_COLUMNS[group]]
+    if not len(keys):
+        return []
+    labels, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(labels))
+    sums = {name: np.bincount(inverse, weights=values, minlength=len(labels))
+            for name, values in _measures(columns).items()}
+    order = np.argsort(-sums["cutting_time"], kind="stable")
+    return [{"name": labels[index], **_summary_row({name: values[index] for name, values in sums.items()},
+                                                   int(counts[index]))}
+            for index in order]
+
+
+def build_parts_summary(rows: Sequence[Sequence], groups: Sequence[SummaryGroup]) -> dict:
+    """Сводный отчёт: итоги и суммы по каждой группировке."""
+    columns = rows_to_columns(rows)
+    return {"totals": summary_totals(columns),
+            "groups": {group: group_summary(columns, group) for group in dict.fromkeys(groups)}}
+
+
+def summary_excel_sheets(summary: dict) -> list[tuple[str, list[ExcelColumn], list[dict]]]:
+    """Листы excel сводного отчёта: итоги и лист на каждую группировку."""
+    measures = [ExcelColumn(key=key, title=translate_dict.get(key, key),
+                            kind=ColumnKind.INTEGER if key == "parts_count" else ColumnKind.NUMBER)
+                for key in summary["totals"]]
+    sheets = [("Итоги", measures, [summary["totals"]])]
+    for group, rows in summary["groups"].items():
+        name = ExcelColumn(key="name", title=translate_dict[GROUP_COLUMNS[group]], width=30)
+        sheets.append((GROUP_TITLES[group], [name, *measures], rows))
+    return sheets
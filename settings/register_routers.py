@@ -1,17 +1,21 @@
 """Регистрация роутеров приложения."""
+from typing import Annotated
 from pathlib import Path
 
-from fastapi import FastAPI, APIRouter
+from fastapi import Depends, FastAPI, APIRouter
 from fastapi.responses import FileResponse
 
 from config import STATIC_DIR
-from auth.users import fastapi_users
+from auth.users import fastapi_users, get_techman_user
+from auth.models import User
 from auth.router import router as auth_router
 from auth.schemas import UserRead, UserUpdate
+from images.router import router as images_router
 from logist.router import router as logist_router
 from master.router import router as master_router
 from reports.router import router as reports_router
 from techman.router import router as techman_router
+from utils.executors import executors
 from operator_worker.router import router as operator_router
 
 
@@ -34,6 +38,11 @@ def register_routers(app: FastAPI) -> None:
         return FileResponse(file_path, media_type="application/pdf",
                             filename="Инструкция Plasma-Report.pdf")
 
+    @root_router.get("/executors_stats", tags=["root"])
+    def executors_stats(user_data: Annotated[User, Depends(get_techman_user)]) -> dict:  # noqa ARG001
+        """Глубина очереди и загрузка пулов потоков приложения."""
+        return executors.stats()
+
     app.include_router(root_router, tags=["root"])
     # аутентификация, авторизация
     app.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -45,3 +54,4 @@ def register_routers(app: FastAPI) -> None:
     app.include_router(operator_router, prefix="/operator", tags=["operator"])
     app.include_router(logist_router, prefix="/logist", tags=["logist"])
     app.include_router(reports_router, prefix="/reports", tags=["reports"])
+    app.include_router(images_router, prefix="/images", tags=["images"])
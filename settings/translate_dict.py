@@ -78,6 +78,12 @@ translate_dict = {
     "Priority": "Приоритет",
     "program_pic": "Изображение программы",
     "part_pic": "Изображение детали",
+    "parts_count": "Количество позиций",
+    "cutting_time": "Время резки",
+    "weight": "Вес в работе",
+    "weight_fact": "Вес изготовленных",
+    "area": "Площадь в работе",
+    "completion": "Доля выполнения",
 }
 
 
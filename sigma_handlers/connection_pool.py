@@ -0,0 +1,196 @@
+"""Пул соединений с БД sigma nest."""
+import time
+import asyncio
+import threading
+
+from typing import Any, Protocol
+from collections import deque
+from dataclasses import field, dataclass
+from collections.abc import Callable
+
+from logger_config import log
+
+
+class DBAPIConnection(Protocol):
+    """Минимальный интерфейс DB-API соединения (pyodbc, sqlite3)."""
+
+    def cursor(self) -> Any:  # noqa ANN401
+        """Создание курсора."""
+
+    def rollback(self) -> None:
+        """Откат транзакции."""
+
+    def close(self) -> None:
+        """Закрытие соединения."""
+
+
+class PoolTimeoutError(TimeoutError):
+    """Исключение для истечения ожидания свободного соединения пула."""
+
+
+@dataclass
+class _PooledConnection:
+    """Соединение пула с временем последнего возврата."""
+
+    connection: DBAPIConnection
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """Ограниченный потокобезопасный пул DB-API соединений.
+
+    Соединения создаются лениво через connection_factory, не более max_size одновременно.
+    Соединения, простаивавшие дольше max_idle секунд, закрываются. Перед выдачей соединение,
+    простаивавшее дольше health_check_after секунд, проверяется запросом health_check_query.
+    """
+
+    def __init__(self,
+                 connection_factory: Callable[[], DBAPIConnection],
+                 max_size: int = 8,
+                 timeout: float = 30.0,
+                 max_idle: float = 300.0,
+                 health_check_query: str = "SELECT 1",
+                 health_check_after: float = 30.0) -> None:
+        """Инициализация пула соединений."""
+        if max_size < 1:
+            msg = "Размер пула должен быть больше 0."
+            raise ValueError(msg)
+        self._connection_factory = connection_factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_query = health_check_query
+        self.health_check_after = health_check_after
+        self._idle: deque[_PooledConnection] = deque()
+        self._in_use = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._closed = False
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def size(self) -> int:
+        """Количество открытых соединений пула."""
+        with self._condition:
+            return self._in_use + len(self._idle)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Места соединений для задач цикла событий, по одному на соединение пула.
+
+        Задача занимает место до перехода в пул потоков, поэтому поток не ждёт соединение в acquire,
+        пока потоковые чтения, удерживающие соединения между частями, ждут свободный поток.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+        return self._slots
+
+    def stats(self) -> dict[str, int]:
+        """Статистика пула."""
+        with self._condition:
+            return {"max_size": self.max_size, "in_use": self._in_use, "idle": len(self._idle)}
+
+    def acquire(self) -> DBAPIConnection:
+        """Получение соединения из пула.
+
+        Если свободных соединений нет и пул заполнен, ожидает возврата соединения не дольше timeout.
+        """
+        deadline = time.monotonic() + self.timeout
+        self._close_expired()
+        while True:
+            with self._condition:
+                if self._closed:
+                    msg = "Пул соединений sigma nest закрыт."
+                    raise RuntimeError(msg)
+                if self._idle:
+                    pooled = self._idle.pop()  # LIFO: самое "тёплое" соединение
+                    self._in_use += 1
+                elif self._in_use < self.max_size:
+                    pooled = None
+                    self._in_use += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        msg = f"Нет свободных соединений sigma nest за {self.timeout} с."
+                        raise PoolTimeoutError(msg)
+                    continue
+
+            # создание и проверка соединения вне блокировки
+            try:
+                if pooled is None:
+                    return self._connection_factory()
+                if time.monotonic() - pooled.released_at < self.health_check_after or self._is_alive(pooled):
+                    return pooled.connection
+            except Exception:
+                self._forget()
+                raise
+            log.warning("Соединение sigma nest не прошло проверку и будет пересоздано.")
+            self._close_quietly(pooled.connection)
+            self._forget()
+
+    def release(self, connection: DBAPIConnection, *, discard: bool = False) -> None:
+        """Возврат соединения в пул. При discard=True соединение закрывается."""
+        if not discard:
+            try:
+                connection.rollback()  # сброс незавершённой транзакции
+            except Exception as e:
+                log.warning("Ошибка сброса соединения sigma nest: {error}", error=e)
+                discard = True
+        with self._condition:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._condition.notify()
+            else:
+                self._idle.append(_PooledConnection(connection))
+                self._condition.notify()
+                return
+        self._close_quietly(connection)
+
+    def close(self) -> None:
+        """Закрытие всех свободных соединений и запрет выдачи новых."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for pooled in idle:
+            self._close_quietly(pooled.connection)
+
+    def _forget(self) -> None:
+        """Освобождение места соединения, которое не удалось выдать."""
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def _close_expired(self) -> None:
+        """Закрытие соединений, простаивающих дольше max_idle.
+
+        Соединения извлекаются под блокировкой, а закрываются после её освобождения: закрытие
+        сетевого соединения может занять время и не должно задерживать выдачу и возврат соединений.
+        """
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            # самые старые соединения находятся в начале очереди
+            while self._idle and now - self._idle[0].released_at > self.max_idle:
+                expired.append(self._idle.popleft())
+        for pooled in expired:
+            self._close_quietly(pooled.connection)
+
+    def _is_alive(self, pooled: _PooledConnection) -> bool:
+        """Проверка работоспособности соединения."""
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            cursor.close()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _close_quietly(connection: DBAPIConnection) -> None:
+        """Закрытие соединения без выброса исключений."""
+        try:
+            connection.close()
+        except Exception as e:
+            log.debug("Ошибка закрытия соединения sigma nest: {error}", error=e)
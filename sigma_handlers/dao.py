@@ -0,0 +1,102 @@
+"""DAO локальной копии данных sigma nest."""
+import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.base_dao import BaseDAO, writes
+from sigma_handlers.models import SigmaWoStage, SigmaSyncState, SigmaProgramStage
+
+
+class _StageDAO(BaseDAO):
+    """Общие методы таблиц локальной копии sigma nest."""
+
+    key_field: str = None  # уникальное поле записи sigma
+    fields: tuple[str, ...] = ()  # поля, загружаемые из sigma
+    delete_chunk_size: int = 500  # ключей в одном запросе удаления (ограничение параметров sqlite)
+
+    @writes
+    async def upsert(self, rows: list[dict]) -> int:
+        """Вставка или обновление записей по ключевому полю. Повторная загрузка тех же строк ничего не меняет."""
+        if not rows:
+            return 0
+        table = self.model.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.key_field],
+            set_={field: stmt.excluded[field] for field in self.fields if field != self.key_field},
+        )
+        await self._session.execute(stmt, [{field: row.get(field) for field in self.fields} for row in rows])
+        return len(rows)
+
+    @writes
+    async def delete_missing(self, keys: set[str]) -> int:
+        """Удаление записей, ключей которых нет среди keys. Возвращает количество удалённых записей."""
+        column = getattr(self.model, self.key_field)
+        stale = [key for key in await self._session.scalars(select(column)) if key not in keys]
+        for start in range(0, len(stale), self.delete_chunk_size):
+            chunk = stale[start:start + self.delete_chunk_size]
+            await self._session.execute(delete(self.model).where(column.in_(chunk)))
+        return len(stale)
+
+    @writes
+    async def delete_before(self, date_field: str, start: datetime.datetime) -> int:
+        """Удаление записей, у которых date_field раньше start. Возвращает количество удалённых записей."""
+        result = await self._session.execute(delete(self.model).where(getattr(self.model, date_field) < start))
+        return result.rowcount
+
+    async def _find_between(self, date_field: str, start: datetime.datetime, end: datetime.datetime | None,
+                            *, strict: bool = False) -> list[dict]:
+        """Получение записей, у которых date_field попадает в интервал, в порядке убывания date_field."""
+        column = getattr(self.model, date_field)
+        query = select(*(getattr(self.model, field) for field in self.fields))
+        query = query.where(column > start if strict else column >= start)
+        if end is not None:
+            query = query.where(column < end if strict else column <= end)
+        result = await self._session.execute(query.order_by(column.desc()))
+        return [dict(row._mapping) for row in result]  # noqa SLF001
+
+
+class SigmaProgramStageDAO(_StageDAO):
+    """DAO программ sigma nest, загруженных синхронизацией."""
+
+    model = SigmaProgramStage
+    key_field = "ProgramName"
+    fields = ("ProgramName", "PostDateTime", "Material", "UserName", "WONumber")
+
+    async def find_by_post_date(self, start: datetime.datetime, end: datetime.datetime | None) -> list[dict]:
+        """Программы, опубликованные в интервале [start, end]. Повторяет условия запроса programs_name_query."""
+        return await self._find_between("PostDateTime", start, end)
+
+
+class SigmaWoStageDAO(_StageDAO):
+    """DAO заказов sigma nest, загруженных синхронизацией."""
+
+    model = SigmaWoStage
+    key_field = "WONumber"
+    fields = ("WONumber", "CustomerName", "WODate", "OrderDate", "WOData1", "WOData2", "DateCreated")
+
+    async def find_by_date_created(self, start: datetime.datetime, end: datetime.datetime) -> list[dict]:
+        """Заказы, созданные в интервале (start, end). Повторяет условия запроса work_orders_query."""
+        return await self._find_between("DateCreated", start, end, strict=True)
+
+
+class SigmaSyncStateDAO(BaseDAO):
+    """DAO состояния инкрементальной синхронизации sigma nest."""
+
+    model = SigmaSyncState
+
+    async def get_state(self, stream: str) -> SigmaSyncState | None:
+        """Получение состояния потока синхронизации."""
+        result = await self._session.execute(select(self.model).where(self.model.stream == stream))
+        return result.scalar_one_or_none()
+
+    @writes
+    async def save_state(self, stream: str, watermark: datetime.datetime, synced_from: datetime.datetime,
+                         last_synced_at: datetime.datetime) -> None:
+        """Сохранение состояния потока синхронизации."""
+        values = {"stream": stream, "watermark": watermark, "synced_from": synced_from,
+                  "last_synced_at": last_synced_at}
+        stmt = sqlite_insert(self.model.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(index_elements=["stream"], set_=values)
+        await self._session.execute(stmt)
@@ -1,39 +1,87 @@
 """Класс взаимодействия с sigma nest."""
+import threading
+
 from types import TracebackType
 from typing import Self
+from collections.abc import Iterator
 
 import pyodbc
 
 from config import settings
+from sigma_handlers.connection_pool import ConnectionPool
+
+_sigma_pool: ConnectionPool | None = None
+_sigma_pool_lock = threading.Lock()
+
+
+def create_sigma_connection() -> pyodbc.Connection:
+    """Создание нового соединения с sigma nest."""
+    return pyodbc.connect(
+        "DRIVER=SQL Server;"
+        "SERVER="
+        + settings.sigma_server
+        + ";DATABASE="
+        + settings.sigma_database
+        + ";UID="
+        + settings.sigma_username
+        + ";PWD="
+        + settings.sigma_password,
+    )
+
+
+def get_sigma_pool() -> ConnectionPool:
+    """Получение общего для всех запросов пула соединений sigma nest."""
+    global _sigma_pool  # noqa PLW0603
+    if _sigma_pool is None:
+        with _sigma_pool_lock:
+            if _sigma_pool is None:
+                _sigma_pool = ConnectionPool(
+                    create_sigma_connection,
+                    max_size=settings.sigma_pool_size,
+                    timeout=settings.sigma_pool_timeout,
+                    max_idle=settings.sigma_pool_max_idle,
+                    health_check_after=settings.sigma_pool_health_check_after,
+                )
+    return _sigma_pool
+
+
+def close_sigma_pool() -> None:
+    """Закрытие общего пула соединений sigma nest."""
+    global _sigma_pool  # noqa PLW0603
+    with _sigma_pool_lock:
+        if _sigma_pool is not None:
+            _sigma_pool.close()
+            _sigma_pool = None
 
 
 class Database:
     """Взаимодействие с БД MSSQL."""
 
-    def __init__(self) -> None:
-        """Инициализация класса взаимодействия с sigma nest."""
-        self.connection = None
-        self.sigma_server = settings.sigma_server
-        self.sigma_database = settings.sigma_database
-        self.sigma_username = settings.sigma_username
-        self.sigma_password = settings.sigma_password
+    def __init__(self, pool: ConnectionPool | None = None) -> None:
+        """Инициализация класса взаимодействия с sigma nest.
+
+        По умолчанию соединение берётся из общего пула get_sigma_pool().
+        """
+        self.pool = pool
         self.connection = None
         self.cursor = None
+        self._broken = False
 
     def connect(self) -> None:
-        """Подключение к базе данных и создание курсора."""
-        self.connection = pyodbc.connect(
-            "DRIVER=SQL Server;"
-            "SERVER="
-            + self.sigma_server
-            + ";DATABASE="
-            + self.sigma_database
-            + ";UID="
-            + self.sigma_username
-            + ";PWD="
-            + self.sigma_password,
-        )
-        self.cursor = self.connection.cursor()
+        """Получение соединения из пула и создание курсора.
+
+        Если курсор создать не удалось, соединение закрывается и его место в пуле освобождается.
+        """
+        if self.pool is None:
+            self.pool = get_sigma_pool()
+        connection = self.pool.acquire()
+        try:
+            self.cursor = connection.cursor()
+        except BaseException:
+            self.pool.release(connection, discard=True)
+            raise
+        self.connection = connection
+        self._broken = False
 
     def execute_query(self, query: str, params: tuple = ()) -> None:
         """Выполнение запроса с поддержкой параметров."""
@@ -49,15 +97,28 @@ class Database:
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
 
+    def fetch_batches(self, query: str, params: tuple = (), batch_size: int = 1000) -> Iterator[list]:
+        """Получение данных из запроса частями по batch_size строк через fetchmany."""
+        self.cursor.execute(query, params)
+        while rows := self.cursor.fetchmany(batch_size):
+            yield rows
+
     def fetch_one(self, query: str, params: tuple = ()) -> list:
         """Получение одной записи из запроса."""
         self.cursor.execute(query, params)
         return self.cursor.fetchone()
 
     def close(self) -> None:
-        """Закрытие соединения с базой данных."""
-        if self.connection:
-            self.connection.close()
+        """Возврат соединения в пул. Соединение после ошибки драйвера закрывается."""
+        if self.cursor is not None:
+            try:
+                self.cursor.close()
+            except Exception:
+                self._broken = True
+            self.cursor = None
+        if self.connection is not None:
+            self.pool.release(self.connection, discard=self._broken)
+            self.connection = None
 
     def __enter__(self) -> Self:
         """Запуск соединения с БД."""
@@ -68,5 +129,7 @@ class Database:
                  exc_type: type[BaseException] | None,
                  exc_val: BaseException | None,
                  exc_tb: TracebackType | None) -> None:
-        """Закрытие соединения с БД."""
+        """Возврат соединения в пул."""
+        if exc_type is not None and issubclass(exc_type, pyodbc.Error):
+            self._broken = True
         self.close()
@@ -0,0 +1,38 @@
+"""Модели локальной копии данных sigma nest."""
+import datetime
+
+from sqlalchemy import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.database import Base, uniq_string
+
+
+class SigmaProgramStage(Base):
+    """Программы sigma nest, загруженные инкрементальной синхронизацией."""
+
+    ProgramName: Mapped[uniq_string] = mapped_column(index=True)  # ProgramName
+    PostDateTime: Mapped[datetime] = mapped_column(TIMESTAMP, index=True)  # PostDateTime
+    Material: Mapped[str] = mapped_column(default="", nullable=True)  # Material
+    UserName: Mapped[str] = mapped_column(default="", nullable=True)  # UserName
+    WONumber: Mapped[str] = mapped_column(default="", nullable=True)  # заказы программы через запятую
+
+
+class SigmaWoStage(Base):
+    """Заказы sigma nest, загруженные инкрементальной синхронизацией."""
+
+    WONumber: Mapped[uniq_string] = mapped_column(index=True)  # WONumber
+    CustomerName: Mapped[str] = mapped_column(default="", nullable=True)  # CustomerName
+    WODate: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)  # WODate
+    OrderDate: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)  # OrderDate
+    WOData1: Mapped[str] = mapped_column(default="", nullable=True)  # WOData1
+    WOData2: Mapped[str] = mapped_column(default="", nullable=True)  # WOData2
+    DateCreated: Mapped[datetime] = mapped_column(TIMESTAMP, index=True)  # DateCreated
+
+
+class SigmaSyncState(Base):
+    """Состояние инкрементальной синхронизации потока данных sigma nest."""
+
+    stream: Mapped[uniq_string]  # имя потока: programs, wos
+    watermark: Mapped[datetime] = mapped_column(TIMESTAMP)  # максимальная загруженная метка времени
+    synced_from: Mapped[datetime] = mapped_column(TIMESTAMP)  # начало загруженного интервала
+    last_synced_at: Mapped[datetime] = mapped_column(TIMESTAMP)  # время последней успешной синхронизации
@@ -0,0 +1,116 @@
+"""Кэш результатов запросов к sigma nest."""
+import time
+import asyncio
+import functools
+
+from typing import Any, TypeVar, ParamSpec
+from collections import OrderedDict
+from collections.abc import Callable, Awaitable
+
+from config import settings
+from logger_config import log
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class SigmaQueryCache:
+    """Read-through кэш с TTL для каждого запроса и вытеснением LRU.
+
+    Ключ кэша - имя запроса и его параметры. Одновременные одинаковые запросы объединяются:
+    в sigma nest уходит только первый, остальные ожидают его результат. Загрузка завершается и сохраняется
+    в кэше, даже если запросивший её отменён.
+    Значения из кэша отдаются без копирования и не должны изменяться вызывающим кодом.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Инициализация кэша."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: tuple, loader: Callable[[], Awaitable[R]], ttl: float) -> R:
+        """Получение значения из кэша или загрузка через loader."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            self.misses += 1
+            # загрузка идёт отдельной задачей: отмена любого из ожидающих не отменяет её для остальных
+            in_flight = asyncio.create_task(self._load(key, loader, ttl, self._generation),
+                                            name=f"sigma-cache-{key[0]}")
+            in_flight.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = in_flight
+        else:
+            self.hits += 1
+        return await asyncio.shield(in_flight)
+
+    async def _load(self, key: tuple, loader: Callable[[], Awaitable[R]], ttl: float, generation: int) -> R:
+        """Загрузка значения и сохранение в кэше, если с начала запроса не было инвалидации."""
+        try:
+            value = await loader()
+        finally:
+            self._in_flight.pop(key, None)
+        # результат, загруженный до инвалидации, не сохраняется
+        if generation == self._generation:
+            self._store(key, value, ttl)
+        return value
+
+    def _store(self, key: tuple, value: R, ttl: float) -> None:
+        """Сохранение значения с вытеснением давно не использованных записей."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, query_name: str | None = None) -> int:
+        """Удаление записей запроса query_name или всего кэша. Возвращает количество удалённых записей."""
+        self._generation += 1
+        if query_name is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key in self._entries if key[0] == query_name]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        log.debug("Кэш sigma nest {query_name} очищен, удалено записей: {removed}",
+                  query_name=query_name or "*", removed=removed)
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        """Статистика кэша."""
+        return {"entries": len(self._entries), "in_flight": len(self._in_flight),
+                "hits": self.hits, "misses": self.misses}
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """Получение исключения загрузки, если все ожидающие её были отменены."""
+    if not task.cancelled():
+        task.exception()
+
+
+sigma_cache = SigmaQueryCache(max_entries=settings.sigma_cache_max_entries)
+
+
+def sigma_cached(query_name: str, ttl: float) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Декоратор кэширования асинхронной функции запроса к sigma nest на ttl секунд."""
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            key = (query_name, args, tuple(sorted(kwargs.items())))
+            return await sigma_cache.get_or_load(key, lambda: func(*args, **kwargs), ttl)
+
+        return wrapper
+
+    return decorator
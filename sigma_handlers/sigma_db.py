@@ -1,17 +1,32 @@
 """Взаимодействие с БД sigma nest."""
-from datetime import date
-
-from sigma_handlers.sigma_utils import get_any_sigma_data, get_full_parts_data_sql, make_async_sigma_request
+from datetime import date, datetime
+from collections.abc import AsyncIterator
+
+from config import settings
+from sigma_handlers.sigma_cache import sigma_cached
+from sigma_handlers.sigma_utils import (
+    SigmaBatch,
+    chunked,
+    get_any_sigma_data,
+    merge_sigma_streams,
+    stream_sigma_batches,
+    make_async_sigma_request,
+    create_full_parts_data_query,
+)
 from sigma_handlers.sql_queries import (
     parts_by_wo_query,
     work_orders_query,
     programs_name_query,
     parts_by_program_query,
     parts_with_sigma_qty_query,
+    programs_posted_since_query,
     single_date_programs_name_query,
+    work_orders_created_since_query,
+    program_names_present_since_query,
 )
 
 
+@sigma_cached("program_names", ttl=settings.sigma_cache_programs_ttl)
 async def get_program_names(start_date: date, end_date: date) -> list[dict]:
     """Получение списка созданных программ sigma nest программ."""
     functions_params = (
@@ -21,6 +36,7 @@ async def get_program_names(start_date: date, end_date: date) -> list[dict]:
     return await make_async_sigma_request(get_any_sigma_data, functions_params)
 
 
+@sigma_cached("single_date_program_names", ttl=settings.sigma_cache_programs_ttl)
 async def single_date_get_program_names(start_date: date) -> list[dict]:
     """Получение списка созданных программ sigma nest программ."""
     functions_params = (
@@ -30,6 +46,7 @@ async def single_date_get_program_names(start_date: date) -> list[dict]:
     return await make_async_sigma_request(get_any_sigma_data, functions_params)
 
 
+@sigma_cached("wo_names", ttl=settings.sigma_cache_orders_ttl)
 async def get_wo_names(start_date: date, end_date: date) -> list[dict]:
     """Получение списка заказов."""
     functions_params = (
@@ -39,6 +56,33 @@ async def get_wo_names(start_date: date, end_date: date) -> list[dict]:
     return await make_async_sigma_request(get_any_sigma_data, functions_params)
 
 
+async def get_programs_posted_since(watermark: datetime) -> list[dict]:
+    """Получение программ, опубликованных начиная с watermark, для инкрементальной синхронизации."""
+    function_params = (
+        programs_posted_since_query,
+        (watermark,),
+    )
+    return await make_async_sigma_request(get_any_sigma_data, function_params)
+
+
+async def get_program_names_present_since(synced_from: datetime) -> set[str]:
+    """Получение имён программ, опубликованных начиная с synced_from и ещё присутствующих в sigma nest."""
+    function_params = (
+        program_names_present_since_query,
+        (synced_from,),
+    )
+    return {row["ProgramName"] for row in await make_async_sigma_request(get_any_sigma_data, function_params)}
+
+
+async def get_wos_created_since(watermark: datetime) -> list[dict]:
+    """Получение заказов, созданных начиная с watermark, для инкрементальной синхронизации."""
+    function_params = (
+        work_orders_created_since_query,
+        (watermark,),
+    )
+    return await make_async_sigma_request(get_any_sigma_data, function_params)
+
+
 async def get_parts_by_program(program_name: str) -> list[dict]:
     """Получение деталей программы."""
     function_params = (
@@ -57,9 +101,14 @@ async def get_parts_by_wo(wo_number: str) -> list[dict]:
     return await make_async_sigma_request(get_any_sigma_data, function_params)
 
 
-async def get_parts_data_by_programs(programs: list[str]) -> list[dict]:
-    """Получение полной информации с деталями по списку программ."""
-    return await make_async_sigma_request(get_full_parts_data_sql, (programs,))
+def stream_parts_data_by_programs(programs: list[str]) -> AsyncIterator[SigmaBatch]:
+    """Потоковое получение полной информации с деталями по списку программ частями результата.
+
+    Список программ разбивается на части не длиннее settings.sigma_in_chunk_size (лимит ODBC - 2100 параметров
+    в запросе), части читаются параллельно в пуле sigma nest. Части результата выдаются в порядке списка программ.
+    """
+    chunks = chunked(list(dict.fromkeys(programs)), settings.sigma_in_chunk_size)
+    return merge_sigma_streams([stream_sigma_batches(*create_full_parts_data_query(chunk)) for chunk in chunks])
 
 
 async def get_parts_info_by_wo(wo_number: str) -> list[dict]:
@@ -71,5 +120,10 @@ async def get_parts_info_by_wo(wo_number: str) -> list[dict]:
     return await make_async_sigma_request(get_any_sigma_data, function_params)
 
 
+def stream_parts_info_by_wo(wo_number: str) -> AsyncIterator[SigmaBatch]:
+    """Потоковое получение полной информации с деталями по заказу частями результата."""
+    return stream_sigma_batches(parts_with_sigma_qty_query, (wo_number,))
+
+
 if __name__ == "__main__":
     pass
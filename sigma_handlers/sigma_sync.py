@@ -0,0 +1,215 @@
+"""Инкрементальная синхронизация списков программ и заказов sigma nest в локальную БД."""
+import asyncio
+import datetime
+import contextlib
+
+from typing import Protocol
+from dataclasses import dataclass
+from collections.abc import Callable, Awaitable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import settings
+from db.database import read_session_maker, async_session_maker
+from logger_config import log
+from sigma_handlers.dao import SigmaWoStageDAO, SigmaSyncStateDAO, SigmaProgramStageDAO
+from sigma_handlers.sigma_db import (
+    get_wo_names,
+    get_program_names,
+    get_wos_created_since,
+    get_programs_posted_since,
+    single_date_get_program_names,
+    get_program_names_present_since,
+)
+
+
+class SigmaSyncSource(Protocol):
+    """Источник новых строк sigma nest."""
+
+    async def programs_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Программы с PostDateTime >= watermark."""
+
+    async def program_names_present_since(self, synced_from: datetime.datetime) -> set[str]:
+        """Имена программ с PostDateTime >= synced_from, ещё присутствующих в sigma nest."""
+
+    async def wos_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Заказы с DateCreated >= watermark."""
+
+
+class SigmaNestSource:
+    """Источник новых строк - БД sigma nest."""
+
+    async def programs_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Программы с PostDateTime >= watermark."""
+        return await get_programs_posted_since(watermark)
+
+    async def program_names_present_since(self, synced_from: datetime.datetime) -> set[str]:
+        """Имена программ с PostDateTime >= synced_from, ещё присутствующих в sigma nest."""
+        return await get_program_names_present_since(synced_from)
+
+    async def wos_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Заказы с DateCreated >= watermark."""
+        return await get_wos_created_since(watermark)
+
+
+@dataclass(frozen=True)
+class _Stream:
+    """Поток синхронизации: откуда читать, куда писать и по какому полю вести метку времени.
+
+    present - ключи записей, которые ещё есть в sigma nest. Если задан, остальные записи удаляются.
+    """
+
+    name: str
+    watermark_field: str
+    dao: type[SigmaProgramStageDAO | SigmaWoStageDAO]
+    fetch: Callable[[SigmaSyncSource, datetime.datetime], Awaitable[list[dict]]]
+    present: Callable[[SigmaSyncSource, datetime.datetime], Awaitable[set[str]]] | None = None
+
+
+PROGRAMS = _Stream("programs", "PostDateTime", SigmaProgramStageDAO, lambda source, mark: source.programs_since(mark),
+                   lambda source, synced_from: source.program_names_present_since(synced_from))
+WOS = _Stream("wos", "DateCreated", SigmaWoStageDAO, lambda source, mark: source.wos_since(mark))
+
+
+def _single_date_program(program: dict) -> dict:
+    """Программа локальной копии в формате single_date_programs_name_query: заказы в WONumbers через ','."""
+    single_date = {key: value for key, value in program.items() if key != "WONumber"}
+    wo_numbers = program["WONumber"]
+    single_date["WONumbers"] = ",".join(wo_numbers.split(", ")) if wo_numbers is not None else None
+    return single_date
+
+
+class SigmaIncrementalSync:
+    """Фоновая инкрементальная синхронизация sigma nest.
+
+    Для каждого потока хранится метка времени (watermark) последней загруженной строки. Каждый проход
+    запрашивает строки с меткой >= watermark - overlap и вставляет их с обновлением по ключу, поэтому повторная
+    загрузка строк безопасна, а прерванная синхронизация продолжается с сохранённой метки. Запас overlap
+    догружает программы, опубликованные раньше метки, строки PIP которых появились позже.
+    Локальная копия хранит строки за последние backfill_days: начало копии (synced_from) сдвигается
+    на каждом проходе, более старые строки и программы, которых уже нет в sigma nest, удаляются.
+    """
+
+    def __init__(self,
+                 session_maker: async_sessionmaker[AsyncSession],
+                 source: SigmaSyncSource,
+                 interval: float = 60.0,
+                 backfill_days: int = 90,
+                 max_lag: float = 300.0,
+                 overlap: float = 86400.0,
+                 read_session_maker: async_sessionmaker[AsyncSession] | None = None) -> None:
+        """Инициализация синхронизации. Чтение локальной копии идёт через read_session_maker, если он задан."""
+        self._session_maker = session_maker
+        self._read_session_maker = read_session_maker or session_maker
+        self._source = source
+        self.interval = interval
+        self.backfill_days = backfill_days
+        self.max_lag = max_lag
+        self.overlap = overlap
+        self._task: asyncio.Task | None = None
+
+    async def sync_once(self) -> dict[str, int]:
+        """Один проход синхронизации всех потоков. Возвращает количество загруженных строк по потокам."""
+        return {stream.name: await self._sync_stream(stream) for stream in (PROGRAMS, WOS)}
+
+    async def _sync_stream(self, stream: _Stream) -> int:
+        """Загрузка новых строк одного потока и сдвиг его метки времени в одной транзакции.
+
+        Строки запрашиваются у sigma nest до открытия транзакции: единственное соединение записи
+        не занимается на время сетевого запроса.
+        """
+        now = datetime.datetime.now()  # noqa DTZ005 sigma nest хранит локальное время
+        async with self._read_session_maker() as session:
+            state = await SigmaSyncStateDAO(session).get_state(stream.name)
+        synced_from = datetime.datetime.combine(now.date() - datetime.timedelta(days=self.backfill_days),
+                                                datetime.time.min)
+        if state is None or state.synced_from > synced_from:  # первичная загрузка или увеличение backfill_days
+            watermark = synced_from
+        else:
+            watermark = max(state.watermark, synced_from)
+        fetch_from = max(watermark - datetime.timedelta(seconds=self.overlap), synced_from)
+
+        rows = await stream.fetch(self._source, fetch_from)
+        # ключи запрашиваются после строк: новая строка из rows не может оказаться удалённой
+        present = await stream.present(self._source, synced_from) if stream.present else None
+        new_watermark = max((row[stream.watermark_field] for row in rows), default=watermark)
+        async with self._session_maker() as session, session.begin():
+            await stream.dao(session).upsert(rows)
+            deleted = await stream.dao(session).delete_before(stream.watermark_field, synced_from)
+            deleted += await stream.dao(session).delete_missing(present) if present is not None else 0
+            await SigmaSyncStateDAO(session).save_state(stream.name, max(new_watermark, watermark), synced_from, now)
+        if rows or deleted:
+            log.debug("Синхронизация sigma {stream}: загружено {count} строк, удалено {deleted}, метка {watermark}",
+                      stream=stream.name, count=len(rows), deleted=deleted, watermark=new_watermark)
+        return len(rows)
+
+    async def covers(self, stream_name: str, start: datetime.datetime) -> bool:
+        """Проверка, что локальная копия потока актуальна и содержит данные начиная со start."""
+        async with self._read_session_maker() as session:
+            state = await SigmaSyncStateDAO(session).get_state(stream_name)
+        if state is None or state.synced_from > start:
+            return False
+        lag = datetime.datetime.now() - state.last_synced_at  # noqa DTZ005
+        return lag.total_seconds() <= self.max_lag
+
+    async def get_program_names(self, start_date: datetime.date, end_date: datetime.date | None) -> list[dict]:
+        """Список программ из локальной копии, если она покрывает интервал, иначе из sigma nest.
+
+        При end_date=None возвращаются все программы, начиная со start_date, с ключом и разделителем
+        заказов запроса single_date_programs_name_query.
+        """
+        start = datetime.datetime.combine(start_date, datetime.time.min)
+        end = datetime.datetime.combine(end_date, datetime.time.min) if end_date else None
+        if not await self.covers(PROGRAMS.name, start):
+            if end_date is None:
+                return await single_date_get_program_names(start_date)
+            return await get_program_names(start_date, end_date)
+        async with self._read_session_maker() as session:
+            programs = await SigmaProgramStageDAO(session).find_by_post_date(start, end)
+        if end_date is None:
+            return [_single_date_program(program) for program in programs]
+        return programs
+
+    async def get_wo_names(self, start_date: datetime.date, end_date: datetime.date) -> list[dict]:
+        """Список заказов из локальной копии, если она покрывает интервал, иначе из sigma nest."""
+        start = datetime.datetime.combine(start_date, datetime.time.min)
+        end = datetime.datetime.combine(end_date, datetime.time.min)
+        if not await self.covers(WOS.name, start):
+            return await get_wo_names(start_date, end_date)
+        async with self._read_session_maker() as session:
+            return await SigmaWoStageDAO(session).find_by_date_created(start, end)
+
+    async def run_forever(self) -> None:
+        """Периодическая синхронизация. Ошибки прохода логируются, следующий проход продолжает с метки."""
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as e:
+                log.error("Ошибка инкрементальной синхронизации sigma nest.")
+                log.exception(e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запуск фоновой синхронизации."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever(), name="sigma-sync")
+            log.info("Инкрементальная синхронизация sigma nest запущена.")
+
+    async def stop(self) -> None:
+        """Остановка фоновой синхронизации."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+sigma_sync = SigmaIncrementalSync(
+    async_session_maker,
+    SigmaNestSource(),
+    interval=settings.sigma_sync_interval,
+    backfill_days=settings.sigma_sync_backfill_days,
+    max_lag=settings.sigma_sync_max_lag,
+    overlap=settings.sigma_sync_overlap,
+    read_session_maker=read_session_maker,
+)
@@ -1,36 +1,130 @@
 """Утилиты для работы с БД sigma nest."""
+import asyncio
+import contextlib
 
-from asyncio import get_running_loop
-from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from collections.abc import Callable, Iterator, Sequence, AsyncIterator
+
+from config import settings
 
 # from utils.common_utils import create_sorted_named_cols
-from sigma_handlers.database import Database
+from utils.executors import ExecutorName, executors
+from sigma_handlers.database import Database, get_sigma_pool
 from sigma_handlers.sql_queries import create_placeholders_params_query
 
 
+@dataclass(frozen=True, slots=True)
+class SigmaBatch:
+    """Часть результата запроса sigma nest: имена колонок и строки-кортежи."""
+
+    columns: tuple[str, ...]
+    rows: Sequence[Sequence]
+
+    def to_dicts(self) -> list[dict]:
+        """Строки в виде словарей."""
+        return [dict(zip(self.columns, row, strict=False)) for row in self.rows]
+
+    def to_columns(self) -> dict[str, tuple]:
+        """Данные в виде колонок: имя колонки - кортеж значений."""
+        if not self.rows:
+            return dict.fromkeys(self.columns, ())
+        return dict(zip(self.columns, zip(*self.rows, strict=True), strict=True))
+
+
 async def make_async_sigma_request(sync_func: Callable, params: tuple | None = None) -> list[dict]:
-    """Запуск sync_func в новом потоке."""
-    loop = get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, sync_func, *params)
+    """Запуск sync_func в общем пуле потоков запросов sigma nest. Место соединения занимается до запуска."""
+    async with get_sigma_pool().slots:
+        return await executors.run(ExecutorName.SIGMA, sync_func, *(params or ()))
+
+
+def iter_sigma_batches(query: str, params: tuple | None = (), batch_size: int | None = None) -> Iterator[SigmaBatch]:
+    """Получение данных из базы sigma nest по запросу query частями по batch_size строк.
+
+    Соединение занято, пока итератор не исчерпан или не закрыт.
+    """
+    batch_size = batch_size or settings.sigma_fetch_batch_size
+    with Database() as db:
+        columns = None
+        for rows in db.fetch_batches(query, params, batch_size):
+            if columns is None:
+                columns = tuple(db.get_columns())
+            yield SigmaBatch(columns, rows)
+
+
+async def stream_sigma_batches(query: str, params: tuple | None = (),
+                               batch_size: int | None = None) -> AsyncIterator[SigmaBatch]:
+    """Асинхронное получение данных из базы sigma nest частями. Каждая часть читается в пуле sigma nest.
+
+    Место соединения занимается на всё время чтения до первого перехода в пул потоков.
+    """
+    async with get_sigma_pool().slots:
+        batches = iter_sigma_batches(query, params, batch_size)
+        try:
+            while (batch := await executors.run(ExecutorName.SIGMA, next, batches, None)) is not None:
+                yield batch
+        finally:
+            await executors.run(ExecutorName.SIGMA, batches.close)
+
+
+async def merge_sigma_streams(streams: Sequence[AsyncIterator[SigmaBatch]]) -> AsyncIterator[SigmaBatch]:
+    """Параллельное чтение потоков sigma nest. Части выдаются в порядке потоков.
+
+    Потоки читаются одновременно, части каждого копятся в своём буфере. Части текущего потока выдаются
+    по мере получения, следующие потоки выдаются из буфера после его завершения.
+    При ошибке любого потока остальные закрываются и ошибка сразу передаётся потребителю.
+    """
+    buffers: list[asyncio.Queue[SigmaBatch | None]] = [asyncio.Queue() for _ in streams]
+    failure: asyncio.Future[Exception] = asyncio.get_running_loop().create_future()
+
+    async def pump(stream: AsyncIterator[SigmaBatch], buffer: asyncio.Queue[SigmaBatch | None]) -> None:
+        try:
+            async with contextlib.aclosing(stream):
+                async for batch in stream:
+                    buffer.put_nowait(batch)
+        except Exception as e:
+            if not failure.done():
+                failure.set_result(e)
+        else:
+            buffer.put_nowait(None)
+
+    async def next_batch(buffer: asyncio.Queue[SigmaBatch | None]) -> SigmaBatch | None:
+        getter = asyncio.ensure_future(buffer.get())
+        try:
+            await asyncio.wait((getter, failure), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if failure.done():
+            raise failure.result()
+        return getter.result()
+
+    tasks = [asyncio.create_task(pump(stream, buffer)) for stream, buffer in zip(streams, buffers, strict=True)]
+    try:
+        for buffer in buffers:
+            while (batch := await next_batch(buffer)) is not None:
+                yield batch
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 def get_any_sigma_data(query: str, params: tuple | None = ()) -> list[dict]:
     """Получение данных из базы sigma nest по запросу query."""
-    with Database() as db:
-        result = db.fetch_all(query, params)
-        columns = tuple(db.get_columns())
-    return [dict(zip(columns, row, strict=False)) for row in result]
+    return [row for batch in iter_sigma_batches(query, params) for row in batch.to_dicts()]
 
 
-def get_full_parts_data_sql(programs: list[str]) -> list[dict]:
-    """Создание запроса для получения полных данных по списку программам."""
+def create_full_parts_data_query(programs: Sequence[str]) -> tuple[str, tuple]:
+    """Создание запроса и параметров для получения полных данных по списку программ."""
     placeholders = ", ".join("?" for _ in programs)
-    query = create_placeholders_params_query(placeholders)
+    return create_placeholders_params_query(placeholders), tuple(programs)
 
-    with Database() as db:
-        params = tuple(programs)
-        result = db.fetch_all(query, params)
-        columns = tuple(db.get_columns())
-    return [dict(zip(columns, row, strict=False)) for row in result]
+
+def get_full_parts_data_sql(programs: list[str]) -> list[dict]:
+    """Получение полных данных по списку программ."""
+    return get_any_sigma_data(*create_full_parts_data_query(programs))
+
+
+def chunked(items: Sequence, size: int) -> list[Sequence]:
+    """Разбиение последовательности на части размером не более size."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
@@ -72,6 +72,51 @@ single_date_programs_name_query = f"""
         MAX(p.PostDateTime) DESC
 """
 
+# запрос инкрементальной синхронизации: программы, опубликованные начиная с метки времени
+programs_posted_since_query = f"""
+    SELECT
+        p.ProgramName,
+        p.PostDateTime,
+        p.Material,
+        us.UserName,
+        STUFF((
+            SELECT DISTINCT ', ' + f_inner.WONumber
+            FROM dbo.{full_table} f_inner
+            WHERE f_inner.ProgramName = p.ProgramName
+            FOR XML PATH(''), TYPE).value('.', 'NVARCHAR(MAX)'), 1, 2, '') AS WONumber
+    FROM
+        dbo.{program_table} p
+    INNER JOIN
+        dbo.{sigma_users_table} us
+    ON
+        p.PostedByUserID = us.userid
+    WHERE
+        p.PostDateTime >= ? -- watermark
+        AND EXISTS (
+            SELECT 1
+            FROM dbo.{full_table} f
+            WHERE f.ProgramName = p.ProgramName
+        )
+    ORDER BY
+        p.PostDateTime
+"""
+
+# запрос инкрементальной синхронизации: имена программ, опубликованных начиная с даты и ещё присутствующих
+# в full_table. Программы локальной копии, которых нет в ответе, удаляются
+program_names_present_since_query = f"""
+    SELECT
+        p.ProgramName
+    FROM
+        dbo.{program_table} p
+    WHERE
+        p.PostDateTime >= ? -- synced_from
+        AND EXISTS (
+            SELECT 1
+            FROM dbo.{full_table} f
+            WHERE f.ProgramName = p.ProgramName
+        )
+"""
+
 work_orders_query = f"""
             SELECT
                 WONumber,
@@ -87,6 +132,21 @@ work_orders_query = f"""
             ORDER BY DateCreated DESC
             """
 
+# запрос инкрементальной синхронизации: заказы, созданные начиная с метки времени
+work_orders_created_since_query = f"""
+            SELECT
+                WONumber,
+                CustomerName,
+                WODate,
+                OrderDate,
+                WOData1,
+                WOData2,
+                DateCreated
+            FROM dbo.{work_orders_table}
+                WHERE DateCreated >= ? --watermark
+            ORDER BY DateCreated
+            """
+
 parts_by_program_query = f"""
             SELECT
                 WONumber,
@@ -0,0 +1,40 @@
+"""Раздача статических файлов с проверкой актуальности по ETag."""
+import os
+
+from pathlib import Path
+
+from starlette.types import Scope
+from starlette.responses import Response, FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.datastructures import Headers
+
+from utils.pics_utils.image_manifest import file_version
+from utils.pics_utils.image_variants import DIGEST_LENGTH, parse_variant_file_name
+
+
+class VersionedStaticFiles(StaticFiles):
+    """StaticFiles с ETag, совпадающим с версией в URL картинок.
+
+    Для вариантов картинок ETag - хэш содержимого из имени файла, для остальных файлов - версия
+    по времени изменения и размеру (file_version). Запрос с совпадающим If-None-Match получает 304.
+    """
+
+    def file_response(self,
+                      full_path: str | os.PathLike[str],
+                      stat_result: os.stat_result,
+                      scope: Scope,
+                      status_code: int = 200,
+                      ) -> Response:
+        """Ответ с файлом или 304, если версия файла у клиента актуальна."""
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = f'"{self.file_etag(Path(full_path).name, stat_result)}"'
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def file_etag(file_name: str, stat_result: os.stat_result) -> str:
+        """ETag файла: хэш содержимого из имени варианта картинки или версия файла."""
+        if parse_variant_file_name(file_name) is not None:
+            return file_name.rsplit(".", 2)[1][:DIGEST_LENGTH]
+        return file_version(stat_result)
@@ -18,3 +18,61 @@ fields_to_compare = (
     "Thickness",
     "NestedArea",
 )
+
+# поля строки sigma nest, из которых собираются записи программ, заказов и деталей PlasmaReport
+program_fields = (
+    "ProgramName",
+    "RepeatIDProgram",
+    "UsedArea",
+    "ScrapFraction",
+    "MachineName",
+    "CuttingTimeProgram",
+    "PostDateTime",
+    "Material",
+    "SheetLength",
+    "SheetWidth",
+    "ArchivePacketID",
+    "TimeLineID",
+    "Comment",
+    "PostedByUserID",
+    "UserName",
+    "UserFirstName",
+    "UserLastName",
+    "UserEMail",
+    "LastLoginDate",
+    "Thickness",
+    "PierceQtyProgram",
+)
+wo_fields = (
+    "WONumber",
+    "WODate",
+    "WOData1",
+    "WOData2",
+    "DateCreated",
+    "CustomerName",
+    "OrderDate",
+)
+part_fields = (
+    "CuttingTimePart",
+    "TotalCuttingTime",
+    "CuttingLength",
+    "PartName",
+    "WONumber",
+    "ProgramName",
+    "QtyInProcess",
+    "PartLength",
+    "PartWidth",
+    "RectArea",
+    "TrueArea",
+    "TrueWeight",
+    "RectWeight",
+    "MasterPartQty",
+    "WOState",
+    "DueDate",
+    "RevisionNumber",
+    "PK_PIP",
+    "Thickness",
+    "PierceQtyPart",
+    "NestedArea",
+    "SourceFileName",
+)
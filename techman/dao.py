@@ -6,12 +6,13 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload, selectinload
 
 from exceptions import WrongInputError
-from db.base_dao import BaseDAO
+from db.base_dao import BaseDAO, writes
 from logger_config import log
 from techman.enums import ProgramStatus
 from master.schemas import SProgramIDWithFios
 from techman.models import WO, Part, FioDoer, Program, ProgramFioDoerAssociation
-from utils.pics_utils.copy_pics_and_get_links import get_part_image, get_program_image
+from utils.pics_utils.copy_pics_and_get_links import get_part_images, get_program_images
+from utils.pics_utils.image_variants import ImageVariant
 
 
 class ProgramDAO(BaseDAO[Program]):
@@ -36,14 +37,16 @@ class ProgramDAO(BaseDAO[Program]):
 
         # Получение всех записей
         programs = result.scalars().unique().all()
+        program_pics = await get_program_images(program.ProgramName for program in programs)
 
         return [
             program.to_dict()
             | {"wo_numbers": list({part.wo_number.WONumber for part in program.parts if part.wo_number})}
             | {"wo_data1": list({part.wo_number.WOData1 for part in program.parts if part.wo_number})}
-            | {"program_pic": await get_program_image(program.ProgramName)}
+            | {"program_pic": program_pics[program.ProgramName]}
             for program in programs]
 
+    @writes
     async def insert_returning(self, values: list) -> dict:
         """Вставка данных с возвратом id новой записи и имени программы."""
         result_programs = await self._session.execute(
@@ -76,6 +79,12 @@ class ProgramDAO(BaseDAO[Program]):
                 | {"fio_doers": [doer.to_dict() for doer in program.fio_doers]}
                 for program in programs]
 
+    async def find_ids_by_names(self, names: list[str]) -> dict[str, int]:
+        """Получение id программ по именам одним запросом."""
+        result = await self._session.execute(
+            select(self.model.ProgramName, self.model.id).where(self.model.ProgramName.in_(names)))
+        return dict(result.tuples().all())
+
     async def find_programs_by_ids(self, ids: list[int]) -> list[dict]:
         """Получение существующих программ по id."""
         query = select(self.model).where(self.model.id.in_(ids))
@@ -87,30 +96,7 @@ class ProgramDAO(BaseDAO[Program]):
         programs = result.scalars().all()
         return [program.to_dict() for program in programs]
 
-    async def bulk_update_by_field_name(self, records: list[dict], update_field_name: str) -> int:
-        """Групповое обновление записей по имени поля."""
-        log.info(f"Массовое обновление записей {self.model.__name__}")
-        try:
-            updated_count = 0
-            for record_dict in records:
-                if update_field_name not in record_dict:
-                    continue
-                update_data = dict(record_dict)
-                stmt = (
-                    update(self.model)
-                    .filter_by(**{update_field_name: record_dict[update_field_name]})
-                    .values(**update_data)
-                )
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
-        except SQLAlchemyError as e:
-            log.error(f"Ошибка при массовом обновлении: {e}")
-            raise
-        else:
-            log.info(f"Обновлено {updated_count} записей")
-            await self._session.flush()
-            return updated_count
-
+    @writes
     async def update_fio_doers(self, id_fio_doers: list[SProgramIDWithFios]) -> None:
         """Обновление исполнителей сотрудников программы."""
         try:
@@ -192,13 +178,14 @@ class ProgramDAO(BaseDAO[Program]):
             raise
         else:
             log.info("Найдено {len_records} записей.", len_records=len(records))
+            program_pics = await get_program_images(program.ProgramName for program in records)
 
             return [
                 program.to_dict()
                 | {"fio_doers": [doer.to_dict() for doer in program.fio_doers]}
                 | {"wo_numbers": list({part.wo_number.WONumber for part in program.parts if part.wo_number})}
                 | {"wo_data1": list({part.wo_number.WOData1 for part in program.parts if part.wo_number})}
-                | {"program_pic": await get_program_image(program.ProgramName)}
+                | {"program_pic": program_pics[program.ProgramName]}
                 for program in records
             ]
 
@@ -216,13 +203,15 @@ class ProgramDAO(BaseDAO[Program]):
 
         programs = result.unique().scalars().all()
         log.info(f"Найдено {len(programs)} программ исполнителя с id {fio_doer_id}.")
+        program_pics = await get_program_images(program.ProgramName for program in programs)
         return [
             program.to_dict()
             | {"fio_doer": [fio_doer.to_dict() for fio_doer in program.fio_doers if fio_doer.id == fio_doer_id][0]}
-            | {"program_pic": await get_program_image(program.ProgramName)}
+            | {"program_pic": program_pics[program.ProgramName]}
             for program in programs
         ]
 
+    @writes
     async def update_program_status(self, program_id: int, new_status: ProgramStatus) -> None:
         """Обновление статуса программы."""
         log.info(f"Обновление статуса программы {program_id} на {new_status}")
@@ -247,6 +236,7 @@ class WoDAO(BaseDAO[WO]):
 
     model = WO
 
+    @writes
     async def insert_returning(self, values: list) -> dict:
         """Вставка значений с возвращением id номер заказа в словаре."""
         result_wos = await self._session.execute(
@@ -267,6 +257,12 @@ class WoDAO(BaseDAO[WO]):
         programs = result.scalars().all()
         return [program.to_dict() for program in programs]
 
+    async def find_ids_by_names(self, wo_numbers: list[str]) -> dict[str, int]:
+        """Получение id заказов по номерам одним запросом."""
+        result = await self._session.execute(
+            select(self.model.WONumber, self.model.id).where(self.model.WONumber.in_(wo_numbers)))
+        return dict(result.tuples().all())
+
 
 class PartDAO(BaseDAO[Part]):
     """Класс объекта доступа к БД для детали (СЗ)."""
@@ -291,6 +287,10 @@ class PartDAO(BaseDAO[Part]):
 
         # Получение всех записей
         parts = result.scalars().all()
+        # картинки получаются одним пакетом на уникальные имена: миниатюры для таблицы, полные - для просмотра
+        program_pics = await get_program_images(part.program.ProgramName for part in parts)
+        part_pics = await get_part_images(part.PartName for part in parts)
+        part_pics_full = await get_part_images((part.PartName for part in parts), ImageVariant.FULL)
         output = []
 
         for part in parts:
@@ -302,8 +302,9 @@ class PartDAO(BaseDAO[Part]):
                         "fio_doers": [doer.to_dict() for doer in part.program.fio_doers],  # данные исполнителей
                         **part.to_dict(),  # Данные детали
                     }
-                    | {"program_pic": await get_program_image(part.program.ProgramName)}
-                    | {"part_pic": await get_part_image(part.PartName)}
+                    | {"program_pic": program_pics[part.program.ProgramName]}
+                    | {"part_pic": part_pics[part.PartName]}
+                    | {"part_pic_full": part_pics_full[part.PartName]}
                     | {"ProgramName": part.program.ProgramName}
             )
 
@@ -355,9 +356,34 @@ class PartDAO(BaseDAO[Part]):
         parts = result.scalars().all()
         return [part.to_dict() for part in parts]
 
+    @writes
+    async def insert_many(self, values: list[dict]) -> int:
+        """Вставка деталей одним executemany."""
+        if not values:
+            return 0
+        log.info(f"Добавление записей {self.model.__name__}. Количество: {len(values)}")
+        await self._session.execute(insert(self.model), values)
+        return len(values)
+
+    @writes
+    async def delete_by_ids(self, ids: list[int]) -> int:
+        """Удаление записей по списку id одним запросом."""
+        if not ids:
+            return 0
+        log.info(f"Удаление записей {self.model.__name__} по id: {ids}")
+        try:
+            result = await self._session.execute(delete(self.model).where(self.model.id.in_(ids)))
+        except SQLAlchemyError as e:
+            log.error(f"Ошибка при удалении записей: {e}")
+            raise
+        else:
+            log.info(f"Удалено {result.rowcount} записей.")
+            await self._session.flush()
+            return int(result.rowcount)
+
+    @writes
     async def delete_by_id(self, element_id: int) -> int:
         """Удаление записей по id."""
-        # TODO делать BULK_DELETE
         log.info(f"Удаление записей {self.model.__name__} по id: {element_id}")
         try:
             query = delete(self.model).filter_by(id=element_id)
@@ -4,7 +4,7 @@ import datetime
 
 from decimal import Decimal
 
-from sqlalchemy import TEXT, TIMESTAMP, ForeignKey, UniqueConstraint, text
+from sqlalchemy import TEXT, TIMESTAMP, Index, ForeignKey, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 # from auth.models import User
@@ -165,6 +165,10 @@ class Part(Base):
     # __table_args__ = (
     #     UniqueConstraint("PartName", "program_id", "wo_number_id", name="uq_part_program_wo"),
     # )
+    __table_args__ = (
+        # постраничная выборка отчёта по деталям: ключ reports.dao.CREATED_AT_KEY
+        Index("ix_part_created_at_key_id", text("datetime(created_at)"), "id"),
+    )
 
     def __str__(self) -> str:
         """Строковое представление для админ панели."""
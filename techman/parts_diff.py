@@ -0,0 +1,103 @@
+"""Сравнение деталей PlasmaReport с деталями sigma nest и применение изменений."""
+from typing import Any
+from dataclasses import field, dataclass
+from collections.abc import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from techman.dao import WoDAO, PartDAO, ProgramDAO
+from logger_config import log
+from techman.utils import normalize_value
+from techman.schemas import SWoData, SPartDataPlasmaReport
+from techman.constants import fields_to_compare
+
+
+@dataclass
+class PartsDiff:
+    """Разница деталей: новые детали sigma, изменённые детали и детали, которых больше нет в sigma."""
+
+    inserts: list[dict] = field(default_factory=list)  # детали sigma
+    updates: list[dict] = field(default_factory=list)  # id, PartName, ProgramName, changes, values
+    deletes: list[dict] = field(default_factory=list)  # детали PlasmaReport
+
+    def __bool__(self) -> bool:
+        """Есть ли изменения."""
+        return bool(self.inserts or self.updates or self.deletes)
+
+
+def diff_parts(existing_parts: Iterable[dict],
+               sigma_parts: Iterable[dict],
+               program_names: dict[int, str],
+               fields: Iterable[str] = fields_to_compare) -> PartsDiff:
+    """Сравнение деталей по ключу (PartName, ProgramName).
+
+    existing_parts - детали PlasmaReport, program_names - имена программ по program_id.
+    Значения полей fields сравниваются после normalize_value.
+    """
+    fields = tuple(dict.fromkeys(fields))
+    existing_parts = list(existing_parts)
+    existing = {(part["PartName"], program_names[part["program_id"]]): part for part in existing_parts}
+    sigma = {(part["PartName"], part["ProgramName"]): part for part in sigma_parts}
+
+    diff = PartsDiff()
+    diff.inserts = [part for key, part in sigma.items() if key not in existing]
+    diff.deletes = [part for part in existing_parts
+                    if (part["PartName"], program_names[part["program_id"]]) not in sigma]
+    for key in sigma.keys() & existing.keys():
+        existing_part, sigma_part = existing[key], sigma[key]
+        changes = {}
+        for field_name in fields:
+            old_value = normalize_value(existing_part.get(field_name))
+            new_value = normalize_value(sigma_part.get(field_name))
+            if old_value != new_value:
+                changes[field_name] = (old_value, new_value)
+        if changes:
+            diff.updates.append({
+                "id": existing_part["id"],
+                "PartName": key[0],
+                "ProgramName": key[1],
+                "changes": changes,
+                "values": {field_name: sigma_part[field_name] for field_name in changes},
+            })
+    diff.updates.sort(key=lambda item: item["id"])
+    return diff
+
+
+async def apply_parts_diff(session: AsyncSession, diff: PartsDiff, sigma_wos: Iterable[dict]) -> dict[str, int]:
+    """Запись разницы деталей в БД.
+
+    FK новых деталей определяются двумя запросами (программы и заказы), отсутствующие в БД заказы
+    создаются из sigma_wos. Вставка и обновление выполняются через executemany, удаление - одним запросом.
+    """
+    part_table = PartDAO(session)
+    if diff.inserts:
+        program_mapping = await ProgramDAO(session).find_ids_by_names(
+            list({part["ProgramName"] for part in diff.inserts}))
+        wo_table = WoDAO(session)
+        wo_numbers = list({part["WONumber"] for part in diff.inserts})
+        wo_mapping = await wo_table.find_ids_by_names(wo_numbers)
+        missing_numbers = set(wo_numbers) - wo_mapping.keys()
+        missing_wos = list({wo["WONumber"]: SWoData(**wo).model_dump() for wo in sigma_wos
+                            if wo["WONumber"] in missing_numbers}.values())
+        if missing_wos:
+            log.info("Добавление новых заказов {wos}.", wos=[wo["WONumber"] for wo in missing_wos])
+            wo_mapping.update(await wo_table.insert_returning(missing_wos))
+        await part_table.insert_many([
+            SPartDataPlasmaReport(**part,
+                                  program_id=program_mapping.get(part["ProgramName"]),
+                                  wo_number_id=wo_mapping.get(part["WONumber"])).model_dump()
+            for part in diff.inserts
+        ])
+    await part_table.bulk_update_by_field_name([{"id": item["id"], **item["values"]} for item in diff.updates], "id")
+    await part_table.delete_by_ids([part["id"] for part in diff.deletes])
+    return {"inserted": len(diff.inserts), "updated": len(diff.updates), "deleted": len(diff.deletes)}
+
+
+def describe_changes(diff: PartsDiff) -> dict[str, Any]:
+    """Изменения в формате ответа /techman/update_data."""
+    return {
+        "changed_elements": [{key: item[key] for key in ("id", "PartName", "ProgramName", "changes")}
+                             for item in diff.updates],
+        "added_elements": diff.inserts,
+        "removed_elements": diff.deletes,
+    }
@@ -23,19 +23,17 @@ from auth.models import User
 from techman.dao import WoDAO, PartDAO, ProgramDAO
 from logger_config import log
 from techman.enums import ProgramStatus
-from techman.utils import normalize_value, create_data_to_db
+from techman.utils import create_data_to_db
 from techman.schemas import SWoData, SProgramData, SUpdateProgramData, SPartDataPlasmaReport
-from techman.constants import fields_to_compare
+from techman.parts_diff import diff_parts, apply_parts_diff, describe_changes
 from dependencies.dao_dep import get_session_with_commit, get_session_without_commit
 from settings.translate_dict import get_translated_keys
-from sigma_handlers.sigma_db import (
-    get_wo_names,
-    get_parts_by_wo,
-    get_program_names,
-    get_parts_by_program,
-    single_date_get_program_names,
-)
-from utils.pics_utils.copy_pics_and_get_links import get_part_image, get_program_image
+from sigma_handlers.sigma_db import get_parts_by_wo, get_parts_by_program
+from sigma_handlers.sigma_sync import sigma_sync
+from sigma_handlers.sigma_cache import sigma_cache
+from utils.pics_utils.image_prewarm import image_prewarm
+from utils.pics_utils.image_variants import ImageVariant
+from utils.pics_utils.copy_pics_and_get_links import get_part_images, get_program_images
 
 router = APIRouter()
 
@@ -63,7 +61,7 @@ async def get_wos(start_date: Annotated[date, Query(..., description="Начал
       GET /orders?start_date=2025-01-09&end_date=2025-01-09
       ```
     """
-    data = await get_wo_names(start_date, end_date)
+    data = await sigma_sync.get_wo_names(start_date, end_date)
     headers = get_translated_keys(data)
     return {"data": data, "headers": headers}
 
@@ -89,9 +87,13 @@ async def get_program_parts(program_name: str,
     """
     data = await get_parts_by_program(program_name)
 
+    part_pics = await get_part_images(line["PartName"] for line in data)
+    part_pics_full = await get_part_images((line["PartName"] for line in data), ImageVariant.FULL)
+    program_pic = (await get_program_images([program_name]))[program_name]
     for line in data:
-        line["part_pic"] = await get_part_image(line["PartName"])
-        line["program_pic"] = await get_program_image(program_name)
+        line["part_pic"] = part_pics[line["PartName"]]
+        line["part_pic_full"] = part_pics_full[line["PartName"]]
+        line["program_pic"] = program_pic
 
     headers = get_translated_keys(data)
     return {"data": data, "headers": headers, "program_pic": data[0]["program_pic"]}
@@ -121,11 +123,11 @@ async def get_programs(
       GET /programs?start_date=2025-01-09&end_date=2025-01-09
     """
     programs_table = ProgramDAO(session=select_session)
-    # программы с sigma за период
+    # программы с sigma за период (из локальной копии синхронизации, если она актуальна)
     if start_date == end_date:
-        sigma_programs = await single_date_get_program_names(start_date)
+        sigma_programs = await sigma_sync.get_program_names(start_date, None)
     else:
-        sigma_programs = await get_program_names(start_date, end_date)
+        sigma_programs = await sigma_sync.get_program_names(start_date, end_date)
     if not sigma_programs:
         msg = "Программы не найдены."
         raise EmptyAnswerError(msg)
@@ -137,17 +139,13 @@ async def get_programs(
     existing_program_names = [program_name["ProgramName"] for program_name in existing_programs]
     # присвоение статуса новым программа
 
-    # TODO получение картинок программ
-    all_program_names = sigma_program_names + existing_program_names
-
-    # первичное создание картинок программ
-    for program_name in all_program_names:
-        await get_program_image(program_name)
+    # картинки всех программ одним пакетом
+    program_pics = await get_program_images(sigma_program_names + existing_program_names)
 
     new_programs = [
         {"program_status": ProgramStatus.NEW}
         | dict(program_name.items())
-        | {"program_pic": await get_program_image(program_name["ProgramName"])}
+        | {"program_pic": program_pics[program_name["ProgramName"]]}
         for program_name in sigma_programs
         if program_name["ProgramName"] not in existing_program_names
     ]
@@ -155,7 +153,7 @@ async def get_programs(
     allowed_status = (ProgramStatus.UNASSIGNED, ProgramStatus.CREATED, ProgramStatus.ASSIGNED, ProgramStatus.ACTIVE)
     existing_programs = [
         dict(program_name.items())
-        | {"program_pic": await get_program_image(program_name["ProgramName"])}
+        | {"program_pic": program_pics[program_name["ProgramName"]]}
         for program_name in existing_programs
         if program_name["program_status"] in allowed_status
     ]
@@ -167,7 +165,7 @@ async def get_programs(
 
 
 @router.post("/create_data", tags=["techman"])
-async def create_data(active_programs: list[dict],
+async def create_data(active_programs: list[dict],  # noqa PLR0915
                       add_session: Annotated[AsyncSession, Depends(get_session_with_commit)],
                       select_session: Annotated[AsyncSession, Depends(get_session_without_commit)],
                       user_data: Annotated[User, Depends(get_techman_user)],  # noqa ARG001
@@ -267,6 +265,11 @@ async def create_data(active_programs: list[dict],
     else:
         log.success("Успешная запись в БД.")
         success_msg = {"message": "Данные успешно записаны в БД."}
+        # списки программ и заказов sigma перечитываются после записи новых программ
+        sigma_cache.invalidate()
+        # картинки новых программ и деталей готовятся до первого запроса списков
+        image_prewarm.enqueue_programs(program_names)
+        image_prewarm.enqueue_parts(part["PartName"] for part in parts_data)
 
     return success_msg
 
@@ -320,110 +323,25 @@ async def update_data(
     program_ids = [program.id for program in active_programs]  # id программ
     # новые детали:
     sigma_data = await create_data_to_db(program_names)
-    sigma_parts = sigma_data["parts"]
     # существующие детали
     existing_parts = await part_table_select.get_parts_by_program_ids(program_ids)
 
-    # список полей, для учёта в сравнении
-
     # словарь сопоставления ProgramName и program_id
     id_program_name_dict = {
         program.id: program.ProgramName
         for program in active_programs
     }
-
-    # словари с ключом (ProgramName, program_id) для сравнения
-    existing_parts_dict = {
-        (part["PartName"], id_program_name_dict[part["program_id"]]): part for part in existing_parts
-        # (part["PartName"], part["program_id"]): part for part in existing_parts
-    }
-    sigma_parts_dict = {
-        (part["PartName"], part["ProgramName"]): part for part in sigma_parts
-        # (part["PartName"], part["WONumber"]): part for part in sigma_parts
-    }
-
-    # изменённые элементы
-    changed_elements = []
-    for key, sigma_part in sigma_parts_dict.items():
-        if key in existing_parts_dict:
-            existing_part = existing_parts_dict[key]
-            differences = {
-                field: (normalize_value(existing_part.get(field)), normalize_value(sigma_part.get(field)))
-                for field in fields_to_compare
-                if normalize_value(existing_part.get(key)) != normalize_value(sigma_part.get(key))
-            }
-            if differences:
-                changed_elements.append({
-                    "ProgramName": sigma_part["ProgramName"],
-                    "changes": differences,
-                })
-
-    # Обновление изменённых элементов
-    part_update_table = PartDAO(session=update_session)
-    if changed_elements:
-        await part_update_table.bulk_update_by_field_name(records=changed_elements, update_field_name="ProgramName")
-        update_message = ("\n".join(
-            [
-                f"Для программы {item['ProgramName']}, Изменения: {item['changes']} обновлены в БД."
-                for item in changed_elements
-            ],
-        ))
+    diff = diff_parts(existing_parts, sigma_data["parts"], id_program_name_dict)
+    if diff:
+        counts = await apply_parts_diff(update_session, diff, sigma_data["wos"])
+        log.info("Обновление программ {programs}: добавлено {inserted}, изменено {updated}, удалено {deleted} "
+                 "деталей.", programs=program_names, **counts)
+        image_prewarm.enqueue_programs(program_names)
+        image_prewarm.enqueue_parts(part["PartName"] for part in diff.inserts)
     else:
-        update_message = "Изменений для обновления в программах нет."
-    log.info(update_message)
+        log.info("Изменений для обновления в программах нет.")
 
-    # добавленные элементы
-    added_elements = [
-        part for key, part in sigma_parts_dict.items() if key not in existing_parts_dict
-    ]
-    # добавление новых элементов
-    if added_elements:
-        wo_select_table = WoDAO(select_session)
-        program_select_table = ProgramDAO(select_session)
-
-        for element in added_elements:
-            program = await program_select_table.find_programs_by_names([element["ProgramName"]])
-            program_id = program[0]["id"]
-            wo = await wo_select_table.find_wos_by_names([element["WONumber"]])
-            wo_number_id = wo[0]["id"]
-            element.update({"program_id": program_id, "wo_number_id": wo_number_id})
-
-        pydentic_elements_to_add = [SPartDataPlasmaReport(**element) for element in added_elements]
-        await part_update_table.add_many(pydentic_elements_to_add)
-        added_message = ("\n".join(
-            [
-                f"Детали {item} добавлены в БД."
-                for item in added_elements
-            ],
-        ))
-    else:
-        added_message = "Деталей для добавления при обновлении программы нет."
-    log.info(added_message)
-
-    # удалённые элементы
-    removed_elements = [
-        part for key, part in existing_parts_dict.items() if key not in sigma_parts_dict
-    ]
-    # удаление элементов
-    if removed_elements:
-        for element in removed_elements:
-            await part_update_table.delete_by_id(element_id=element["id"])
-        delete_message = ("\n".join(
-            [
-                f"Детали {item} удалены из БД."
-                for item in added_elements
-            ],
-        ))
-    else:
-        delete_message = "Деталей для добавления при обновлении программы нет."
-    log.info(delete_message)
-
-    return {
-        "msg": "ok",
-        "changed_elements": changed_elements,
-        "added_elements": added_elements,
-        "removed_elements": removed_elements,
-    }
+    return {"msg": "ok", **describe_changes(diff)}
 
 # TODO промежуточный enopoint с которым пользователь не взаимодействует?
 # @router.post("/get_parts", tags=["techman", "sigma"],
@@ -4,111 +4,84 @@ import asyncio
 from typing import Any
 from decimal import Decimal
 from operator import itemgetter
-from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
 
 from logger_config import log
-from sigma_handlers.sigma_db import get_parts_data_by_programs
+from techman.constants import wo_fields, part_fields, program_fields
+from sigma_handlers.sigma_db import stream_parts_data_by_programs
+
+
+class SigmaDataSplitter:
+    """Разделение строк sigma nest на программы, заказы и детали PlasmaReport за один проход.
+
+    Для набора колонок один раз строятся itemgetter по индексам полей программы, заказа и детали.
+    Заказы и детали дедуплицируются по кортежам значений, для программы сохраняется строка
+    с максимальным RepeatIDProgram.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация разделителя."""
+        self._columns: tuple[str, ...] | None = None
+        self._programs: dict[Any, tuple[Any, tuple]] = {}  # ProgramName - (RepeatIDProgram, значения программы)
+        self._wos: dict[tuple, None] = {}  # упорядоченное множество значений заказов
+        self._parts: dict[tuple, None] = {}  # упорядоченное множество значений деталей
+
+    def _compile(self, columns: tuple[str, ...]) -> None:
+        """Проверка набора колонок и построение проекций по индексам колонок."""
+        missing = [field for field in (*program_fields, *wo_fields, *part_fields) if field not in columns]
+        if missing:
+            # TODO создать своё исключение обработать выше
+            log.error("Ошибка при разделении данных sigma на словари для PlasmaReport. "
+                      "Нет колонок: {missing}", missing=missing)
+            raise ValueError(missing)
+        index = {column: position for position, column in enumerate(columns)}
+        self._get_program = _tuple_getter(index, program_fields)
+        self._get_wo = _tuple_getter(index, wo_fields)
+        self._get_part = _tuple_getter(index, part_fields)
+        self._program_name_index = index["ProgramName"]
+        self._repeat_id_index = index["RepeatIDProgram"]
+        self._columns = columns
+
+    def add_rows(self, columns: tuple[str, ...], rows: Iterable[Sequence]) -> None:
+        """Добавление строк результата запроса с колонками columns."""
+        if columns != self._columns:
+            self._compile(columns)
+        programs, wos, parts = self._programs, self._wos, self._parts
+        get_program, get_wo, get_part = self._get_program, self._get_wo, self._get_part
+        program_name_index, repeat_id_index = self._program_name_index, self._repeat_id_index
+        for row in rows:
+            program_name = row[program_name_index]
+            repeat_id_program = row[repeat_id_index]
+            # определение записи с максимальным RepeatIDProgram
+            current = programs.get(program_name)
+            if current is None or repeat_id_program > current[0]:
+                programs[program_name] = (repeat_id_program, get_program(row))
+            wos[get_wo(row)] = None
+            parts[get_part(row)] = None
+
+    def result(self) -> dict[str, list[dict[str, Any]]]:
+        """Списки словарей программ, заказов и деталей."""
+        return {
+            "programs": [dict(zip(program_fields, values, strict=True)) for _, values in self._programs.values()],
+            "wos": [dict(zip(wo_fields, values, strict=True)) for values in self._wos],
+            "parts": [dict(zip(part_fields, values, strict=True)) for values in self._parts],
+        }
+
+
+def _tuple_getter(index: dict[str, int], fields: tuple[str, ...]) -> Callable[[Sequence], tuple]:
+    """Функция получения кортежа значений полей fields из строки по индексам колонок."""
+    getter = itemgetter(*(index[field] for field in fields))
+    if len(fields) == 1:
+        return lambda row: (getter(row),)
+    return getter
 
 
 async def create_data_to_db(active_programs: list[str]) -> dict[str, list[dict[str, Any]]]:
     """Создание списков словарей данных готовых к записи в БД PlasmaReport."""
-    data_programs_wos_parts_list = await get_parts_data_by_programs(active_programs)
-
-    # Разделение на три словаря programs, wos, parts
-    # TODO вынести словари в отдельный config?
-    program_dict_keys = ("ProgramName",
-                         "RepeatIDProgram",
-                         "UsedArea",
-                         "ScrapFraction",
-                         "MachineName",
-                         "CuttingTimeProgram",
-                         "PostDateTime",
-                         "Material",
-                         "SheetLength",
-                         "SheetWidth",
-                         "ArchivePacketID",
-                         "TimeLineID",
-                         "Comment",
-                         "PostedByUserID",
-                         "UsedArea",
-                         "UsedArea",
-                         "UserName",
-                         "UserFirstName",
-                         "UserLastName",
-                         "UserEMail",
-                         "LastLoginDate",
-                         "Thickness",
-                         "PierceQtyProgram",
-                         )
-    wo_dict_keys = ("WONumber",
-                    "WODate",
-                    "WOData1",
-                    "WOData2",
-                    "DateCreated",
-                    "CustomerName",
-                    "CustomerName",
-                    "CustomerName",
-                    "CustomerName",
-                    "OrderDate",
-                    )
-    part_dict_keys = ("CuttingTimePart",
-                      "TotalCuttingTime",
-                      "CuttingLength",
-                      "PartName",
-                      "WONumber",
-                      "ProgramName",
-                      "QtyInProcess",
-                      "PartLength",
-                      "PartWidth",
-                      "RectArea",
-                      "TrueArea",
-                      "TrueWeight",
-                      "RectWeight",
-                      "MasterPartQty",
-                      "WOState",
-                      "DueDate",
-                      "RevisionNumber",
-                      "PK_PIP",
-                      "Thickness",
-                      "PierceQtyPart",
-                      "NestedArea",
-                      "SourceFileName",
-                      )
-
-    wos = []
-    parts = []
-    seen_wos = set()
-    seen_parts = set()
-    max_programs = defaultdict(dict)
-    for line_dict in data_programs_wos_parts_list:
-        program_name = line_dict.get("ProgramName")
-        repeat_id_program = line_dict.get("RepeatIDProgram")
-        # определение записи с максимальным RepeatIDProgram
-        if not max_programs[program_name] or repeat_id_program > max_programs[program_name]["RepeatIDProgram"]:
-            max_programs[program_name] = line_dict
-        # WOs
-        wo_frozenset = frozenset((key, line_dict[key]) for key in wo_dict_keys)
-        if wo_frozenset not in seen_wos:
-            seen_wos.add(wo_frozenset)
-            wos.append(dict(zip(wo_dict_keys, itemgetter(*wo_dict_keys)(line_dict), strict=False)))
-
-        # Parts
-        part_frozenset = frozenset((key, line_dict[key]) for key in part_dict_keys)
-        if part_frozenset not in seen_parts:
-            seen_parts.add(part_frozenset)
-            parts.append(dict(zip(part_dict_keys, itemgetter(*part_dict_keys)(line_dict), strict=False)))
-
-        # Проверка на полноту данных
-        if not all(key in line_dict for key in program_dict_keys + wo_dict_keys + part_dict_keys):
-            # TODO создать своё исключение обработать выше
-            log.error("Ошибка при разделении данных sigma на словари для PlasmaReport.")
-            raise ValueError
-
-    programs = [
-        dict(zip(program_dict_keys, itemgetter(*program_dict_keys)(line_dict), strict=False))
-        for line_dict in max_programs.values()
-    ]
-    return {"programs": programs, "wos": wos, "parts": parts}
+    splitter = SigmaDataSplitter()
+    async for batch in stream_parts_data_by_programs(active_programs):
+        splitter.add_rows(batch.columns, batch.rows)
+    return splitter.result()
 
 
 def normalize_value(value: str | float | Decimal) -> int:
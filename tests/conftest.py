@@ -1 +1,21 @@
 """Конфигурация тестов pytest."""
+from collections.abc import AsyncGenerator
+
+import pytest_asyncio
+
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from auth.models import User  # noqa F401 регистрация таблицы users в metadata
+from db.database import Base
+from techman.models import WO, Part, Program  # noqa F401
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def db_session_maker() -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """Фабрика сессий к пустой БД PlasmaReport в памяти."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
@@ -0,0 +1,70 @@
+"""Тесты для сессий БД проверки пользователя FastAPI Users."""
+from pathlib import Path
+from collections.abc import AsyncGenerator
+
+import httpx
+import pytest
+
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from auth.dao import UserDatabase
+from auth.enums import UserRole
+from auth.users import get_jwt_strategy
+from auth.models import User
+from db.database import Base, set_sqlite_pragmas
+from logist.router import router as logist_router
+from techman.models import StorageCell
+from dependencies.dao_dep import get_session_with_commit, get_session_without_commit
+from dependencies.auth_dep import get_user_db
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_authenticated_write_endpoint(tmp_path: Path) -> None:
+    """Тестирует запись обработчиком с проверкой пользователя при единственном соединении записи.
+
+    Проверка пользователя не должна занимать соединение записи до конца запроса.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    write_engine = create_async_engine(url, pool_size=1, max_overflow=0, pool_timeout=1)
+    read_engine = create_async_engine(url)
+    set_sqlite_pragmas(read_engine, {"query_only": "ON"})
+    write_maker = async_sessionmaker(write_engine, expire_on_commit=False)
+    read_maker = async_sessionmaker(read_engine, expire_on_commit=False, info={"read_only": True})
+
+    async def session_with_commit() -> AsyncGenerator[AsyncSession, None]:
+        async with write_maker() as session:
+            yield session
+            await session.commit()
+
+    async def session_without_commit() -> AsyncGenerator[AsyncSession, None]:
+        async with read_maker() as session:
+            yield session
+
+    async def user_db() -> AsyncGenerator[UserDatabase, None]:
+        yield UserDatabase(User, read_maker, write_maker)
+
+    try:
+        async with write_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        user = await UserDatabase(User, read_maker, write_maker).create(
+            {"email": "logist@example.com", "hashed_password": "x", "first_name": "Иван", "last_name": "Иванов",
+             "role": UserRole.LOGIST})
+        token = await get_jwt_strategy().write_token(user)
+
+        app = FastAPI()
+        app.include_router(logist_router, prefix="/logist")
+        app.dependency_overrides = {get_user_db: user_db, get_session_with_commit: session_with_commit,
+                                    get_session_without_commit: session_without_commit}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/logist/create_storage_cell", json={"cell_name": "A1101"},
+                                         headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200, response.text  # noqa PLR2004
+        async with read_maker() as session:
+            assert (await session.scalars(select(StorageCell.cell_name))).all() == ["A1101"]
+    finally:
+        await write_engine.dispose()
+        await read_engine.dispose()
@@ -0,0 +1,46 @@
+"""Тесты для базового DAO."""
+import datetime
+
+import pytest
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from techman.dao import WoDAO
+from techman.models import WO
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+NOW = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001
+
+
+class SWoComment(BaseModel):
+    """Схема комментария заказа."""
+
+    id: int
+    WOData1: str
+
+
+async def test_bulk_update_grouped(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует обновление записей с разными наборами полей и подсчёт обновлённых строк."""
+    async with db_session_maker() as session, session.begin():
+        session.add_all([WO(WONumber=f"B{index}", CustomerName="Customer", WODate=NOW, OrderDate=NOW,
+                            WOData1="", WOData2="", DateCreated=NOW) for index in range(4)])
+    async with db_session_maker() as session, session.begin():
+        ids = dict((await session.execute(select(WO.WONumber, WO.id).where(WO.WONumber.like("B%")))).tuples().all())
+        updated = await WoDAO(session).bulk_update_by_field_name([
+            {"WONumber": "B0", "WOData1": "one"},
+            {"WONumber": "B1", "WOData1": "two"},
+            {"WONumber": "B2", "WOData1": "three", "WOData2": "extra"},
+            {"WONumber": "missing", "WOData1": "none"},
+            {"WOData1": "без ключа"},
+        ], "WONumber")
+        assert updated == 3  # noqa PLR2004
+        assert await WoDAO(session).bulk_update([SWoComment(id=ids["B3"], WOData1="four")]) == 1
+
+    async with db_session_maker() as session:
+        rows = (await session.execute(
+            select(WO.WONumber, WO.WOData1, WO.WOData2).where(WO.WONumber.like("B%")).order_by(WO.WONumber))).all()
+    assert [tuple(row) for row in rows] == [("B0", "one", ""), ("B1", "two", ""), ("B2", "three", "extra"),
+                                            ("B3", "four", "")]
@@ -1,12 +1,29 @@
 """Тесты для copy_pics_and_get_links.py."""
 # ruff: noqa: TRY002, ARG001
+import os
+import time
+import asyncio
+
 from pathlib import Path
 
 import pytest
 
+from PIL import Image, ImageDraw
 from _pytest.monkeypatch import MonkeyPatch
 
-from utils.pics_utils.copy_pics_and_get_links import get_part_image, get_program_image
+from config import settings
+from techman import router as techman_router
+from utils.pics_utils.image_manifest import file_version, image_manifest
+from utils.pics_utils.image_variants import ImageVariant, variant_file_name, parse_variant_file_name
+from utils.pics_utils.missing_sources import missing_sources
+from utils.pics_utils.copy_pics_and_get_links import (
+    get_part_image,
+    resolve_images,
+    get_part_images,
+    get_program_image,
+    prepare_part_image,
+    prepare_program_image,
+)
 
 # Настройка pytest для асинхронных тестов
 pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
@@ -39,34 +56,51 @@ def mock_config(mock_config_paths: dict[str, Path], monkeypatch: MonkeyPatch) ->
     monkeypatch.setattr("utils.pics_utils.copy_pics_and_get_links.REPORTS_DIR", mock_config_paths["REPORTS_DIR"])
     monkeypatch.setattr("utils.pics_utils.copy_pics_and_get_links.STATIC_IMAGES_DIR",
                         mock_config_paths["STATIC_IMAGES_DIR"])
+    # индекс картинок пересоздаётся для временного каталога каждого теста
+    monkeypatch.setattr(image_manifest, "directory", image_manifest.directory)
+    image_manifest.load(mock_config_paths["STATIC_IMAGES_DIR"])
+    missing_sources.invalidate()
+
+
+def write_bmp(path: Path, size: tuple[int, int] = (1200, 800)) -> None:
+    """Создаёт BMP-чертёж: линии на белом фоне."""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((50, 50, size[0] - 50, size[1] - 50), outline="black", width=3)
+    draw.line((50, 50, size[0] - 50, size[1] - 50), fill="blue", width=2)
+    image.save(path, format="BMP")
 
 
 # Тесты для get_part_image
 async def test_get_part_image_success(mock_config_paths: dict[str, Path]) -> None:
-    """Тестирует успешное копирование BMP-файла."""
+    """Тестирует создание миниатюры и полноразмерной картинки WebP из BMP-файла."""
     part_name: str = "test_part"
     source_path: Path = mock_config_paths["PARTS_DIR"] / f"{part_name}.bmp"
-    dest_path: Path = mock_config_paths["STATIC_IMAGES_DIR"] / f"{part_name}.bmp"
+    write_bmp(source_path)
 
-    # Создаем пустой исходный файл
-    source_path.touch()
-
-    result: str | None = await get_part_image(part_name)
+    thumb_url: str | None = await get_part_image(part_name)
+    full_url: str | None = await get_part_image(part_name, ImageVariant.FULL)
 
-    assert result == f"/static/images/{part_name}.bmp"
-    assert dest_path.exists()
+    assert parse_variant_file_name(thumb_url.rsplit("/", 1)[1]) == (part_name, ImageVariant.THUMB)
+    assert parse_variant_file_name(full_url.rsplit("/", 1)[1]) == (part_name, ImageVariant.FULL)
+    thumb_path = mock_config_paths["STATIC_IMAGES_DIR"] / thumb_url.rsplit("/", 1)[1]
+    full_path = mock_config_paths["STATIC_IMAGES_DIR"] / full_url.rsplit("/", 1)[1]
+    with Image.open(thumb_path) as thumb, Image.open(full_path) as full:
+        assert max(thumb.size) == settings.IMAGES_THUMB_SIZE
+        assert full.size == (1200, 800)
+    # сжатые варианты на порядок меньше исходного BMP
+    assert full_path.stat().st_size * 10 < source_path.stat().st_size
 
 
 async def test_get_part_image_already_exists(mock_config_paths: dict[str, Path]) -> None:
-    """Тестирует возврат URL, если BMP уже существует."""
+    """Тестирует возврат URL, если вариант картинки уже существует."""
     part_name: str = "test_part"
-    dest_path: Path = mock_config_paths["STATIC_IMAGES_DIR"] / f"{part_name}.bmp"
-
-    dest_path.touch()
+    file_name = variant_file_name(part_name, ImageVariant.THUMB, "0123456789ab")
+    (mock_config_paths["STATIC_IMAGES_DIR"] / file_name).touch()
 
     result: str | None = await get_part_image(part_name)
 
-    assert result == f"/static/images/{part_name}.bmp"
+    assert result == f"/static/images/{file_name}"
 
 
 async def test_get_part_image_source_not_found(mock_config_paths: dict[str, Path]) -> None:
@@ -80,18 +114,18 @@ async def test_get_part_image_source_not_found(mock_config_paths: dict[str, Path
 
 async def test_get_part_image_copy_error(mock_config_paths: dict[str, Path],
                                          monkeypatch: MonkeyPatch) -> None:
-    """Тестирует ошибку при копировании BMP."""
+    """Тестирует ошибку при преобразовании BMP."""
     part_name: str = "test_part"
     source_path: Path = mock_config_paths["PARTS_DIR"] / f"{part_name}.bmp"
 
     source_path.touch()
 
-    # Мокируем shutil.copy2 для имитации ошибки
+    # Мокируем build_variants для имитации ошибки
     def raise_error() -> None:
         msg = "Copy error"
         raise Exception(msg)
 
-    monkeypatch.setattr("shutil.copy2", raise_error)
+    monkeypatch.setattr("utils.pics_utils.copy_pics_and_get_links.build_variants", raise_error)
 
     result: str | None = await get_part_image(part_name)
 
@@ -117,7 +151,7 @@ async def test_get_program_image_success(mock_config_paths: dict[str, Path],
 
     result: str | None = await get_program_image(program_name)
 
-    assert result == f"/static/images/{program_name}.png"
+    assert result == f"/static/images/{program_name}.png?v={file_version(dest_path.stat())}"
     assert dest_path.exists()
 
 
@@ -130,7 +164,7 @@ async def test_get_program_image_already_exists(mock_config_paths: dict[str, Pat
 
     result: str | None = await get_program_image(program_name)
 
-    assert result == f"/static/images/{program_name}.png"
+    assert result == f"/static/images/{program_name}.png?v={file_version(dest_path.stat())}"
 
 
 async def test_get_program_image_ods_not_found(mock_config_paths: dict[str, Path]) -> None:
@@ -160,3 +194,148 @@ async def test_get_program_image_extract_error(mock_config_paths: dict[str, Path
     result: str | None = await get_program_image(program_name)
 
     assert result is None
+
+
+# Тесты для пакетного получения картинок
+async def test_get_part_images(mock_config_paths: dict[str, Path]) -> None:
+    """Тестирует получение картинок списка деталей с повторяющимися именами."""
+    write_bmp(mock_config_paths["PARTS_DIR"] / "part_1.bmp")
+    part_2_file = variant_file_name("part_2", ImageVariant.THUMB, "0123456789ab")
+    (mock_config_paths["STATIC_IMAGES_DIR"] / part_2_file).touch()
+
+    result: dict[str, str | None] = await get_part_images(["part_1", "part_2", "part_1", "missing", ""])
+
+    assert list(result) == ["part_1", "part_2", "missing", ""]
+    assert result["part_1"] == image_manifest.get_variant("part_1", ImageVariant.THUMB).url
+    assert result["part_2"] == f"/static/images/{part_2_file}"
+    assert result["missing"] is None
+    assert result[""] is None
+
+
+async def test_program_parts_full_images(mock_config_paths: dict[str, Path], monkeypatch: MonkeyPatch) -> None:
+    """Тестирует картинки деталей программы: миниатюра для таблицы и полноразмерная картинка для просмотра."""
+    write_bmp(mock_config_paths["PARTS_DIR"] / "part_1.bmp")
+
+    async def get_parts_by_program(program_name: str) -> list[dict]:
+        return [{"PartName": "part_1"}, {"PartName": "missing"}]
+
+    monkeypatch.setattr(techman_router, "get_parts_by_program", get_parts_by_program)
+
+    response = await techman_router.get_program_parts("P1", user_data=None)
+
+    assert response["data"][0]["part_pic"] == image_manifest.get_variant("part_1", ImageVariant.THUMB).url
+    assert response["data"][0]["part_pic_full"] == image_manifest.get_variant("part_1", ImageVariant.FULL).url
+    assert (response["data"][1]["part_pic"], response["data"][1]["part_pic_full"]) == (None, None)
+
+
+async def test_resolve_images_bounded(monkeypatch: MonkeyPatch) -> None:
+    """Тестирует однократное получение каждого имени и ограничение числа одновременных запросов."""
+    concurrency = 2
+    monkeypatch.setattr(settings, "IMAGES_RESOLVE_CONCURRENCY", concurrency)
+    requested: list[str] = []
+    running = max_running = 0
+
+    async def resolver(name: str) -> str:
+        nonlocal running, max_running
+        requested.append(name)
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"/static/images/{name}.png"
+
+    names = [f"P{i % 5}" for i in range(20)]
+    result: dict[str, str | None] = await resolve_images(names, resolver)
+
+    assert sorted(requested) == [f"P{i}" for i in range(5)]
+    assert max_running == concurrency
+    assert list(result) == [f"P{i}" for i in range(5)]
+
+
+async def test_resolve_images_empty_names() -> None:
+    """Тестирует, что пустые имена не запрашиваются, но есть в результате со значением None."""
+    requested: list[str] = []
+
+    async def resolver(name: str) -> str:
+        requested.append(name)
+        return f"/static/images/{name}.png"
+
+    result: dict[str, str | None] = await resolve_images(["P1", "", None, "P1"], resolver)
+
+    assert requested == ["P1"]
+    assert result == {"P1": "/static/images/P1.png", "": None, None: None}
+
+
+async def test_get_part_image_from_manifest(mock_config_paths: dict[str, Path]) -> None:
+    """Тестирует получение скопированной картинки из индекса без обращения к файловой системе."""
+    source_path: Path = mock_config_paths["PARTS_DIR"] / "test_part.bmp"
+    write_bmp(source_path)
+
+    url = await get_part_image("test_part")
+    entry = image_manifest.get_variant("test_part", ImageVariant.THUMB)
+    assert entry is not None
+    assert entry.url == url
+    assert entry.size == (mock_config_paths["STATIC_IMAGES_DIR"] / entry.file_name).stat().st_size
+
+    # источник удалён, но картинка уже есть в индексе
+    source_path.unlink()
+    assert await get_part_image("test_part") == url
+
+
+async def test_missing_source_cached(mock_config_paths: dict[str, Path]) -> None:
+    """Тестирует, что отсутствующий исходный файл не ищется повторно до перепроверки."""
+    source_path: Path = mock_config_paths["PARTS_DIR"] / "late_part.bmp"
+
+    assert await get_part_image("late_part") is None
+    assert missing_sources.is_missing(source_path)
+
+    write_bmp(source_path)
+    assert await get_part_image("late_part") is None
+
+    assert missing_sources.rescan() == 1
+    assert await get_part_image("late_part") is not None
+
+
+async def test_program_image_refresh(mock_config_paths: dict[str, Path],
+                                     monkeypatch: MonkeyPatch) -> None:
+    """Тестирует повторное извлечение картинки перенесённой программы и смену версии в URL."""
+    ods_path: Path = mock_config_paths["REPORTS_DIR"] / "test_program.ods"
+    dest_path: Path = mock_config_paths["STATIC_IMAGES_DIR"] / "test_program.png"
+
+    def mock_extract_images_from_ods(ods_path: str | Path, dest_path: str | Path) -> None:
+        Path(dest_path).write_bytes(Path(ods_path).read_bytes())
+
+    monkeypatch.setattr("utils.pics_utils.copy_pics_and_get_links.extract_images_from_ods",
+                        mock_extract_images_from_ods)
+    ods_path.write_bytes(b"v1")
+    first_url = await get_program_image("test_program")
+    os.utime(dest_path, (1, 1))
+    ods_path.write_bytes(b"v2-renested")
+
+    assert await get_program_image("test_program") == first_url
+    refreshed_url = await prepare_program_image("test_program", refresh=True)
+
+    assert refreshed_url != first_url
+    assert dest_path.read_bytes() == b"v2-renested"
+    assert await get_program_image("test_program") == refreshed_url
+
+
+async def test_part_image_refresh(mock_config_paths: dict[str, Path]) -> None:
+    """Тестирует пересоздание вариантов изменённого BMP детали и удаление вариантов прежней версии."""
+    source_path: Path = mock_config_paths["PARTS_DIR"] / "test_part.bmp"
+    write_bmp(source_path)
+    first_url = await get_part_image("test_part")
+    first_full_url = await get_part_image("test_part", ImageVariant.FULL)
+    write_bmp(source_path, (600, 400))
+    os.utime(source_path, ns=(time.time_ns() + 10**9,) * 2)
+
+    assert await get_part_image("test_part") == first_url
+    refreshed_url = await prepare_part_image("test_part", refresh=True)
+
+    assert refreshed_url != first_url
+    assert await get_part_image("test_part") == refreshed_url
+    assert await prepare_part_image("test_part", refresh=True) == refreshed_url
+    static_names = sorted(path.name for path in mock_config_paths["STATIC_IMAGES_DIR"].iterdir())
+    assert static_names == sorted([refreshed_url.rsplit("/", 1)[1],
+                                   (await get_part_image("test_part", ImageVariant.FULL)).rsplit("/", 1)[1]])
+    assert first_full_url.rsplit("/", 1)[1] not in static_names
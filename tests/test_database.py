@@ -0,0 +1,48 @@
+"""Тесты для настройки БД приложения."""
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from config import settings
+from db.base_dao import ReadOnlySessionError
+from db.database import set_sqlite_pragmas
+from techman.dao import WoDAO
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_sqlite_pragmas_applied(tmp_path: Path) -> None:
+    """Тестирует выполнение PRAGMA из настроек на каждом новом соединении."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    set_sqlite_pragmas(engine, settings.sqlite_pragmas)
+    try:
+        async with engine.connect() as connection:
+            values = {name: (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+                      for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store", "foreign_keys")}
+    finally:
+        await engine.dispose()
+
+    assert values == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": settings.sqlite_busy_timeout,
+                      "temp_store": 2, "foreign_keys": 1}
+
+
+async def test_read_only_session(tmp_path: Path, db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует запрет изменяющих методов DAO и записи в сессии только для чтения."""
+    read_only_maker = async_sessionmaker(db_session_maker.kw["bind"], info={"read_only": True})
+    async with read_only_maker() as session:
+        assert await WoDAO(session).find_ids_by_names(["Z1"]) == {}
+        with pytest.raises(ReadOnlySessionError):
+            await WoDAO(session).bulk_update_by_field_name([{"WONumber": "Z1", "WOData1": ""}], "WONumber")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    set_sqlite_pragmas(engine, {"query_only": "ON"})
+    try:
+        async with engine.connect() as connection:
+            with pytest.raises(OperationalError, match="readonly"):
+                await connection.execute(text("CREATE TABLE t (id INTEGER)"))
+    finally:
+        await engine.dispose()
@@ -0,0 +1,98 @@
+"""Тесты для пакетной отрисовки DXF чертежей деталей."""
+import asyncio
+
+from pathlib import Path
+
+import ezdxf
+import pytest
+
+from utils.pics_utils.dxf_render import RenderMode, RenderOptions, DxfRenderService, dxf_digest
+from utils.pics_utils.render_cache import INDEX_FILE_NAME
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_render_many_cached_by_content(tmp_path: Path) -> None:
+    """Тестирует отрисовку в пуле процессов, именование по хэшу DXF и параметров и повторное использование отрисовки."""
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True)
+    doc.modelspace().add_circle((50, 25), 10)
+    dxf_path = tmp_path / "PART-1.dxf"
+    doc.saveas(dxf_path)
+    copy_path = tmp_path / "PART-1 copy.dxf"
+    copy_path.write_bytes(dxf_path.read_bytes())
+    output_dir = tmp_path / "renders"
+    service = DxfRenderService(1, output_dir)
+    try:
+        renders = await service.render_many({"PART-1": str(dxf_path), "COPY": str(copy_path),
+                                             "NO-DXF": "", "MISSING": str(tmp_path / "missing.dxf")})
+        again = await service.render_many({"PART-1": str(dxf_path)})
+        no_dimensions = await service.render(dxf_path, RenderOptions(dimensions=False))
+        svg_url = await service.render(dxf_path, RenderOptions(mode=RenderMode.SVG))
+    finally:
+        service.shutdown()
+
+    url = f"/static/renders/{RenderOptions().file_name(dxf_digest(dxf_path))}"
+    assert renders == {"PART-1": url, "COPY": url, "NO-DXF": None, "MISSING": None}
+    assert again == {"PART-1": url}
+    assert no_dimensions not in {url, None}
+    assert svg_url.endswith(".svg")
+    assert sorted(path.name for path in output_dir.iterdir()) == sorted(
+        [INDEX_FILE_NAME, url.rsplit("/", 1)[1], no_dimensions.rsplit("/", 1)[1], svg_url.rsplit("/", 1)[1]])
+    assert (output_dir / svg_url.rsplit("/", 1)[1]).read_text(encoding="utf-8").startswith("<?xml")
+    stats = service.stats()
+    assert (stats["rendered"], stats["failed"], stats["cache"]["entries"]) == (3, 1, 3)
+
+
+def make_dxf(path: Path) -> Path:
+    """Сохранение простого DXF чертежа детали."""
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True)
+    doc.saveas(path)
+    return path
+
+
+async def test_cancelled_render_finishes_for_others(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует, что отмена первого запроса не прерывает отрисовку для объединённых запросов и кэша."""
+    dxf_path = make_dxf(tmp_path / "PART-1.dxf")
+    service = DxfRenderService(1, tmp_path / "renders")
+    started = asyncio.Event()
+    render_to_cache = service._render_to_cache  # noqa SLF001
+
+    async def render_started(*args: object) -> str:
+        started.set()
+        return await render_to_cache(*args)
+
+    monkeypatch.setattr(service, "_render_to_cache", render_started)
+    try:
+        leader = asyncio.ensure_future(service.render(dxf_path))
+        await started.wait()
+        follower = asyncio.ensure_future(service.render(dxf_path))
+        leader.cancel()
+        url = await follower
+    finally:
+        service.shutdown()
+
+    assert leader.cancelled()
+    assert service.cache.get(url.rsplit("/", 1)[1]) is not None
+    assert service.stats()["rendered"] == 1
+
+
+async def test_render_many_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует ограничение числа одновременных отрисовок пакета."""
+    service = DxfRenderService(1, tmp_path / "renders", max_concurrent=3)
+    running, peak = 0, 0
+
+    async def render(dxf_path: Path, options: RenderOptions | None = None) -> str:  # noqa ARG001
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return dxf_path.name
+
+    monkeypatch.setattr(service, "render", render)
+    urls = await service.render_many({f"PART-{index}": f"PART-{index}.dxf" for index in range(20)})
+
+    assert len(urls) == 20  # noqa PLR2004
+    assert peak == 3  # noqa PLR2004
@@ -0,0 +1,94 @@
+"""Тесты для потокового формирования excel."""
+import io
+import datetime
+
+from decimal import Decimal
+from collections.abc import AsyncIterator
+
+import pytest
+
+from openpyxl import load_workbook
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from reports.summary import SummaryGroup, build_parts_summary, summary_excel_sheets
+from utils.excel_utils import ColumnKind, ExcelColumn, save_excel, create_excel, stream_excel, infer_columns
+from reports.pagination import stream_full_parts_excel
+from tests.test_reports_parts_full import END, START, add_parts
+
+CREATED = datetime.datetime(2025, 3, 1, 8, 30)  # noqa DTZ001
+
+
+async def collect(chunks: AsyncIterator[bytes]) -> io.BytesIO:
+    """Сборка файла из частей потокового ответа."""
+    return io.BytesIO(b"".join([chunk async for chunk in chunks]))
+
+
+def test_infer_columns() -> None:
+    """Тестирует определение типов колонок по первому непустому значению и отбор по заголовкам."""
+    rows = [{"name": "A", "qty": None, "weight": Decimal("1.5"), "created_at": CREATED, "skip": 1},
+            {"name": "B", "qty": 2, "weight": Decimal("2.5"), "created_at": CREATED, "skip": 1}]
+    columns = infer_columns(rows, {"name": "Имя", "qty": "Кол-во", "weight": "Вес", "created_at": "Создана"})
+    assert [(column.key, column.title, column.kind) for column in columns] == [
+        ("name", "Имя", ColumnKind.TEXT), ("qty", "Кол-во", ColumnKind.INTEGER),
+        ("weight", "Вес", ColumnKind.NUMBER), ("created_at", "Создана", ColumnKind.DATETIME)]
+    assert [column.key for column in infer_columns(rows, {"name": "Имя"}, only_titled=False)][-1] == "skip"
+
+
+def test_create_excel_formats() -> None:
+    """Тестирует значения и форматы ячеек: даты и числа форматируются колонкой, а не строкой."""
+    rows = [{"name": "A", "weight": Decimal("1.25"), "created_at": CREATED, "doers": ["Иванов", "Петров"]}]
+    sheet = load_workbook(create_excel(rows, title="Детали"))["Детали"]
+    assert [cell.value for cell in sheet[1]] == ["name", "weight", "created_at", "doers"]
+    name, weight, created_at, doers = sheet[2]
+    assert (name.value, weight.value, created_at.value, doers.value) == ("A", 1.25, CREATED, "Иванов, Петров")
+    assert (weight.number_format, created_at.number_format) == ("0.00", "DD.MM.YYYY HH:MM")
+    assert sheet.freeze_panes == "A2"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_stream_excel_batches() -> None:
+    """Тестирует запись частей строк на один лист с колонками по первой части."""
+    async def batches() -> AsyncIterator[list[dict]]:
+        for start in range(0, 30, 10):
+            yield [{"number": number, "extra": "x"} for number in range(start, start + 10)]
+
+    workbook = load_workbook(await collect(stream_excel(batches(), "Числа", {"number": "Номер"})))
+    rows = list(workbook["Числа"].values)
+    assert rows[0] == ("Номер",)
+    assert [row[0] for row in rows[1:]] == list(range(30))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_stream_excel_empty() -> None:
+    """Тестирует пустой поток: файл с листом из заголовков заданных колонок."""
+    async def batches() -> AsyncIterator[list[dict]]:
+        return
+        yield
+
+    columns = [ExcelColumn(key="name", title="Имя")]
+    workbook = load_workbook(await collect(stream_excel(batches(), "Пусто", columns=columns)))
+    assert list(workbook["Пусто"].values) == [("Имя",)]
+
+
+def test_summary_excel_sheets() -> None:
+    """Тестирует листы сводного отчёта: итоги и лист на каждую группировку."""
+    rows = [("P1", "Z1", "M1", "GS", "Иванов", 10.0, 2.0, 1.0, 3, 1),
+            ("P2", "Z1", "M1", "GS", "Петров", 5.0, 1.0, 1.0, 1, 1)]
+    summary = build_parts_summary(rows, [SummaryGroup.PROGRAM, SummaryGroup.DOER])
+    with save_excel(summary_excel_sheets(summary)) as file:
+        workbook = load_workbook(io.BytesIO(file.read()))
+    assert workbook.sheetnames == ["Итоги", "Программы", "Исполнители"]
+    programs = list(workbook["Программы"].values)
+    assert [row[0] for row in programs[1:]] == ["P1", "P2"]
+    assert workbook["Итоги"]["A2"].value == len(rows)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_stream_full_parts_excel(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует полный отчёт по деталям в excel: детали периода, исполнители именами."""
+    await add_parts(db_session_maker)
+    workbook = load_workbook(await collect(stream_full_parts_excel(START, END, db_session_maker)))
+    header, *rows = workbook["Детали"].values
+    part_names = [row[header.index("Деталь")] for row in rows]
+    assert sorted(part_names) == [f"A{index}" for index in range(5)]
+    assert {row[header.index("Исполнитель")] for row in rows} == {"Иванов"}
@@ -0,0 +1,79 @@
+"""Тесты для общих пулов потоков приложения."""
+import asyncio
+import threading
+
+import pytest
+
+from utils.executors import AppExecutors, ExecutorName, MonitoredExecutor
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_run_returns_result() -> None:
+    """Тестирует выполнение функции в пуле и учёт выполненных задач."""
+    app_executors = AppExecutors({ExecutorName.SIGMA: 2})
+
+    result = await app_executors.run(ExecutorName.SIGMA, sum, (1, 2, 3))
+
+    assert result == 6  # noqa PLR2004
+    assert app_executors.stats()["sigma"]["completed"] == 1
+    app_executors.shutdown()
+
+
+async def test_run_propagates_error() -> None:
+    """Тестирует проброс исключения и учёт ошибок."""
+    app_executors = AppExecutors({ExecutorName.EXCEL: 1})
+
+    with pytest.raises(ZeroDivisionError):
+        await app_executors.run(ExecutorName.EXCEL, divmod, 1, 0)
+
+    assert app_executors.stats()["excel"]["failed"] == 1
+    app_executors.shutdown()
+
+
+async def test_queue_depth_and_saturation() -> None:
+    """Тестирует учёт глубины очереди и загрузки при занятых потоках."""
+    executor = MonitoredExecutor("test", max_workers=2)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(5)]
+    while executor.stats()["active"] < 2:  # noqa PLR2004
+        await asyncio.sleep(0.001)
+
+    stats = executor.stats()
+    assert stats["saturation"] == 1.0
+    assert stats["queue_depth"] == 3  # noqa PLR2004
+    assert stats["max_queue_depth"] >= 3  # noqa PLR2004
+
+    release.set()
+    for future in futures:
+        future.result()
+    assert executor.stats()["queue_depth"] == 0
+    executor.shutdown()
+
+
+async def test_pools_isolated() -> None:
+    """Тестирует, что занятый пул не блокирует задачи другого пула."""
+    app_executors = AppExecutors({ExecutorName.SIGMA: 1, ExecutorName.IMAGES: 1})
+    release = threading.Event()
+    blocked = asyncio.ensure_future(app_executors.run(ExecutorName.SIGMA, release.wait))
+
+    assert await app_executors.run(ExecutorName.IMAGES, abs, -1) == 1
+
+    release.set()
+    await blocked
+    app_executors.shutdown()
+
+
+async def test_get_after_shutdown() -> None:
+    """Тестирует ошибку при обращении к пулу после остановки и повторный запуск."""
+    app_executors = AppExecutors({ExecutorName.IMAGES: 1})
+    app_executors.start()
+    app_executors.shutdown()
+
+    with pytest.raises(RuntimeError):
+        await app_executors.run(ExecutorName.IMAGES, abs, -1)
+    assert app_executors.stats() == {}
+
+    app_executors.start()
+    assert await app_executors.run(ExecutorName.IMAGES, abs, -1) == 1
+    app_executors.shutdown()
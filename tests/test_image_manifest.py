@@ -0,0 +1,46 @@
+"""Тесты для индекса картинок static/images."""
+import os
+
+from pathlib import Path
+
+from watchfiles import Change
+
+from utils.pics_utils.image_manifest import ImageManifest, file_version
+from utils.pics_utils.image_variants import ImageVariant, variant_file_name
+
+
+def test_load_and_apply_changes(tmp_path: Path) -> None:
+    """Тестирует загрузку индекса и применение изменений каталога."""
+    (tmp_path / "P1.png").write_bytes(b"png")
+    (tmp_path / "notes.txt").touch()
+    manifest = ImageManifest(tmp_path)
+
+    assert manifest.load() == 1
+    assert manifest.get("P1.png").url == f"/static/images/P1.png?v={file_version((tmp_path / 'P1.png').stat())}"
+    assert manifest.get("notes.txt") is None
+
+    (tmp_path / "PART.bmp").write_bytes(b"BMP")
+    (tmp_path / "P1.png").unlink()
+    manifest.apply_changes({(Change.added, str(tmp_path / "PART.bmp")),
+                            (Change.deleted, str(tmp_path / "P1.png"))})
+
+    assert manifest.get("P1.png") is None
+    assert manifest.get("PART.bmp").size == len(b"BMP")
+    assert len(manifest) == 1
+
+
+def test_variant_index(tmp_path: Path) -> None:
+    """Тестирует индекс вариантов картинок: используется самая новая версия варианта."""
+    old_file = tmp_path / variant_file_name("PART", ImageVariant.THUMB, "aaaaaaaaaaaa")
+    new_file = tmp_path / variant_file_name("PART", ImageVariant.THUMB, "bbbbbbbbbbbb")
+    old_file.touch()
+    new_file.touch()
+    os.utime(old_file, (1, 1))
+    manifest = ImageManifest(tmp_path)
+    manifest.load()
+
+    assert manifest.get_variant("PART", ImageVariant.THUMB).file_name == new_file.name
+    assert manifest.get_variant("PART", ImageVariant.FULL) is None
+
+    manifest.discard(new_file.name)
+    assert manifest.get_variant("PART", ImageVariant.THUMB) is None
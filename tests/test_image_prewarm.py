@@ -0,0 +1,37 @@
+"""Тесты для фоновой подготовки картинок."""
+import pytest
+
+from utils.pics_utils.image_prewarm import ImageKind, ImagePrewarmQueue
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_prewarm_dedup_and_retry() -> None:
+    """Тестирует отсутствие дублей в очереди, повтор после ошибки и статистику."""
+    calls: list[str] = []
+
+    async def resolver(name: str) -> str | None:
+        calls.append(name)
+        if name == "FLAKY" and calls.count(name) == 1:
+            msg = "network share unavailable"
+            raise OSError(msg)
+        if name == "BROKEN":
+            msg = "broken ods"
+            raise ValueError(msg)
+        return None if name == "MISSING" else f"/static/images/{name}.png"
+
+    queue = ImagePrewarmQueue({ImageKind.PROGRAM: resolver, ImageKind.PART: resolver},
+                              workers=2, max_retries=1, retry_delay=0.01)
+    queue.start()
+    try:
+        names = ["P1", "FLAKY", "P1", "MISSING", "BROKEN"]
+        assert queue.enqueue_programs(names) == len(set(names))
+        assert queue.enqueue_programs(["P1"]) == 0
+        await queue.join()
+    finally:
+        await queue.stop()
+
+    assert sorted(calls) == ["BROKEN", "BROKEN", "FLAKY", "FLAKY", "MISSING", "P1"]
+    stats = queue.stats()
+    assert (stats["done"], stats["missing"], stats["retried"], stats["failed"]) == (2, 1, 2, 1)
+    assert stats["pending"] == 0
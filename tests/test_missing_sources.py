@@ -0,0 +1,52 @@
+"""Тесты для кэша отсутствующих исходных файлов картинок."""
+import os
+
+from pathlib import Path
+
+import pytest
+
+from utils.pics_utils.missing_sources import MissingSourceCache
+
+
+def test_rescan_lists_directory_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует перепроверку большого каталога: он читается один раз, появившиеся и истекшие записи удаляются."""
+    cache = MissingSourceCache(ttl=60, max_entries=100, list_threshold=40)
+    for index in range(50):
+        cache.add(tmp_path / f"PART-{index}.bmp")
+    (tmp_path / "PART-1.bmp").touch()
+    (tmp_path / "PART-2.BMP").touch()  # сетевой диск не различает регистр
+    scanned = []
+    scandir = os.scandir
+
+    def counting_scandir(path: Path) -> object:
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    monkeypatch.setattr("utils.pics_utils.missing_sources._exists", lambda _: pytest.fail("каталог читается целиком"))
+
+    assert cache.rescan() == 2  # noqa PLR2004
+
+    assert scanned == [tmp_path]
+    assert not cache.is_missing(tmp_path / "PART-1.bmp")
+    assert cache.is_missing(tmp_path / "PART-3.bmp")
+
+    cache.ttl = -1
+    cache.add(tmp_path / "expired.bmp")
+    assert cache.rescan() == 1
+
+
+def test_rescan_small_directory_checks_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует перепроверку каталога с несколькими записями по файлам, без чтения каталога."""
+    cache = MissingSourceCache(ttl=60, max_entries=100, list_threshold=50)
+    cache.add(tmp_path / "PART-1.bmp")
+    cache.add(tmp_path / "PART-2.bmp")
+    cache.add(tmp_path / "missing_dir" / "PART-0.bmp")
+    (tmp_path / "PART-1.bmp").touch()
+    monkeypatch.setattr(os, "scandir", lambda _: pytest.fail("каталог с несколькими записями не должен читаться"))
+
+    assert cache.rescan() == 1
+
+    assert not cache.is_missing(tmp_path / "PART-1.bmp")
+    assert cache.is_missing(tmp_path / "PART-2.bmp")
+    assert cache.is_missing(tmp_path / "missing_dir" / "PART-0.bmp")
@@ -0,0 +1,108 @@
+"""Тесты для вычисления габаритов и отрисовки DXF чертежа."""
+from pathlib import Path
+from xml.etree import ElementTree
+
+import ezdxf
+import pytest
+
+from ezdxf import bbox
+
+from utils.pics_utils.part_dxf_to_png import BoundsCollector, get_bounding_box, dxf_to_svg_with_bounding
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+def assert_matches_ezdxf(msp: ezdxf.layouts.Modelspace) -> None:
+    """Сравнивает габариты с ezdxf.bbox (ezdxf заменяет дуги ломаными, отсюда допуск)."""
+    min_point, max_point = get_bounding_box(msp)
+    expected = bbox.extents(msp)
+    assert (min_point.x, min_point.y) == pytest.approx((expected.extmin.x, expected.extmin.y), abs=1e-2)
+    assert (max_point.x, max_point.y) == pytest.approx((expected.extmax.x, expected.extmax.y), abs=1e-2)
+
+
+def test_arc_extents_exact() -> None:
+    """Тестирует точные габариты дуг по пересечению квадрантов, а не по описанной окружности."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_arc((0, 0), 10, 30, 120)  # пересекает только 90 градусов
+    min_point, max_point = get_bounding_box(msp)
+
+    assert (min_point.x, min_point.y) == pytest.approx((-5.0, 5.0))
+    assert (max_point.x, max_point.y) == pytest.approx((8.660254, 10.0))
+
+    msp.add_arc((100, 0), 5, 350, 10)  # через 0 градусов
+    msp.add_arc((0, 100), 3, 200, 100)  # через 270 и 0 градусов
+    assert_matches_ezdxf(msp)
+
+
+def test_polyline_semicircle() -> None:
+    """Тестирует габариты полуокружности, заданной выпуклостью 1 (против часовой стрелки - вниз)."""
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0, 1), (10, 0, 0)], format="xyb")
+    min_point, max_point = get_bounding_box(doc.modelspace())
+
+    assert (min_point.x, min_point.y, max_point.x, max_point.y) == pytest.approx((0, -5, 10, 0))
+
+
+@pytest.mark.parametrize("bulge", [0.5, -0.5, 1.0, -2.0])
+def test_polyline_bulges(bulge: float) -> None:
+    """Тестирует габариты полилинии с дуговыми сегментами."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0, bulge), (50, 10, 0), (60, -20, bulge)], format="xyb", close=True)
+    msp.add_line((-5, 3), (7, 40))
+    msp.add_circle((20, 20), 4)
+
+    assert_matches_ezdxf(msp)
+
+
+def test_block_extents_memoized() -> None:
+    """Тестирует габариты вложенных вставок блоков и однократное вычисление габаритов блока."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    block = doc.blocks.new("HOLE", base_point=(1, 1))
+    block.add_circle((5, 5), 5)
+    block.add_arc((0, 0), 3, 180, 270)
+    outer = doc.blocks.new("PLATE")
+    outer.add_blockref("HOLE", (10, 0), dxfattribs={"rotation": 90})
+    outer.add_lwpolyline([(0, 0), (40, 0), (40, 20)])
+    for index in range(50):
+        msp.add_blockref("HOLE", (index * 20, 0), dxfattribs={"xscale": 2})
+    msp.add_blockref("PLATE", (-100, -100), dxfattribs={"rotation": 180})
+
+    collector = BoundsCollector()
+    calls = []
+    entities_bounds = collector.entities_bounds
+
+    def counting_entities_bounds(entities: object) -> object:
+        calls.append(entities.name)
+        return entities_bounds(entities)
+
+    collector.entities_bounds = counting_entities_bounds
+    collector.entities_bounds(msp)
+
+    assert sorted(calls) == ["HOLE", "Model", "PLATE"]
+    assert_matches_ezdxf(msp)
+
+
+def test_svg_bounding_dimensions(tmp_path: Path) -> None:
+    """Тестирует отрисовку SVG с габаритными размерами векторным текстом внутри области SVG."""
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True)
+    doc.modelspace().add_circle((50, 25), 10)
+    dxf_path = tmp_path / "PART.dxf"
+    doc.saveas(dxf_path)
+
+    svg_image = dxf_to_svg_with_bounding(dxf_path, str(tmp_path / "PART.svg"))
+
+    assert (tmp_path / "PART.svg").read_text(encoding="utf-8") == svg_image
+    root = ElementTree.fromstring(svg_image)  # noqa S314
+    _, _, view_width, view_height = map(float, root.get("viewBox").split())
+    texts = root.findall(f".//{SVG_NS}text")
+    assert [text.text for text in texts] == ["Ширина: 100.00", "Высота: 50.00"]
+    for text in texts:
+        assert 0 < float(text.get("x")) < view_width
+        assert 0 < float(text.get("y")) < view_height
+
+    without_dimensions = ElementTree.fromstring(dxf_to_svg_with_bounding(dxf_path, dimensions=False))  # noqa S314
+    assert without_dimensions.findall(f".//{SVG_NS}text") == []
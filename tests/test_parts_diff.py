@@ -0,0 +1,65 @@
+"""Тесты для сравнения деталей PlasmaReport и sigma nest."""
+import datetime
+
+from decimal import Decimal
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from techman.models import WO, Part, Program
+from techman.parts_diff import diff_parts, apply_parts_diff
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+NOW = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001
+
+
+def sigma_part(part_name: str, program_name: str = "P1", wo_number: str = "Z1", qty: int = 1) -> dict:
+    """Деталь sigma nest."""
+    return {"PartName": part_name, "ProgramName": program_name, "WONumber": wo_number, "QtyInProcess": qty,
+            "PartLength": 10.0, "PartWidth": 5.0, "TrueArea": 1.0, "RectArea": 1.0, "TrueWeight": 1.0,
+            "RectWeight": 1.0, "CuttingTimePart": Decimal("1.5"), "CuttingLength": 10.0, "PierceQtyPart": 1,
+            "NestedArea": 1.0, "TotalCuttingTime": Decimal("1.5"), "MasterPartQty": 1, "WOState": 1,
+            "DueDate": NOW, "RevisionNumber": "1", "PK_PIP": f"PK-{part_name}", "Thickness": 12.0,
+            "SourceFileName": f"{part_name}.dxf"}
+
+
+def sigma_wo(wo_number: str) -> dict:
+    """Заказ sigma nest."""
+    return {"WONumber": wo_number, "CustomerName": "Customer", "WODate": NOW, "OrderDate": NOW,
+            "WOData1": "", "WOData2": "", "DateCreated": NOW}
+
+
+async def test_diff_parts_applied(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует вычисление и запись добавленных, изменённых и удалённых деталей."""
+    async with db_session_maker() as session, session.begin():
+        program = Program(ProgramName="P1", RepeatIDProgram="1", UsedArea=1.0, ScrapFraction=0.1, MachineName="M",
+                          CuttingTimeProgram=Decimal(1), PostDateTime=NOW, Material="GS", Thickness=12.0,
+                          SheetLength=1.0, SheetWidth=1.0, ArchivePacketID=1, TimeLineID=1, PostedByUserID=1,
+                          PierceQtyProgram=1)
+        wo = WO(**sigma_wo("Z1"))
+        session.add_all([program, wo])
+        await session.flush()
+        for name in ("A", "B", "C"):
+            values = {key: value for key, value in sigma_part(name).items() if key not in ("ProgramName", "WONumber")}
+            session.add(Part(**values, program_id=program.id, wo_number_id=wo.id))
+    async with db_session_maker() as session:
+        existing = [part.to_dict() for part in (await session.scalars(select(Part))).all()]
+
+    sigma_parts = [sigma_part("A"), sigma_part("B", qty=5), sigma_part("D", wo_number="Z2")]
+    diff = diff_parts(existing, sigma_parts, {program.id: "P1"})
+
+    assert [part["PartName"] for part in diff.inserts] == ["D"]
+    assert [(item["PartName"], item["changes"]) for item in diff.updates] == [("B", {"QtyInProcess": (1, 5)})]
+    assert [part["PartName"] for part in diff.deletes] == ["C"]
+
+    async with db_session_maker() as session, session.begin():
+        counts = await apply_parts_diff(session, diff, [sigma_wo("Z1"), sigma_wo("Z2")])
+    assert counts == {"inserted": 1, "updated": 1, "deleted": 1}
+
+    async with db_session_maker() as session:
+        parts = (await session.execute(
+            select(Part.PartName, Part.QtyInProcess, WO.WONumber).join(WO).order_by(Part.PartName))).all()
+    assert [tuple(row) for row in parts] == [("A", 1, "Z1"), ("B", 5, "Z1"), ("D", 1, "Z2")]
@@ -0,0 +1,63 @@
+"""Тесты для извлечения картинки программы из ODS."""
+import zipfile
+
+from pathlib import Path
+
+import pytest
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from utils.pics_utils.program_ods_to_png import extract_images_from_ods
+
+
+def create_ods(path: Path, members: dict[str, bytes]) -> None:
+    """Создаёт ODS (ZIP-архив) с заданными файлами."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as ods_zip:
+        for name, data in members.items():
+            ods_zip.writestr(name, data)
+
+
+def test_extract_image_streamed(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Тестирует извлечение первого изображения частями без временных файлов после записи."""
+    image = bytes(range(256)) * 20_000
+    ods_path = tmp_path / "program.ods"
+    create_ods(ods_path, {"content.xml": b"<xml/>", "Pictures/1000.png": image, "Pictures/2000.jpg": b"jpg"})
+    monkeypatch.setattr("utils.pics_utils.program_ods_to_png.COPY_CHUNK_SIZE", 4096)
+    dest_path = tmp_path / "program.png"
+
+    assert extract_images_from_ods(ods_path, dest_path) == dest_path
+
+    assert dest_path.read_bytes() == image
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["program.ods", "program.png"]
+
+
+def test_extract_failure_keeps_previous_image(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Тестирует, что ошибка при копировании не портит ранее извлечённую картинку."""
+    ods_path = tmp_path / "program.ods"
+    create_ods(ods_path, {"Pictures/1000.png": b"new image"})
+    dest_path = tmp_path / "program.png"
+    dest_path.write_bytes(b"old image")
+
+    def broken_copy(*args: object) -> None:  # noqa ARG001
+        msg = "network share unavailable"
+        raise OSError(msg)
+
+    monkeypatch.setattr("shutil.copyfileobj", broken_copy)
+
+    with pytest.raises(OSError, match="network share unavailable"):
+        extract_images_from_ods(ods_path, dest_path)
+
+    assert dest_path.read_bytes() == b"old image"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["program.ods", "program.png"]
+
+
+def test_extract_without_image(tmp_path: Path) -> None:
+    """Тестирует ODS без изображений и повреждённый файл."""
+    ods_path = tmp_path / "program.ods"
+    create_ods(ods_path, {"content.xml": b"<xml/>"})
+    broken_path = tmp_path / "broken.ods"
+    broken_path.write_bytes(b"not a zip")
+
+    assert extract_images_from_ods(ods_path, tmp_path / "program.png") is None
+    assert extract_images_from_ods(broken_path, tmp_path / "broken.png") is None
+    assert not (tmp_path / "program.png").exists()
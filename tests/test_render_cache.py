@@ -0,0 +1,74 @@
+"""Тесты для дискового кэша отрисовок DXF."""
+from pathlib import Path
+
+import pytest
+
+from utils.pics_utils.render_cache import INDEX_FILE_NAME, RenderCache
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+def write_render(directory: Path, file_name: str, size: int) -> None:
+    """Запись файла отрисовки заданного размера."""
+    (directory / file_name).write_bytes(b"\0" * size)
+
+
+async def test_lru_eviction_by_size(tmp_path: Path) -> None:
+    """Тестирует вытеснение давно не запрошенных отрисовок при превышении размера кэша."""
+    cache = RenderCache(tmp_path, max_bytes=250)
+    cache.load()
+    for file_name in ("a.png", "b.png"):
+        write_render(tmp_path, file_name, 100)
+        cache.put(file_name)
+    assert cache.get("a.png") == tmp_path / "a.png"  # b становится давно не запрошенной
+
+    write_render(tmp_path, "c.png", 100)
+    cache.put("c.png")
+
+    assert not (tmp_path / "b.png").exists()
+    assert cache.get("b.png") is None
+    assert cache.get("a.png") is not None
+    assert cache.get("c.png") is not None
+    assert cache.stats() | {"hits": 0, "misses": 0} == {"entries": 2, "bytes": 200, "max_bytes": 250,
+                                                        "hits": 0, "misses": 0, "evicted": 1}
+
+
+async def test_index_restored_after_restart(tmp_path: Path) -> None:
+    """Тестирует восстановление порядка LRU из индексного файла и удаление файлов без записи в индексе."""
+    cache = RenderCache(tmp_path, max_bytes=1000)
+    cache.load()
+    for file_name in ("old.png", "new.png"):
+        write_render(tmp_path, file_name, 100)
+        cache.put(file_name)
+    cache.get("old.png")
+    cache.save()
+    write_render(tmp_path, "orphan.png", 100)  # недописанная или удалённая из индекса отрисовка
+
+    restarted = RenderCache(tmp_path, max_bytes=150)
+    assert restarted.load() == 1
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [INDEX_FILE_NAME, "old.png"]
+    assert restarted.get("old.png") is not None
+
+
+async def test_missing_file_is_cache_miss(tmp_path: Path) -> None:
+    """Тестирует промах кэша для отрисовки, удалённой в обход кэша."""
+    cache = RenderCache(tmp_path, max_bytes=1000)
+    cache.load()
+    write_render(tmp_path, "a.png", 100)
+    cache.put("a.png")
+    (tmp_path / "a.png").unlink()
+
+    assert cache.get("a.png") is None
+    assert cache.stats()["bytes"] == 0
+
+
+async def test_corrupted_index(tmp_path: Path) -> None:
+    """Тестирует пересоздание повреждённого индекса."""
+    (tmp_path / INDEX_FILE_NAME).write_text("{not json", encoding="utf-8")
+    write_render(tmp_path, "a.png", 100)
+
+    cache = RenderCache(tmp_path, max_bytes=1000)
+
+    assert cache.load() == 0
+    assert [path.name for path in tmp_path.iterdir()] == [INDEX_FILE_NAME]
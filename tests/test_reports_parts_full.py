@@ -0,0 +1,147 @@
+"""Тесты для постраничного и потокового полного отчёта по деталям."""
+import datetime
+
+from decimal import Decimal
+from collections.abc import AsyncIterator
+
+import httpx
+import orjson
+import pytest
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import settings
+from reports import router as reports_router
+from exceptions import WrongInputError
+from reports.dao import ReportPartDAO
+from techman.models import WO, FioDoer
+from reports.pagination import decode_cursor, encode_cursor, stream_rows_json, stream_full_parts_ndjson
+from sigma_handlers.sigma_utils import SigmaBatch
+from tests.test_reports_summary import NOW, make_part, make_program
+from sigma_handlers.connection_pool import PoolTimeoutError
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+START, END = datetime.date(2025, 3, 1), datetime.date(2025, 3, 2)
+
+
+async def add_parts(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Пять деталей периода, две с одинаковой датой создания, и деталь вне периода."""
+    async with db_session_maker() as session, session.begin():
+        program = make_program("P1", "M1", "GS")
+        wo = WO(WONumber="Z1", CustomerName="Customer", WODate=NOW, OrderDate=NOW, DateCreated=NOW)
+        doer = FioDoer(fio_doer="Иванов")
+        created = [NOW, NOW + datetime.timedelta(minutes=5), NOW + datetime.timedelta(minutes=5),
+                   NOW + datetime.timedelta(minutes=1), NOW + datetime.timedelta(hours=1)]
+        session.add_all([make_part(f"A{index}", program, wo, qty=1, qty_fact=0, cutting_time="1", doer=doer,
+                                   created_at=created_at) for index, created_at in enumerate(created)])
+        session.add(make_part("OLD", program, wo, qty=1, qty_fact=0, cutting_time="1",
+                              created_at=datetime.datetime(2024, 1, 1)))  # noqa DTZ001
+
+
+async def test_keyset_pages(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует обход отчёта страницами по курсору (created_at, id) без пропусков и повторов."""
+    await add_parts(db_session_maker)
+    names, after = [], None
+    async with db_session_maker() as session:
+        dao = ReportPartDAO(session)
+        while True:
+            page = await dao.get_full_part_data_page(START, END, limit=2, after=after)
+            names.extend(part["PartName"] for part in page)
+            if len(page) < 2:  # noqa PLR2004
+                break
+            after = decode_cursor(encode_cursor(page[-1]["created_at"], page[-1]["id"]))
+        full = await dao.get_full_part_data_start_end(START, END)
+
+    assert names == ["A0", "A3", "A1", "A2", "A4"]
+    assert [part["PartName"] for part in full] == names
+    assert full[0]["done_by_fio_doer"]["fio_doer"] == "Иванов"
+
+
+async def test_stream_ndjson(db_session_maker: async_sessionmaker[AsyncSession],
+                             monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует потоковый отчёт NDJSON частями: заголовки первой строкой, затем детали."""
+    await add_parts(db_session_maker)
+    monkeypatch.setattr(settings, "REPORTS_STREAM_BATCH_SIZE", 2)
+
+    chunks = [chunk async for chunk in stream_full_parts_ndjson(START, END, db_session_maker)]
+
+    lines = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+    assert lines[0]["headers"]["PartName"] == "Деталь"
+    assert [line["PartName"] for line in lines[1:]] == ["A0", "A3", "A1", "A2", "A4"]
+    assert lines[1]["TotalCuttingTime"] == 1.0
+    assert len(chunks) == 4  # noqa PLR2004 заголовки и три части по две детали
+
+
+async def test_invalid_cursor() -> None:
+    """Тестирует ошибку 400 для неверного курсора."""
+    with pytest.raises(WrongInputError) as error:
+        decode_cursor("не курсор")
+    assert error.value.status_code == 400  # noqa PLR2004
+
+
+async def test_keyset_pages_server_default(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует страницы по курсору для деталей с одной датой создания из server_default БД.
+
+    sqlite хранит такую дату без долей секунды, а курсор передаётся с микросекундами.
+    """
+    async with db_session_maker() as session, session.begin():
+        program = make_program("P1", "M1", "GS")
+        wo = WO(WONumber="Z1", CustomerName="Customer", WODate=NOW, OrderDate=NOW, DateCreated=NOW)
+        session.add_all([make_part(f"A{index}", program, wo, qty=1, qty_fact=0, cutting_time="1", created_at=None)
+                         for index in range(5)])
+    today = datetime.datetime.now(datetime.UTC).date()  # func.now() sqlite - CURRENT_TIMESTAMP в UTC
+    names, after = [], None
+    async with db_session_maker() as session:
+        dao = ReportPartDAO(session)
+        while True:
+            page = await dao.get_full_part_data_page(today, today + datetime.timedelta(days=1), limit=2, after=after)
+            names.extend(part["PartName"] for part in page)
+            if len(page) < 2:  # noqa PLR2004
+                break
+            after = decode_cursor(encode_cursor(page[-1]["created_at"], page[-1]["id"]))
+
+    assert names == [f"A{index}" for index in range(5)]
+
+
+async def test_stream_rows_json() -> None:
+    """Тестирует документ деталей заказа частями: данные всех частей и заголовки по первой строке."""
+    async def batches(*parts: list[dict]) -> AsyncIterator[list[dict]]:
+        for rows in parts:
+            yield rows
+
+    rows = [{"PartName": "A0", "TotalCuttingTime": Decimal("1.5"), "DueDate": NOW},
+            {"PartName": "A1", "TotalCuttingTime": Decimal(2), "DueDate": NOW}]
+    document = orjson.loads(b"".join([chunk async for chunk in stream_rows_json(batches([], rows[:1], rows[1:]))]))
+    empty = orjson.loads(b"".join([chunk async for chunk in stream_rows_json(batches())]))
+
+    assert [row["PartName"] for row in document["data"]] == ["A0", "A1"]
+    assert document["data"][0]["TotalCuttingTime"] == 1.5  # noqa PLR2004
+    assert document["data"][0]["DueDate"] == NOW.isoformat()
+    assert document["headers"]["PartName"] == "Деталь"
+    assert empty == {"data": [], "headers": None}
+
+
+async def test_wo_details_sigma_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует детали заказа: ошибка sigma nest до первой части возвращается статусом ошибки, а не обрывом 200."""
+    async def failing_stream(_: str) -> AsyncIterator[SigmaBatch]:
+        raise PoolTimeoutError
+        yield  # генератор
+
+    async def one_batch(_: str) -> AsyncIterator[SigmaBatch]:
+        yield SigmaBatch(("PartName",), [("A0",)])
+
+    app = FastAPI()
+    app.include_router(reports_router.router)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(reports_router, "stream_parts_info_by_wo", failing_stream)
+        failed = [await client.get(url, params={"wo_number": "Z1"})
+                  for url in ("/get_wo_details", "/get_wo_details/xlsx")]
+        monkeypatch.setattr(reports_router, "stream_parts_info_by_wo", one_batch)
+        response = await client.get("/get_wo_details", params={"wo_number": "Z1"})
+
+    assert [response.status_code for response in failed] == [500, 500]
+    assert response.status_code == 200  # noqa PLR2004
+    assert response.json()["data"] == [{"PartName": "A0"}]
@@ -0,0 +1,78 @@
+"""Тесты для сводного отчёта по деталям."""
+import datetime
+
+from decimal import Decimal
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from reports.dao import ReportPartDAO
+from techman.models import WO, Part, FioDoer, Program
+from reports.summary import SummaryGroup, build_parts_summary
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+NOW = datetime.datetime(2025, 3, 1, 8, 0)  # noqa DTZ001
+
+
+def make_program(name: str, machine: str, material: str) -> Program:
+    """Программа резки."""
+    return Program(ProgramName=name, RepeatIDProgram="1", UsedArea=1.0, ScrapFraction=0.1, MachineName=machine,
+                   CuttingTimeProgram=Decimal(1), PostDateTime=NOW, Material=material, Thickness=12.0,
+                   SheetLength=1.0, SheetWidth=1.0, ArchivePacketID=1, TimeLineID=1, PostedByUserID=1,
+                   PierceQtyProgram=1)
+
+
+def make_part(name: str, program: Program, wo: WO, qty: int, qty_fact: int | None, cutting_time: str,
+              doer: FioDoer | None = None, created_at: datetime.datetime | None = NOW) -> Part:
+    """Деталь с весом 2 и площадью 0.5 на штуку. При created_at=None дата создания - server_default БД."""
+    part = Part(PartName=name, program=program, wo_number=wo, done_by_fio_doer=doer, QtyInProcess=qty,
+                qty_fact=qty_fact, PartLength=10.0, PartWidth=5.0, TrueArea=0.5, RectArea=1.0, TrueWeight=2.0,
+                RectWeight=1.0, CuttingTimePart=Decimal(1), CuttingLength=10.0, PierceQtyPart=1, NestedArea=1.0,
+                TotalCuttingTime=Decimal(cutting_time), MasterPartQty=1, WOState="1", DueDate=NOW,
+                RevisionNumber="1", PK_PIP=f"PK-{name}", Thickness=12.0)
+    if created_at is not None:
+        part.created_at = created_at
+    return part
+
+
+async def test_parts_summary(db_session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Тестирует итоги и суммы сводного отчёта по программам, машинам и исполнителям."""
+    async with db_session_maker() as session, session.begin():
+        first = make_program("P1", "M1", "GS")
+        second = make_program("P2", "M2", "GS")
+        wo = WO(WONumber="Z1", CustomerName="Customer", WODate=NOW, OrderDate=NOW, DateCreated=NOW)
+        doer = FioDoer(fio_doer="Иванов")
+        session.add_all([
+            make_part("A", first, wo, qty=4, qty_fact=4, cutting_time="10.5", doer=doer),
+            make_part("B", first, wo, qty=2, qty_fact=None, cutting_time="1.5"),
+            make_part("C", second, wo, qty=10, qty_fact=3, cutting_time="20", doer=doer),
+            make_part("OLD", second, wo, qty=1, qty_fact=0, cutting_time="99",
+                      created_at=datetime.datetime(2024, 1, 1)),  # noqa DTZ001
+        ])
+
+    async with db_session_maker() as session:
+        rows = await ReportPartDAO(session).get_parts_summary_columns(datetime.date(2025, 3, 1),
+                                                                     datetime.date(2025, 3, 2))
+    summary = build_parts_summary(rows, [SummaryGroup.PROGRAM, SummaryGroup.MATERIAL, SummaryGroup.DOER])
+
+    assert summary["totals"] == {"parts_count": 3, "cutting_time": 32.0, "weight": 32.0, "weight_fact": 14.0,
+                                 "area": 8.0, "QtyInProcess": 16.0, "qty_fact": 7.0, "QtyRemaining": 9.0,
+                                 "completion": 0.438}
+    programs = summary["groups"][SummaryGroup.PROGRAM]
+    assert [(row["name"], row["cutting_time"], row["qty_fact"], row["QtyRemaining"]) for row in programs] == [
+        ("P2", 20.0, 3.0, 7.0), ("P1", 12.0, 4.0, 2.0)]
+    assert [(row["name"], row["parts_count"]) for row in summary["groups"][SummaryGroup.MATERIAL]] == [("GS", 3)]
+    assert [(row["name"], row["completion"]) for row in summary["groups"][SummaryGroup.DOER]] == [
+        ("Иванов", 0.5), ("", 0.0)]
+    assert SummaryGroup.MACHINE not in summary["groups"]
+
+
+async def test_parts_summary_empty() -> None:
+    """Тестирует сводный отчёт без деталей."""
+    summary = build_parts_summary([], list(SummaryGroup))
+
+    assert summary["totals"]["parts_count"] == 0
+    assert summary["totals"]["completion"] == 0.0
+    assert all(rows == [] for rows in summary["groups"].values())
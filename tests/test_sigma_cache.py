@@ -0,0 +1,136 @@
+"""Тесты для кэша запросов sigma nest."""
+import asyncio
+
+import pytest
+
+from sigma_handlers.sigma_cache import SigmaQueryCache
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakeSigma:
+    """Имитация запроса к sigma nest с подсчётом вызовов."""
+
+    def __init__(self, delay: float = 0) -> None:
+        """Инициализация имитации."""
+        self.calls = 0
+        self.delay = delay
+
+    async def load(self) -> list[dict]:
+        """Загрузка данных."""
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"ProgramName": "P1", "call": self.calls}]
+
+
+async def test_value_cached_until_ttl() -> None:
+    """Тестирует повторную выдачу значения из кэша до истечения TTL."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma()
+
+    first = await cache.get_or_load(("programs", 1), sigma.load, ttl=60)
+    second = await cache.get_or_load(("programs", 1), sigma.load, ttl=60)
+    await cache.get_or_load(("programs", 2), sigma.load, ttl=60)
+
+    assert first is second
+    assert sigma.calls == 2  # noqa PLR2004
+
+
+async def test_expired_value_reloaded() -> None:
+    """Тестирует повторную загрузку после истечения TTL."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma()
+
+    await cache.get_or_load(("programs",), sigma.load, ttl=0)
+    await cache.get_or_load(("programs",), sigma.load, ttl=0)
+
+    assert sigma.calls == 2  # noqa PLR2004
+
+
+async def test_lru_eviction() -> None:
+    """Тестирует вытеснение давно не использованных записей."""
+    cache = SigmaQueryCache(max_entries=2)
+    sigma = FakeSigma()
+
+    await cache.get_or_load(("q", 1), sigma.load, ttl=60)
+    await cache.get_or_load(("q", 2), sigma.load, ttl=60)
+    await cache.get_or_load(("q", 1), sigma.load, ttl=60)  # запись 1 становится последней использованной
+    await cache.get_or_load(("q", 3), sigma.load, ttl=60)  # вытесняет запись 2
+    await cache.get_or_load(("q", 1), sigma.load, ttl=60)
+    await cache.get_or_load(("q", 2), sigma.load, ttl=60)
+
+    assert sigma.calls == 4  # noqa PLR2004
+
+
+async def test_concurrent_requests_coalesced() -> None:
+    """Тестирует объединение одновременных одинаковых запросов."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma(delay=0.01)
+
+    results = await asyncio.gather(*(cache.get_or_load(("programs",), sigma.load, ttl=60) for _ in range(10)))
+
+    assert sigma.calls == 1
+    assert all(result is results[0] for result in results)
+
+
+async def test_cancelled_leader_does_not_cancel_followers() -> None:
+    """Тестирует, что отмена первого запроса не отменяет загрузку для объединённых с ним запросов."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma(delay=0.01)
+
+    leader = asyncio.ensure_future(cache.get_or_load(("programs",), sigma.load, ttl=60))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.get_or_load(("programs",), sigma.load, ttl=60))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert (await follower)[0]["call"] == 1
+    assert leader.cancelled()
+    await cache.get_or_load(("programs",), sigma.load, ttl=60)
+    assert sigma.calls == 1
+
+
+async def test_error_not_cached() -> None:
+    """Тестирует, что ошибка загрузки не сохраняется в кэше."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma()
+
+    async def failing_load() -> list[dict]:
+        msg = "sigma unavailable"
+        raise ConnectionError(msg)
+
+    with pytest.raises(ConnectionError):
+        await cache.get_or_load(("programs",), failing_load, ttl=60)
+    await cache.get_or_load(("programs",), sigma.load, ttl=60)
+
+    assert sigma.calls == 1
+
+
+async def test_invalidate() -> None:
+    """Тестирует инвалидацию по имени запроса и полную очистку."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma()
+    await cache.get_or_load(("programs", 1), sigma.load, ttl=60)
+    await cache.get_or_load(("orders", 1), sigma.load, ttl=60)
+
+    assert cache.invalidate("programs") == 1
+    await cache.get_or_load(("orders", 1), sigma.load, ttl=60)
+    await cache.get_or_load(("programs", 1), sigma.load, ttl=60)
+    assert sigma.calls == 3  # noqa PLR2004
+
+    assert cache.invalidate() == 2  # noqa PLR2004
+    assert cache.stats()["entries"] == 0
+
+
+async def test_invalidate_during_load_not_stored() -> None:
+    """Тестирует, что результат загрузки, начатой до инвалидации, не сохраняется."""
+    cache = SigmaQueryCache()
+    sigma = FakeSigma(delay=0.01)
+
+    load = asyncio.ensure_future(cache.get_or_load(("programs",), sigma.load, ttl=60))
+    await asyncio.sleep(0)
+    cache.invalidate()
+    await load
+    await cache.get_or_load(("programs",), sigma.load, ttl=60)
+
+    assert sigma.calls == 2  # noqa PLR2004
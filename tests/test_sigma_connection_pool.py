@@ -0,0 +1,192 @@
+"""Тесты для пула соединений sigma nest."""
+# ruff: noqa: SLF001
+import time
+import sqlite3
+import threading
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sigma_handlers.database import Database
+from sigma_handlers.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class SqliteShim:
+    """pyodbc-совместимая обёртка над sqlite3 с подсчётом созданных соединений."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Инициализация фабрики соединений."""
+        self.db_path = db_path
+        self.created = 0
+        self.closed = 0
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        """Создание соединения."""
+        with self._lock:
+            self.created += 1
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, factory=_CountingConnection)
+        connection.shim = self
+        return connection
+
+    def on_close(self) -> None:
+        """Учёт закрытого соединения."""
+        with self._lock:
+            self.closed += 1
+
+
+class _CountingConnection(sqlite3.Connection):
+    """Соединение sqlite3, сообщающее фабрике о закрытии."""
+
+    shim: SqliteShim
+
+    def close(self) -> None:
+        self.shim.on_close()
+        super().close()
+
+
+@pytest.fixture
+def shim(tmp_path: Path) -> SqliteShim:
+    """Фабрика соединений к временной БД sqlite."""
+    db_path = tmp_path / "sigma.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE Program (ProgramName TEXT)")
+        connection.executemany("INSERT INTO Program VALUES (?)", [("P1",), ("P2",)])
+    return SqliteShim(db_path)
+
+
+def test_connection_reused(shim: SqliteShim) -> None:
+    """Тестирует повторное использование соединения вместо создания нового."""
+    pool = ConnectionPool(shim.connect, max_size=2)
+    for _ in range(5):
+        connection = pool.acquire()
+        assert connection.execute("SELECT count(*) FROM Program").fetchone()[0] == 2  # noqa PLR2004
+        pool.release(connection)
+
+    assert shim.created == 1
+    assert pool.stats() == {"max_size": 2, "in_use": 0, "idle": 1}
+
+
+def test_pool_is_bounded(shim: SqliteShim) -> None:
+    """Тестирует ограничение количества соединений при параллельной нагрузке."""
+    pool = ConnectionPool(shim.connect, max_size=3)
+    peak = 0
+    lock = threading.Lock()
+
+    def query(_: int) -> int:
+        nonlocal peak
+        connection = pool.acquire()
+        with lock:
+            peak = max(peak, pool.stats()["in_use"])
+        time.sleep(0.01)
+        result = connection.execute("SELECT count(*) FROM Program").fetchone()[0]
+        pool.release(connection)
+        return result
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(query, range(50)))
+
+    assert results == [2] * 50
+    assert peak <= 3  # noqa PLR2004
+    assert shim.created <= 3  # noqa PLR2004
+
+
+def test_acquire_timeout(shim: SqliteShim) -> None:
+    """Тестирует истечение ожидания свободного соединения."""
+    pool = ConnectionPool(shim.connect, max_size=1, timeout=0.05)
+    connection = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+
+
+def test_idle_connections_evicted(shim: SqliteShim) -> None:
+    """Тестирует закрытие соединений, простаивающих дольше max_idle."""
+    pool = ConnectionPool(shim.connect, max_size=2, max_idle=0.01)
+    pool.release(pool.acquire())
+    time.sleep(0.02)
+    pool.release(pool.acquire())
+
+    assert shim.created == 2  # noqa PLR2004
+    assert shim.closed == 1
+
+
+def test_idle_connections_closed_outside_lock(shim: SqliteShim, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тестирует, что простаивающие соединения закрываются после освобождения блокировки пула."""
+    pool = ConnectionPool(shim.connect, max_size=2, max_idle=0.01)
+    closed_under_lock = []
+
+    def close_quietly(connection: sqlite3.Connection) -> None:
+        acquired = pool._condition.acquire(blocking=False)
+        if acquired:
+            pool._condition.release()
+        closed_under_lock.append(not acquired)
+        connection.close()
+
+    monkeypatch.setattr(pool, "_close_quietly", close_quietly)
+    pool.release(pool.acquire())
+    time.sleep(0.02)
+    pool.release(pool.acquire())
+
+    assert closed_under_lock == [False]
+
+
+def test_database_releases_connection_on_cursor_error() -> None:
+    """Тестирует освобождение места в пуле, если курсор не удалось создать."""
+    pool = ConnectionPool(_BrokenConnection, max_size=1, timeout=0.1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        Database(pool).connect()
+
+    assert pool.stats() == {"max_size": 1, "in_use": 0, "idle": 0}
+
+
+def test_broken_connection_replaced(shim: SqliteShim) -> None:
+    """Тестирует пересоздание соединения, не прошедшего проверку."""
+    pool = ConnectionPool(shim.connect, max_size=1, health_check_after=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    pool._idle[0].connection = _BrokenConnection()
+
+    new_connection = pool.acquire()
+
+    assert isinstance(new_connection, sqlite3.Connection)
+    assert new_connection.execute("SELECT 1").fetchone()[0] == 1
+    assert shim.created == 2  # noqa PLR2004
+
+
+def test_discarded_connection_closed(shim: SqliteShim) -> None:
+    """Тестирует закрытие соединения, возвращённого с discard=True."""
+    pool = ConnectionPool(shim.connect, max_size=1)
+    pool.release(pool.acquire(), discard=True)
+
+    assert shim.closed == 1
+    assert pool.stats()["idle"] == 0
+
+
+def test_close_pool(shim: SqliteShim) -> None:
+    """Тестирует закрытие пула."""
+    pool = ConnectionPool(shim.connect, max_size=2)
+    pool.release(pool.acquire())
+    pool.close()
+
+    assert shim.closed == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+class _BrokenConnection:
+    """Соединение, у которого любой запрос завершается ошибкой."""
+
+    def cursor(self) -> None:
+        msg = "connection lost"
+        raise sqlite3.OperationalError(msg)
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
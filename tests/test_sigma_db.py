@@ -0,0 +1,141 @@
+"""Тесты для запросов к sigma nest."""
+import asyncio
+import sqlite3
+
+from pathlib import Path
+from collections.abc import Generator, AsyncIterator
+
+import pytest
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from config import settings
+from utils.executors import AppExecutors, ExecutorName
+from sigma_handlers.sigma_db import stream_parts_data_by_programs
+from sigma_handlers.sigma_utils import (
+    SigmaBatch,
+    get_any_sigma_data,
+    merge_sigma_streams,
+    stream_sigma_batches,
+    make_async_sigma_request,
+)
+from sigma_handlers.connection_pool import ConnectionPool
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_parts_data_chunked(monkeypatch: MonkeyPatch) -> None:
+    """Тестирует разбиение списка программ на части без повторов и чтение всех частей результата."""
+    requested_chunks = []
+
+    async def fake_stream_sigma_batches(query: str, params: tuple) -> AsyncIterator[SigmaBatch]:  # noqa ARG001
+        requested_chunks.append(list(params))
+        for program in params:
+            await asyncio.sleep(0)
+            yield SigmaBatch(("ProgramName", "PartName"), [(program, "A"), (program, "B")])
+
+    monkeypatch.setattr(settings, "sigma_in_chunk_size", 2)
+    monkeypatch.setattr("sigma_handlers.sigma_db.stream_sigma_batches", fake_stream_sigma_batches)
+
+    rows = [row async for batch in stream_parts_data_by_programs(["P1", "P2", "P3", "P2", "P4", "P5"])
+            for row in batch.rows]
+
+    assert requested_chunks == [["P1", "P2"], ["P3", "P4"], ["P5"]]
+    assert rows == [(program, part) for program in ("P1", "P2", "P3", "P4", "P5") for part in ("A", "B")]
+
+
+async def test_merge_sigma_streams_order() -> None:
+    """Тестирует выдачу частей в порядке потоков, когда потоки завершаются в обратном порядке."""
+    async def stream(name: str, delay: float) -> AsyncIterator[SigmaBatch]:
+        for index in range(2):
+            await asyncio.sleep(delay)
+            yield SigmaBatch(("name",), [(f"{name}{index}",)])
+
+    streams = [stream("first", 0.03), stream("second", 0.01), stream("third", 0)]
+    rows = [row async for batch in merge_sigma_streams(streams) for row in batch.rows]
+
+    assert rows == [("first0",), ("first1",), ("second0",), ("second1",), ("third0",), ("third1",)]
+
+
+async def test_merge_sigma_streams_error() -> None:
+    """Тестирует передачу ошибки одного потока потребителю и закрытие остальных потоков."""
+    closed = []
+
+    async def stream(name: str, *, fail: bool = False) -> AsyncIterator[SigmaBatch]:
+        try:
+            yield SigmaBatch(("name",), [(name,)])
+            if fail:
+                msg = "sigma unavailable"
+                raise ConnectionError(msg)
+            await asyncio.sleep(10)
+        finally:
+            closed.append(name)
+
+    with pytest.raises(ConnectionError):
+        [batch async for batch in merge_sigma_streams([stream("ok"), stream("failed", fail=True)])]
+
+    assert sorted(closed) == ["failed", "ok"]
+
+
+@pytest.fixture
+def sigma_pool(tmp_path: Path, monkeypatch: MonkeyPatch) -> Generator[ConnectionPool, None, None]:
+    """Пул соединений к временной БД sqlite вместо sigma nest."""
+    db_path = tmp_path / "sigma.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE PIP (PartName TEXT, QtyInProcess INTEGER)")
+        connection.executemany("INSERT INTO PIP VALUES (?, ?)", [(f"PART-{i}", i) for i in range(7)])
+    pool = ConnectionPool(lambda: sqlite3.connect(db_path, check_same_thread=False), max_size=1)
+    monkeypatch.setattr("sigma_handlers.database._sigma_pool", pool)
+    yield pool
+    pool.close()
+
+
+async def test_stream_sigma_batches(sigma_pool: ConnectionPool) -> None:
+    """Тестирует чтение результата частями и возврат соединения в пул после чтения."""
+    query = "SELECT PartName, QtyInProcess FROM PIP ORDER BY QtyInProcess"
+    batches = [batch async for batch in stream_sigma_batches(query, (), batch_size=3)]
+
+    assert [len(batch.rows) for batch in batches] == [3, 3, 1]
+    assert batches[0].columns == ("PartName", "QtyInProcess")
+    assert batches[0].to_columns()["QtyInProcess"] == (0, 1, 2)
+    assert batches[-1].to_dicts() == [{"PartName": "PART-6", "QtyInProcess": 6}]
+    assert sigma_pool.stats()["in_use"] == 0
+    assert get_any_sigma_data(query)[:2] == [{"PartName": "PART-0", "QtyInProcess": 0},
+                                             {"PartName": "PART-1", "QtyInProcess": 1}]
+
+
+async def test_stream_sigma_batches_closed_early(sigma_pool: ConnectionPool) -> None:
+    """Тестирует освобождение соединения при прерывании чтения."""
+    stream = stream_sigma_batches("SELECT PartName FROM PIP", (), batch_size=2)
+    async for _batch in stream:
+        break
+    await stream.aclose()
+
+    assert sigma_pool.stats()["in_use"] == 0
+
+
+async def test_stream_does_not_starve_requests(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Тестирует запрос при открытом потоковом чтении, занявшем единственное соединение.
+
+    Запрос ждёт соединение в цикле событий, а не в потоке пула: поток остаётся для чтения следующих частей.
+    """
+    db_path = tmp_path / "sigma.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE PIP (PartName TEXT)")
+        connection.executemany("INSERT INTO PIP VALUES (?)", [(f"PART-{i}",) for i in range(4)])
+    pool = ConnectionPool(lambda: sqlite3.connect(db_path, check_same_thread=False), max_size=1, timeout=1)
+    monkeypatch.setattr("sigma_handlers.database._sigma_pool", pool)
+    sigma_executors = AppExecutors({ExecutorName.SIGMA: 1})
+    monkeypatch.setattr("sigma_handlers.sigma_utils.executors", sigma_executors)
+    query = "SELECT PartName FROM PIP"
+
+    stream = stream_sigma_batches(query, (), batch_size=1)
+    first = await anext(stream)
+    request = asyncio.create_task(make_async_sigma_request(get_any_sigma_data, (query,)))
+    await asyncio.sleep(0.1)
+    rest = [batch async for batch in stream]
+
+    assert len([first, *rest]) == 4  # noqa PLR2004
+    assert len(await request) == 4  # noqa PLR2004
+    sigma_executors.shutdown()
+    pool.close()
@@ -0,0 +1,232 @@
+"""Тесты для инкрементальной синхронизации sigma nest."""
+import datetime
+
+from pathlib import Path
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+
+from sqlalchemy import text, select
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from sigma_handlers.models import SigmaWoStage, SigmaSyncState, SigmaProgramStage
+from sigma_handlers.sigma_sync import SigmaIncrementalSync
+
+pytestmark: pytest.MarkDecorator = pytest.mark.asyncio(loop_scope="session")
+
+NOW = datetime.datetime.now()  # noqa DTZ005
+
+
+class FakeSigmaSource:
+    """Имитация sigma nest: отдаёт строки с меткой времени >= watermark."""
+
+    def __init__(self) -> None:
+        """Инициализация имитации."""
+        self.programs: list[dict] = []
+        self.wos: list[dict] = []
+        self.requested_watermarks: list[datetime.datetime] = []
+        self.fail = False
+
+    def add_program(self, name: str, posted: datetime.datetime) -> None:
+        """Публикация программы."""
+        self.programs.append({"ProgramName": name, "PostDateTime": posted, "Material": "GS",
+                              "UserName": "techman", "WONumber": "Z1, Z2"})
+
+    def add_wo(self, number: str, created: datetime.datetime) -> None:
+        """Создание заказа."""
+        self.wos.append({"WONumber": number, "CustomerName": "Customer", "WODate": created,
+                         "OrderDate": created, "WOData1": "", "WOData2": "", "DateCreated": created})
+
+    async def programs_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Программы с PostDateTime >= watermark."""
+        if self.fail:
+            msg = "sigma unavailable"
+            raise ConnectionError(msg)
+        self.requested_watermarks.append(watermark)
+        return [row for row in self.programs if row["PostDateTime"] >= watermark]
+
+    async def program_names_present_since(self, synced_from: datetime.datetime) -> set[str]:
+        """Имена программ с PostDateTime >= synced_from."""
+        return {row["ProgramName"] for row in self.programs if row["PostDateTime"] >= synced_from}
+
+    async def wos_since(self, watermark: datetime.datetime) -> list[dict]:
+        """Заказы с DateCreated >= watermark."""
+        return [row for row in self.wos if row["DateCreated"] >= watermark]
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def session_maker() -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """Фабрика сессий к БД sqlite в памяти с таблицами синхронизации."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    tables = [SigmaProgramStage.__table__, SigmaWoStage.__table__, SigmaSyncState.__table__]
+    async with engine.begin() as connection:
+        await connection.run_sync(lambda sync_connection: SigmaProgramStage.metadata.create_all(
+            sync_connection, tables=tables))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def source() -> FakeSigmaSource:
+    """Имитация sigma nest с двумя программами и заказом."""
+    fake = FakeSigmaSource()
+    fake.add_program("P1", NOW - datetime.timedelta(days=2))
+    fake.add_program("P2", NOW - datetime.timedelta(days=1))
+    fake.add_program("OLD", NOW - datetime.timedelta(days=400))
+    fake.add_wo("Z1", NOW - datetime.timedelta(days=1))
+    return fake
+
+
+async def test_initial_sync_uses_backfill(session_maker: async_sessionmaker[AsyncSession],
+                                          source: FakeSigmaSource) -> None:
+    """Тестирует первичную загрузку только за период backfill_days."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30)
+
+    assert await sync.sync_once() == {"programs": 2, "wos": 1}
+
+    programs = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(), None)
+    assert [program["ProgramName"] for program in programs] == ["P2", "P1"]
+
+
+async def test_sync_incremental_and_idempotent(session_maker: async_sessionmaker[AsyncSession],
+                                               source: FakeSigmaSource) -> None:
+    """Тестирует запрос только новых строк с сохранённой метки и отсутствие дублей."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30, overlap=0)
+    await sync.sync_once()
+    source.add_program("P3", NOW)
+
+    # граничная строка P2 загружается повторно, но не дублируется
+    assert await sync.sync_once() == {"programs": 2, "wos": 1}
+    assert source.requested_watermarks[-1] == NOW - datetime.timedelta(days=1)
+
+    async with session_maker() as session:
+        programs = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(), None)
+        state = await session.get(SigmaSyncState, 1)
+    assert [program["ProgramName"] for program in programs] == ["P3", "P2", "P1"]
+    assert state.watermark == NOW
+
+
+async def test_single_date_programs_format(session_maker: async_sessionmaker[AsyncSession],
+                                           source: FakeSigmaSource) -> None:
+    """Тестирует формат программ за одну дату из локальной копии: как у single_date_programs_name_query."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30)
+    await sync.sync_once()
+
+    programs = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(), None)
+    ranged = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(),
+                                          (NOW + datetime.timedelta(days=1)).date())
+
+    assert [(program["WONumbers"], "WONumber" in program) for program in programs] == [("Z1,Z2", False)] * 2
+    assert [program["WONumber"] for program in ranged] == ["Z1, Z2"] * 2
+
+
+async def test_sync_deletes_missing_programs(session_maker: async_sessionmaker[AsyncSession],
+                                             source: FakeSigmaSource) -> None:
+    """Тестирует удаление из локальной копии программ, которых больше нет в sigma nest."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30)
+    await sync.sync_once()
+    source.programs = [row for row in source.programs if row["ProgramName"] != "P1"]
+
+    await sync.sync_once()
+
+    programs = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(), None)
+    assert [program["ProgramName"] for program in programs] == ["P2"]
+
+
+async def test_sync_overlap_loads_late_programs(session_maker: async_sessionmaker[AsyncSession],
+                                                source: FakeSigmaSource) -> None:
+    """Тестирует загрузку программы, опубликованной раньше метки, но появившейся в sigma nest позже."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30, overlap=3600 * 6)
+    await sync.sync_once()
+    source.add_program("LATE", NOW - datetime.timedelta(days=1, hours=1))
+
+    await sync.sync_once()
+
+    assert source.requested_watermarks[-1] == NOW - datetime.timedelta(days=1, hours=6)
+    programs = await sync.get_program_names((NOW - datetime.timedelta(days=10)).date(), None)
+    assert [program["ProgramName"] for program in programs] == ["P2", "LATE", "P1"]
+
+
+async def test_sync_window_moves_forward(session_maker: async_sessionmaker[AsyncSession],
+                                         source: FakeSigmaSource) -> None:
+    """Тестирует сдвиг начала локальной копии на каждом проходе и удаление строк старше него."""
+    await SigmaIncrementalSync(session_maker, source, backfill_days=30).sync_once()
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=1)
+
+    await sync.sync_once()
+
+    synced_from = datetime.datetime.combine(NOW.date() - datetime.timedelta(days=1), datetime.time.min)
+    async with session_maker() as session:
+        states = (await session.scalars(select(SigmaSyncState))).all()
+        programs = (await session.scalars(select(SigmaProgramStage.ProgramName))).all()
+    assert [state.synced_from for state in states] == [synced_from] * 2
+    assert programs == ["P2"]
+    assert not await sync.covers("programs", NOW - datetime.timedelta(days=2))
+
+
+async def test_sync_resumes_after_failure(session_maker: async_sessionmaker[AsyncSession],
+                                          source: FakeSigmaSource) -> None:
+    """Тестирует, что неудачный проход не сдвигает метку и следующий продолжает с неё."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30, overlap=0)
+    await sync.sync_once()
+    source.fail = True
+    source.add_program("P3", NOW)
+
+    with pytest.raises(ConnectionError):
+        await sync.sync_once()
+    source.fail = False
+    await sync.sync_once()
+
+    assert source.requested_watermarks[-1] == NOW - datetime.timedelta(days=1)
+
+
+async def test_wos_served_locally(session_maker: async_sessionmaker[AsyncSession],
+                                  source: FakeSigmaSource) -> None:
+    """Тестирует получение заказов из локальной копии."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30)
+    await sync.sync_once()
+
+    wos = await sync.get_wo_names((NOW - datetime.timedelta(days=5)).date(),
+                                  (NOW + datetime.timedelta(days=1)).date())
+
+    assert [wo["WONumber"] for wo in wos] == ["Z1"]
+
+
+async def test_covers(session_maker: async_sessionmaker[AsyncSession], source: FakeSigmaSource) -> None:
+    """Тестирует проверку покрытия интервала и актуальности локальной копии."""
+    sync = SigmaIncrementalSync(session_maker, source, backfill_days=30, max_lag=60)
+    recent = NOW - datetime.timedelta(days=10)
+    assert not await sync.covers("programs", recent)
+
+    await sync.sync_once()
+
+    assert await sync.covers("programs", recent)
+    assert not await sync.covers("programs", NOW - datetime.timedelta(days=100))
+    sync.max_lag = -1
+    assert not await sync.covers("programs", recent)
+
+
+async def test_fetch_outside_write_transaction(tmp_path: Path, source: FakeSigmaSource) -> None:
+    """Тестирует запрос к sigma nest без занятого соединения записи: другой писатель не ждёт его."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", pool_size=1, max_overflow=0,
+                                 pool_timeout=1)
+    async with engine.begin() as connection:
+        await connection.run_sync(SigmaProgramStage.metadata.create_all)
+    write_maker = async_sessionmaker(engine, expire_on_commit=False)
+    programs_since = source.programs_since
+
+    async def write_during_fetch(watermark: datetime.datetime) -> list[dict]:
+        async with write_maker() as session, session.begin():
+            await session.execute(text("SELECT 1"))
+        return await programs_since(watermark)
+
+    source.programs_since = write_during_fetch
+    read_maker = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"))
+    try:
+        sync = SigmaIncrementalSync(write_maker, source, backfill_days=30, read_session_maker=read_maker)
+        assert await sync.sync_once() == {"programs": 2, "wos": 1}
+    finally:
+        await engine.dispose()
+        await read_maker.kw["bind"].dispose()
@@ -0,0 +1,40 @@
+"""Тесты для раздачи картинок с ETag и Cache-Control."""
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middlewares import IMMUTABLE_CACHE, REVALIDATE_CACHE, CacheControlMiddleware
+from static_files import VersionedStaticFiles
+from utils.pics_utils.image_manifest import ImageManifest
+from utils.pics_utils.image_variants import ImageVariant, variant_file_name
+
+
+def test_etag_and_cache_control(tmp_path: Path) -> None:
+    """Тестирует ETag по версии из URL, ответ 304 и Cache-Control для версионных и обычных URL."""
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    (images_dir / "P1.png").write_bytes(b"png")
+    variant_name = variant_file_name("PART", ImageVariant.THUMB, "0123456789ab")
+    (images_dir / variant_name).write_bytes(b"webp")
+    manifest = ImageManifest(images_dir)
+    manifest.load()
+
+    app = FastAPI()
+    app.add_middleware(CacheControlMiddleware)
+    app.mount("/static", VersionedStaticFiles(directory=tmp_path), name="static")
+    client = TestClient(app)
+
+    program_url = manifest.get("P1.png").url
+    response = client.get(program_url)
+    assert response.content == b"png"
+    assert response.headers["etag"] == f'"{manifest.get("P1.png").version}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+
+    not_modified = client.get("/static/images/P1.png", headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304  # noqa PLR2004
+    assert not_modified.headers["cache-control"] == REVALIDATE_CACHE
+
+    variant = client.get(manifest.get_variant("PART", ImageVariant.THUMB).url)
+    assert variant.headers["etag"] == '"0123456789ab"'
+    assert variant.headers["cache-control"] == IMMUTABLE_CACHE
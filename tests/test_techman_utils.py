@@ -0,0 +1,36 @@
+"""Тесты для утилит сервиса Techman."""
+import pytest
+
+from techman.utils import SigmaDataSplitter
+from techman.constants import wo_fields, part_fields, program_fields
+
+COLUMNS = tuple(dict.fromkeys((*program_fields, *wo_fields, *part_fields)))
+
+
+def make_row(program: str, repeat_id: int, wo: str, part: str) -> tuple:
+    """Строка результата sigma nest."""
+    values = {column: f"{column}-value" for column in COLUMNS}
+    values.update(ProgramName=program, RepeatIDProgram=repeat_id, WONumber=wo, PartName=part)
+    return tuple(values[column] for column in COLUMNS)
+
+
+def test_split_dedup() -> None:
+    """Тестирует дедупликацию заказов и деталей и выбор программы с максимальным RepeatIDProgram."""
+    splitter = SigmaDataSplitter()
+    splitter.add_rows(COLUMNS, [make_row("P1", 1, "Z1", "A"), make_row("P1", 3, "Z1", "B")])
+    splitter.add_rows(COLUMNS, [make_row("P2", 1, "Z2", "A"), make_row("P1", 2, "Z1", "A")])
+
+    data = splitter.result()
+
+    assert [(program["ProgramName"], program["RepeatIDProgram"]) for program in data["programs"]] == [
+        ("P1", 3), ("P2", 1)]
+    assert [wo["WONumber"] for wo in data["wos"]] == ["Z1", "Z2"]
+    assert [(part["ProgramName"], part["PartName"]) for part in data["parts"]] == [
+        ("P1", "A"), ("P1", "B"), ("P2", "A")]
+    assert tuple(data["parts"][0]) == part_fields
+
+
+def test_split_missing_columns() -> None:
+    """Тестирует проверку набора колонок."""
+    with pytest.raises(ValueError, match="SourceFileName"):
+        SigmaDataSplitter().add_rows(tuple(column for column in COLUMNS if column != "SourceFileName"), [])
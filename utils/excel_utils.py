@@ -1,54 +1,231 @@
 """Обработка данных excel."""
 import io
+import enum
 import datetime
+import tempfile
 
-from asyncio import get_running_loop
-from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from decimal import Decimal
+from dataclasses import dataclass
+from urllib.parse import quote
+from collections.abc import Iterable, Sequence, AsyncIterable, AsyncIterator
 
 from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font
+from fastapi.responses import StreamingResponse
+from openpyxl.cell.cell import WriteOnlyCell
 
-from sigma_handlers.sigma_utils import get_sigma_data
+from utils.executors import ExecutorName, executors
 
+if TYPE_CHECKING:
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
-def create_excel(data: list) -> io.BytesIO:
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+STREAM_CHUNK_SIZE = 256 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # файл до 8 МБ собирается в памяти, больше - во временном файле
+
+
+class ColumnKind(enum.StrEnum):
+    """Тип колонки excel."""
+
+    TEXT = "text"
+    INTEGER = "integer"
+    NUMBER = "number"
+    DATE = "date"
+    DATETIME = "datetime"
+
+
+# формат ячеек колонки вместо форматирования каждого значения strftime
+COLUMN_FORMATS = {
+    ColumnKind.INTEGER: "0",
+    ColumnKind.NUMBER: "0.00",
+    ColumnKind.DATE: "DD.MM.YYYY",
+    ColumnKind.DATETIME: "DD.MM.YYYY HH:MM",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ExcelColumn:
+    """Колонка excel: ключ строки данных, заголовок, тип и ширина."""
+
+    key: str
+    title: str
+    kind: ColumnKind = ColumnKind.TEXT
+    width: float | None = None
+
+
+def infer_column_kind(value: object) -> ColumnKind:
+    """Тип колонки по значению."""
+    if isinstance(value, datetime.datetime):
+        return ColumnKind.DATETIME
+    if isinstance(value, datetime.date):
+        return ColumnKind.DATE
+    if isinstance(value, bool | enum.Enum):
+        return ColumnKind.TEXT
+    if isinstance(value, int):
+        return ColumnKind.INTEGER
+    if isinstance(value, float | Decimal):
+        return ColumnKind.NUMBER
+    return ColumnKind.TEXT
+
+
+def infer_columns(rows: Sequence[dict], titles: dict[str, str] | None = None, *,
+                  only_titled: bool = True) -> list[ExcelColumn]:
+    """Колонки по ключам первой строки. Тип - по первому непустому значению колонки.
+
+    Заголовки берутся из titles. При only_titled колонки без заголовка в titles не выводятся.
+    """
+    if not rows:
+        return []
+    titles = titles or {}
+    columns = []
+    for key in rows[0]:
+        if titles and only_titled and key not in titles:
+            continue
+        value = next((row[key] for row in rows if row.get(key) is not None), None)
+        columns.append(ExcelColumn(key=key, title=titles.get(key, key), kind=infer_column_kind(value)))
+    return columns
+
+
+def _cell_value(value: object) -> object:
+    """Значение ячейки: перечисления - значением, списки - через запятую, Decimal - числом."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list | tuple | set):
+        return ", ".join(str(_cell_value(item)) for item in value)
+    if isinstance(value, dict):
+        return str(value)
+    return value
+
+
+class ExcelWriter:
+    """Формирование xlsx в режиме write-only.
+
+    Строки листа сразу записываются openpyxl во временный файл и не хранятся в памяти как ячейки,
+    формат задаётся один раз на колонку. Готовый файл сохраняется во временный файл для потоковой отдачи.
+    XML листа openpyxl записывает через lxml, если он установлен: так запись быстрее примерно на четверть.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустой книги."""
+        self._workbook = Workbook(write_only=True)
+        self._sheets: dict[str, tuple[WriteOnlyWorksheet, list[ExcelColumn], list[WriteOnlyCell | None]]] = {}
+
+    def add_sheet(self, title: str, columns: Sequence[ExcelColumn]) -> None:
+        """Добавление листа с заголовками колонок."""
+        sheet = self._workbook.create_sheet(title=title)
+        for index, column in enumerate(columns, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = column.width or max(10, len(column.title) + 2)
+        sheet.freeze_panes = "A2"
+        header_font = Font(bold=True)
+        headers = []
+        for column in columns:
+            cell = WriteOnlyCell(sheet, value=column.title)
+            cell.font = header_font
+            headers.append(cell)
+        sheet.append(headers)
+        # ячейки со стилем колонки переиспользуются для каждой строки: write-only лист записывает строку
+        # в файл сразу при append, поэтому ячейки и стили на каждое значение не создаются
+        prototypes = []
+        for column in columns:
+            prototype = None
+            if column.kind in COLUMN_FORMATS:
+                prototype = WriteOnlyCell(sheet)
+                prototype.number_format = COLUMN_FORMATS[column.kind]
+            prototypes.append(prototype)
+        self._sheets[title] = (sheet, list(columns), prototypes)
+
+    def append(self, title: str, rows: Iterable[dict]) -> int:
+        """Запись строк на лист. Возвращает количество записанных строк."""
+        sheet, columns, prototypes = self._sheets[title]
+        keys = [column.key for column in columns]
+        count = 0
+        for row in rows:
+            values = []
+            for key, prototype in zip(keys, prototypes, strict=True):
+                value = _cell_value(row.get(key))
+                if prototype is not None and value is not None:
+                    prototype.value = value
+                    value = prototype
+                values.append(value)
+            sheet.append(values)
+            count += 1
+        return count
+
+    def save(self) -> tempfile.SpooledTemporaryFile:
+        """Сохранение книги. Возвращает файл, установленный на начало."""
+        file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa SIM115 файл закрывает потребитель
+        self._workbook.save(file)
+        file.seek(0)
+        return file
+
+
+def create_excel(data: list, columns: Sequence[ExcelColumn] | None = None, title: str = "Orders") -> io.BytesIO:
     """Создание excel файла."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Orders"
-
-    # Заголовки
-    headers = list(data[0].keys())
-    ws.append(headers)
-
-    # Данные
-    for row in data:
-        ws.append(
-            [
-                row[key]
-                if not isinstance(row[key], datetime.datetime)
-                else row[key].strftime("%d.%m.%Y")
-                for key in headers
-            ],
-        )
-    # сохранение в файл
-    # filename = "file_result.xlsx"
-    # wb.save(filename)
-    # Сохранение в поток
-    file_stream = io.BytesIO()
-    wb.save(file_stream)
-    file_stream.seek(0)
-    return file_stream
+    columns = columns or infer_columns(data)
+    writer = ExcelWriter()
+    writer.add_sheet(title, columns)
+    writer.append(title, data)
+    with writer.save() as file:
+        return io.BytesIO(file.read())
 
 
 async def create_excel_async(data: list) -> io.BytesIO:
     """Асинхронная обертка функции создания excel файла."""
-    loop = get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, create_excel, data)
+    return await executors.run(ExecutorName.EXCEL, create_excel, data)
+
+
+async def stream_saved_file(file: tempfile.SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """Потоковое чтение сохранённого файла частями в пуле excel. Файл закрывается после чтения."""
+    try:
+        while chunk := await executors.run(ExecutorName.EXCEL, file.read, STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+def save_excel(sheets: Iterable[tuple[str, Sequence[ExcelColumn], Iterable[dict]]],
+               ) -> tempfile.SpooledTemporaryFile:
+    """Сохранение книги из листов (название, колонки, строки). Возвращает файл, установленный на начало."""
+    writer = ExcelWriter()
+    for title, columns, rows in sheets:
+        writer.add_sheet(title, columns)
+        writer.append(title, rows)
+    return writer.save()
+
+
+async def stream_excel(batches: AsyncIterable[list[dict]],
+                       title: str,
+                       titles: dict[str, str] | None = None,
+                       columns: Sequence[ExcelColumn] | None = None,
+                       *,
+                       only_titled: bool = True,
+                       ) -> AsyncIterator[bytes]:
+    """Потоковое формирование xlsx из частей строк.
+
+    Части записываются на лист в пуле excel по мере получения, колонки без columns определяются
+    по первой части. После последней части файл отдаётся частями по STREAM_CHUNK_SIZE.
+    """
+    writer = ExcelWriter()
+    sheet_added = False
+    async for batch in batches:
+        if not sheet_added:
+            await executors.run(ExecutorName.EXCEL, writer.add_sheet, title,
+                                columns or infer_columns(batch, titles, only_titled=only_titled))
+            sheet_added = True
+        await executors.run(ExecutorName.EXCEL, writer.append, title, batch)
+    if not sheet_added:
+        await executors.run(ExecutorName.EXCEL, writer.add_sheet, title, columns or [])
+    file = await executors.run(ExecutorName.EXCEL, writer.save)
+    async for chunk in stream_saved_file(file):
+        yield chunk
+
 
+def excel_response(content: AsyncIterable[bytes], file_name: str) -> StreamingResponse:
+    """Потоковый ответ с xlsx файлом. Имя файла может содержать кириллицу."""
+    disposition = f"attachment; filename*=UTF-8''{quote(file_name)}"
+    return StreamingResponse(content, media_type=XLSX_MEDIA_TYPE, headers={"Content-Disposition": disposition})
 
-if __name__ == "__main__":
-    start_date = datetime.date(2025, 1, 1)  # дата начала выборки
-    end_date = datetime.date(2025, 1, 10)  # дата окончания выборки
-    _data = get_sigma_data(start_date, end_date)
-    create_excel(_data)
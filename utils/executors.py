@@ -0,0 +1,143 @@
+"""Общие пулы потоков приложения для блокирующих операций."""
+import enum
+import asyncio
+import threading
+
+from typing import Any, TypeVar
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import settings
+from logger_config import log
+
+R = TypeVar("R")
+
+
+class ExecutorName(enum.StrEnum):
+    """Назначение пула потоков."""
+
+    SIGMA = "sigma"  # запросы к sigma nest
+    IMAGES = "images"  # копирование и извлечение картинок
+    EXCEL = "excel"  # формирование excel файлов
+
+
+class MonitoredExecutor:
+    """Ограниченный пул потоков с учётом глубины очереди и загрузки."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        """Инициализация пула потоков."""
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"plasma-{name}")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_queue_depth = 0
+
+    def submit(self, func: Callable[..., R], *args: Any) -> Future[R]:  # noqa ANN401
+        """Постановка задачи в пул."""
+        with self._lock:
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth())
+        return self._executor.submit(self._run, func, *args)
+
+    def _run(self, func: Callable[..., R], *args: Any) -> R:  # noqa ANN401
+        """Выполнение задачи с учётом статистики."""
+        with self._lock:
+            self._active += 1
+        try:
+            result = func(*args)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+        return result
+
+    def _queue_depth(self) -> int:
+        """Количество задач, ожидающих свободного потока. Вызывается под блокировкой."""
+        return self._submitted - self._completed - self._active
+
+    def stats(self) -> dict[str, int | float]:
+        """Статистика пула: глубина очереди и загрузка потоков."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._queue_depth(),
+                "max_queue_depth": self._max_queue_depth,
+                "saturation": round(self._active / self.max_workers, 2),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """Остановка пула."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class AppExecutors:
+    """Пулы потоков приложения, создаваемые один раз на всё время работы.
+
+    После shutdown() новые пулы не создаются до повторного start(): задача, поставленная
+    при завершении приложения, получает ошибку вместо незаметно созданного пула.
+    """
+
+    def __init__(self, workers: dict[ExecutorName, int]) -> None:
+        """Инициализация набора пулов."""
+        self._workers = workers
+        self._executors: dict[ExecutorName, MonitoredExecutor] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        """Создание всех пулов."""
+        with self._lock:
+            self._closed = False
+        for name in self._workers:
+            self.get(name)
+        log.info("Пулы потоков запущены: {workers}", workers=dict(self._workers))
+
+    def get(self, name: ExecutorName) -> MonitoredExecutor:
+        """Получение пула по назначению. Пул создаётся при первом обращении."""
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                if self._closed:
+                    msg = f"Пулы потоков остановлены, пул {name} недоступен."
+                    raise RuntimeError(msg)
+                executor = self._executors.get(name)
+                if executor is None:
+                    executor = MonitoredExecutor(name, self._workers[name])
+                    self._executors[name] = executor
+        return executor
+
+    async def run(self, name: ExecutorName, func: Callable[..., R], *args: Any) -> R:  # noqa ANN401
+        """Асинхронное выполнение блокирующей функции в пуле name."""
+        return await asyncio.wrap_future(self.get(name).submit(func, *args))
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        """Статистика всех запущенных пулов."""
+        return {name.value: executor.stats() for name, executor in self._executors.items()}
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """Остановка всех пулов."""
+        with self._lock:
+            self._closed = True
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            log.info("Остановка пула {name}: {stats}", name=executor.name, stats=executor.stats())
+            executor.shutdown(wait=wait)
+
+
+executors = AppExecutors({
+    ExecutorName.SIGMA: settings.EXECUTOR_SIGMA_WORKERS,
+    ExecutorName.IMAGES: settings.EXECUTOR_IMAGES_WORKERS,
+    ExecutorName.EXCEL: settings.EXECUTOR_EXCEL_WORKERS,
+})
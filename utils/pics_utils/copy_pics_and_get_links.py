@@ -1,65 +1,170 @@
 """Модуль для копирования картинок программ и деталей в static/images."""
-import shutil
+import glob
 import asyncio
+import functools
 
-from config import PARTS_DIR, REPORTS_DIR, STATIC_IMAGES_DIR
+from pathlib import Path
+from collections.abc import Callable, Iterable, Awaitable
+
+from config import PARTS_DIR, REPORTS_DIR, STATIC_IMAGES_DIR, settings
 from logger_config import log
+from utils.executors import ExecutorName, executors
+from utils.pics_utils.image_manifest import image_manifest
+from utils.pics_utils.image_variants import (
+    VARIANT_SUFFIX,
+    ImageVariant,
+    build_variants,
+    parse_variant_file_name,
+    remove_superseded_variants,
+)
+from utils.pics_utils.missing_sources import missing_sources
 from utils.pics_utils.program_ods_to_png import extract_images_from_ods
 
 
-# Асинхронная функция для копирования картинки детали
-async def get_part_image(part_name: str) -> str | None:
-    """Асинхронно копирует BMP-файл детали в static/images и возвращает URL.
+def _find_part_variant(part_name: str, variant: ImageVariant) -> Path | None:
+    """Поиск уже созданного варианта картинки детали в static/images в обход индекса."""
+    candidates = [path for path in STATIC_IMAGES_DIR.glob(f"{glob.escape(part_name)}.{variant}.*{VARIANT_SUFFIX}")
+                  if parse_variant_file_name(path.name) == (part_name, variant)]
+    return max(candidates, key=lambda path: path.stat().st_mtime, default=None)
+
+
+def _convert_part_image(part_name: str, variant: ImageVariant) -> str | None:
+    """Создание сжатых вариантов BMP-файла детали в static/images и получение URL варианта variant.
 
-    Если файл уже существует или исходный файл не найден, копирование пропускается.
+    Варианты создаются для текущей версии BMP, варианты прежних версий удаляются. Если BMP недоступен,
+    используется уже созданный вариант. Выполняется в пуле потоков картинок, ошибки пробрасываются.
     """
     source_path = PARTS_DIR / f"{part_name}.bmp"
-    dest_path = STATIC_IMAGES_DIR / f"{part_name}.bmp"
-    image_url = f"/static/images/{part_name}.bmp"
 
-    if dest_path.exists():
+    if not missing_sources.is_missing(source_path):
+        if source_path.exists():
+            paths = build_variants(source_path, STATIC_IMAGES_DIR, part_name)
+            entries = {name: image_manifest.add(path) for name, path in paths.items()}
+            for path in remove_superseded_variants(STATIC_IMAGES_DIR, part_name, paths.values()):
+                image_manifest.discard(path.name)
+                log.info("Удалён устаревший вариант картинки детали {file_name}", file_name=path.name)
+            log.debug("Prepared {part_name} image in static/images from sigma server", part_name=part_name)
+            return entries[variant].url
+        missing_sources.add(source_path)
+
+    existing_path = _find_part_variant(part_name, variant)
+    if existing_path is not None:  # исходного BMP нет, файл появился в обход индекса
         log.debug("{part_name} image already exists in static/images", part_name=part_name)
-        return image_url
-
-    if source_path.exists():
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, shutil.copy2, source_path, dest_path)
-        except Exception as e:
-            log.error("Error copying {part_name}", part_name=part_name)
-            log.exception(e)
+        return image_manifest.add(existing_path).url
+    return None
+
+
+def _extract_program_image(program_name: str, refresh: bool = False) -> str | None:  # noqa FBT001 FBT002
+    """Извлечение PNG программы из ODS в static/images. Выполняется в пуле потоков картинок, ошибки пробрасываются.
+
+    При refresh=True картинка извлекается повторно, если ODS новее уже извлечённой картинки
+    (программа перенесена с тем же именем).
+    """
+    ods_path = REPORTS_DIR / f"{program_name}.ods"
+    dest_path = STATIC_IMAGES_DIR / f"{program_name}.png"
+
+    if dest_path.exists():  # файл появился в обход индекса или проверяется актуальность
+        if not (refresh and ods_path.exists() and ods_path.stat().st_mtime > dest_path.stat().st_mtime):
+            log.debug("{program_name} image already exists in static/images", program_name=program_name)
+            return image_manifest.add(dest_path).url
+        log.info("Повторное извлечение изменённой картинки программы {program_name}", program_name=program_name)
+
+    if missing_sources.is_missing(ods_path):
+        return None
+
+    if ods_path.exists():
+        extract_images_from_ods(ods_path, dest_path)
+        entry = image_manifest.add(dest_path)  # None, если в ODS нет картинки
+        if entry is None:
             return None
-        else:
-            log.debug("Copied {part_name} image to static/images from sigma server", part_name=part_name)
-            return image_url
+        log.debug("Extracted {program_name} image from ODS to static/images", program_name=program_name)
+        return entry.url
 
+    missing_sources.add(ods_path)
     return None
 
 
+async def prepare_part_image(part_name: str, variant: ImageVariant = ImageVariant.THUMB, *,
+                             refresh: bool = False) -> str | None:
+    """Подготовка картинки детали с пробросом ошибок преобразования. Возвращает URL или None, если BMP нет.
+
+    Уже созданные варианты берутся из индекса static/images (при refresh=False), проверки существования файлов
+    на сетевом диске выполняются в пуле потоков картинок. При refresh=True варианты пересоздаются,
+    если BMP изменился.
+    """
+    entry = image_manifest.get_variant(part_name, variant)
+    if entry is not None and not refresh:
+        return entry.url
+    return await executors.run(ExecutorName.IMAGES, _convert_part_image, part_name, variant)
+
+
+async def prepare_program_image(program_name: str, *, refresh: bool = False) -> str | None:
+    """Извлечение картинки программы с пробросом ошибок извлечения. Возвращает URL или None, если ODS нет.
+
+    Уже извлечённые картинки берутся из индекса static/images (при refresh=False), проверки существования
+    файлов на сетевом диске выполняются в пуле потоков картинок.
+    """
+    entry = image_manifest.get(f"{program_name}.png")
+    if entry is not None and not refresh:
+        return entry.url
+    return await executors.run(ExecutorName.IMAGES, _extract_program_image, program_name, refresh)
+
+
+# Асинхронная функция для получения картинки детали
+async def get_part_image(part_name: str, variant: ImageVariant = ImageVariant.THUMB) -> str | None:
+    """Асинхронно создаёт сжатые варианты BMP-файла детали в static/images и возвращает URL варианта variant.
+
+    Если варианты уже существуют или исходный файл не найден, преобразование пропускается.
+    Для списков используется миниатюра, для детального просмотра - полноразмерная картинка.
+    """
+    try:
+        return await prepare_part_image(part_name, variant)
+    except Exception as e:
+        log.error("Error copying {part_name}", part_name=part_name)
+        log.exception(e)
+        return None
+
+
 # Асинхронная функция для извлечения и копирования картинки программы
 async def get_program_image(program_name: str) -> str | None:
     """Асинхронно извлекает PNG из ODS, сохраняет как program_name.png в static/images и возвращает URL.
 
     Если файл уже существует или ODS не найден, копирование пропускается.
     """
-    ods_path = REPORTS_DIR / f"{program_name}.ods"
-    dest_path = STATIC_IMAGES_DIR / f"{program_name}.png"
-    image_url = f"/static/images/{program_name}.png"
+    try:
+        return await prepare_program_image(program_name)
+    except Exception as e:
+        log.error("Error extracting {program_name}", program_name=program_name)
+        log.exception(e)
+        return None
 
-    if dest_path.exists():
-        log.debug("{program_name} image already exists in static/images", program_name=program_name)
-        return image_url
 
-    if ods_path.exists():
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, extract_images_from_ods, ods_path, dest_path)
-        except Exception as e:
-            log.error("Error extracting {program_name}", program_name=program_name)
-            log.exception(e)
-            return None
-        else:
-            log.debug("Extracted {program_name} image from ODS to static/images", program_name=program_name)
-            return image_url
+async def resolve_images(names: Iterable[str],
+                         resolver: Callable[[str], Awaitable[str | None]]) -> dict[str, str | None]:
+    """Получение URL картинок для списка имён одним вызовом.
 
-    return None
+    Имена дедуплицируются, картинки получаются параллельно, не более settings.IMAGES_RESOLVE_CONCURRENCY
+    одновременно. Пустые имена (деталь без имени) не запрашиваются и получают None, поэтому словарь
+    содержит каждое переданное имя.
+    """
+    all_names = list(dict.fromkeys(names))
+    unique_names = [name for name in all_names if name]
+    semaphore = asyncio.Semaphore(settings.IMAGES_RESOLVE_CONCURRENCY)
+
+    async def resolve(name: str) -> str | None:
+        async with semaphore:
+            return await resolver(name)
+
+    urls = dict(zip(unique_names, await asyncio.gather(*(resolve(name) for name in unique_names)), strict=True))
+    return {name: urls.get(name) for name in all_names}
+
+
+async def get_part_images(part_names: Iterable[str],
+                          variant: ImageVariant = ImageVariant.THUMB) -> dict[str, str | None]:
+    """Словарь имя детали - URL картинки для списка деталей. По умолчанию - миниатюры."""
+    return await resolve_images(part_names, functools.partial(get_part_image, variant=variant))
+
+
+async def get_program_images(program_names: Iterable[str]) -> dict[str, str | None]:
+    """Словарь имя программы - URL картинки для списка программ."""
+    return await resolve_images(program_names, get_program_image)
@@ -0,0 +1,267 @@
+"""Пакетная отрисовка DXF чертежей деталей в пуле процессов."""
+import enum
+import asyncio
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+from ezdxf.addons.drawing.config import ColorPolicy
+
+from config import PARTS_DIR, STATIC_RENDERS_DIR, settings
+from logger_config import log
+from utils.executors import ExecutorName, executors
+from utils.pics_utils.render_cache import RenderCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class RenderMode(enum.StrEnum):
+    """Способ отрисовки DXF."""
+
+    PNG = "png"  # растр matplotlib
+    SVG = "svg"  # вектор бэкендом SVG ezdxf
+    SVG_PNG = "svg_png"  # SVG, растеризованный cairosvg
+
+
+@dataclass(frozen=True, slots=True)
+class RenderOptions:
+    """Параметры отрисовки DXF. Входят в ключ кэша: изменённые параметры дают новую отрисовку."""
+
+    dpi: int = 300
+    color_policy: ColorPolicy = ColorPolicy.BLACK
+    dimensions: bool = True  # габаритные размеры поверх чертежа
+    mode: RenderMode = RenderMode.PNG
+
+    @property
+    def key(self) -> str:
+        """Короткий хэш параметров для имени файла отрисовки."""
+        fingerprint = f"dpi={self.dpi};color={self.color_policy.name};dimensions={int(self.dimensions)}"
+        if self.mode != RenderMode.PNG:  # прежние имена отрисовок matplotlib сохраняются
+            fingerprint = f"{fingerprint};mode={self.mode}"
+        return hashlib.blake2s(fingerprint.encode(), digest_size=4).hexdigest()
+
+    @property
+    def suffix(self) -> str:
+        """Расширение файла отрисовки."""
+        return ".svg" if self.mode == RenderMode.SVG else ".png"
+
+    def file_name(self, digest: str) -> str:
+        """Имя файла отрисовки: <SHA-256 DXF>.<хэш параметров>.<png или svg>."""
+        return f"{digest}.{self.key}{self.suffix}"
+
+
+def _init_worker() -> None:
+    """Подготовка процесса отрисовки: backend matplotlib без GUI, импорт ezdxf и прогрев шрифтов."""
+    import matplotlib  # noqa PLC0415
+
+    matplotlib.use("Agg")
+
+    import ezdxf  # noqa PLC0415
+    import matplotlib.pyplot as plt  # noqa PLC0415
+
+    from ezdxf.addons.drawing import Frontend, RenderContext  # noqa PLC0415
+    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend  # noqa PLC0415
+
+    # первая отрисовка загружает шрифты и кэши ezdxf/matplotlib, последующие их переиспользуют
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (1, 1))
+    fig = plt.figure()
+    ax = fig.add_axes([0, 0, 1, 1])
+    Frontend(RenderContext(doc), MatplotlibBackend(ax)).draw_layout(doc.modelspace())
+    fig.text(0.5, 0.5, "0")
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def _ping() -> None:
+    """Пустая задача для запуска процессов пула."""
+
+
+def _render_file(dxf_path: str, output_path: str, options: RenderOptions) -> str:
+    """Отрисовка DXF в процессе пула. Картинка записывается во временный файл и переименовывается."""
+    from utils.pics_utils.part_dxf_to_png import (  # noqa PLC0415
+        svg_to_png,
+        dxf_to_svg_with_bounding,
+        dxf_to_image_with_bounding,
+    )
+
+    output = Path(output_path)
+    with tempfile.NamedTemporaryFile(dir=output.parent, prefix=f".{output.stem}.", suffix=output.suffix,
+                                     delete=False) as tmp_file:
+        tmp_path = Path(tmp_file.name)
+    try:
+        if options.mode == RenderMode.PNG:
+            dxf_to_image_with_bounding(Path(dxf_path), str(tmp_path), dpi=options.dpi,
+                                       color_policy=options.color_policy, dimensions=options.dimensions)
+        elif options.mode == RenderMode.SVG:
+            dxf_to_svg_with_bounding(Path(dxf_path), str(tmp_path), color_policy=options.color_policy,
+                                     dimensions=options.dimensions)
+        else:
+            svg_image = dxf_to_svg_with_bounding(Path(dxf_path), color_policy=options.color_policy,
+                                                 dimensions=options.dimensions)
+            svg_to_png(svg_image, str(tmp_path), dpi=options.dpi)
+        tmp_path.replace(output)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return output_path
+
+
+def dxf_digest(path: Path) -> str:
+    """SHA-256 содержимого DXF файла."""
+    digest = hashlib.sha256()
+    with path.open("rb") as dxf_file:
+        while chunk := dxf_file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_source_path(source_file_name: str) -> Path:
+    """Путь к DXF по Part.SourceFileName. Относительные имена ищутся в библиотеке деталей sigma nest."""
+    path = Path(source_file_name)
+    return path if path.is_absolute() else PARTS_DIR / path
+
+
+class DxfRenderService:
+    """Отрисовка DXF чертежей деталей в пуле процессов.
+
+    Отрисовка matplotlib занимает процессор и GIL, поэтому выполняется в отдельных процессах,
+    подготовленных при запуске (_init_worker). Результат сохраняется в кэше отрисовок output_dir
+    под именем из SHA-256 содержимого DXF и параметров отрисовки: неизменённые чертежи повторно
+    не отрисовываются, одинаковые одновременные запросы объединяются. Пакетная отрисовка выполняет
+    не более max_concurrent отрисовок одновременно (по умолчанию вдвое больше процессов пула).
+    """
+
+    def __init__(self, workers: int, output_dir: Path, url_prefix: str = "/static/renders",
+                 cache_max_bytes: int = 512 * 1024 * 1024, max_concurrent: int | None = None) -> None:
+        """Инициализация сервиса. Пул процессов создаётся при запуске или первой отрисовке."""
+        self.workers = workers
+        self.max_concurrent = max_concurrent or workers * 2
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix
+        self.cache = RenderCache(output_dir, cache_max_bytes)
+        self._cache_loaded = False
+        self._cache_lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self.rendered = 0
+        self.cached = 0
+        self.failed = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Пул процессов отрисовки."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker)
+        return self._pool
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Семафор пакетной отрисовки. Создаётся при первом обращении внутри цикла событий."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        return self._slots
+
+    def _load_cache(self) -> None:
+        """Загрузка индекса кэша отрисовок при первом обращении."""
+        with self._cache_lock:
+            if not self._cache_loaded:
+                self.cache.load()
+                self._cache_loaded = True
+
+    async def start(self) -> None:
+        """Загрузка кэша отрисовок, запуск и прогрев всех процессов пула."""
+        await executors.run(ExecutorName.IMAGES, self._load_cache)
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(self.workers)))
+        log.info("Пул отрисовки DXF запущен, процессов: {workers}", workers=self.workers)
+
+    def shutdown(self) -> None:
+        """Остановка пула процессов и запись индекса кэша отрисовок."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._cache_loaded:
+            self.cache.save()
+
+    def _url(self, file_name: str) -> str:
+        """URL отрисованного чертежа."""
+        return f"{self.url_prefix}/{file_name}"
+
+    def _lookup(self, dxf_path: Path, options: RenderOptions) -> tuple[str, bool]:
+        """Имя файла отрисовки и её наличие в кэше. Выполняется в пуле потоков картинок."""
+        self._load_cache()
+        file_name = options.file_name(dxf_digest(dxf_path))
+        return file_name, self.cache.get(file_name) is not None
+
+    async def render(self, dxf_path: Path, options: RenderOptions | None = None) -> str:
+        """Отрисовка одного DXF. Возвращает URL картинки."""
+        options = options or RenderOptions()
+        file_name, cached = await executors.run(ExecutorName.IMAGES, self._lookup, dxf_path, options)
+        if cached:
+            self.cached += 1
+            return self._url(file_name)
+
+        in_flight = self._in_flight.get(file_name)
+        if in_flight is None:
+            # отрисовка идёт отдельной задачей: отмена запросившего не отменяет её для остальных,
+            # а результат процесса пула в любом случае попадает в кэш
+            in_flight = asyncio.create_task(self._render_to_cache(dxf_path, file_name, options),
+                                            name=f"dxf-render-{file_name}")
+            in_flight.add_done_callback(_retrieve_exception)
+            self._in_flight[file_name] = in_flight
+        return await asyncio.shield(in_flight)
+
+    async def _render_to_cache(self, dxf_path: Path, file_name: str, options: RenderOptions) -> str:
+        """Отрисовка DXF в пуле процессов и добавление в кэш отрисовок."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), _render_file, str(dxf_path), str(self.output_dir / file_name), options)
+            await executors.run(ExecutorName.IMAGES, self.cache.put, file_name)
+        finally:
+            self._in_flight.pop(file_name, None)
+        self.rendered += 1
+        return self._url(file_name)
+
+    async def render_many(self, source_file_names: dict[str, str],
+                          options: RenderOptions | None = None) -> dict[str, str | None]:
+        """Отрисовка чертежей деталей {PartName: SourceFileName}. Возвращает {PartName: URL или None}."""
+        async def render_part(part_name: str, source_file_name: str) -> str | None:
+            if not source_file_name:
+                return None
+            try:
+                async with self.slots:
+                    return await self.render(resolve_source_path(source_file_name), options)
+            except Exception as e:
+                self.failed += 1
+                log.error("Ошибка отрисовки DXF детали {part_name}: {source}", part_name=part_name,
+                          source=source_file_name)
+                log.exception(e)
+                return None
+
+        urls = await asyncio.gather(*(render_part(part_name, source)
+                                      for part_name, source in source_file_names.items()))
+        return dict(zip(source_file_names, urls, strict=True))
+
+    def stats(self) -> dict[str, int | dict]:
+        """Статистика отрисовки и кэша отрисовок."""
+        return {"workers": self.workers, "in_flight": len(self._in_flight), "rendered": self.rendered,
+                "cached": self.cached, "failed": self.failed, "cache": self.cache.stats()}
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """Получение исключения отрисовки, если все ожидающие её были отменены."""
+    if not task.cancelled():
+        task.exception()
+
+
+dxf_render_service = DxfRenderService(settings.DXF_RENDER_WORKERS, STATIC_RENDERS_DIR,
+                                      cache_max_bytes=settings.DXF_RENDER_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,154 @@
+"""Индекс картинок static/images в памяти процесса."""
+import os
+import asyncio
+import hashlib
+import threading
+import contextlib
+
+from pathlib import Path
+from dataclasses import dataclass
+
+from watchfiles import Change, awatch
+
+from config import STATIC_IMAGES_DIR
+from logger_config import log
+from utils.pics_utils.image_variants import ImageVariant, parse_variant_file_name
+
+IMAGE_SUFFIXES = frozenset({".bmp", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"})
+
+
+def file_version(stat: os.stat_result) -> str:
+    """Версия файла по времени изменения и размеру. Используется в URL картинок и в ETag."""
+    return hashlib.blake2s(f"{stat.st_mtime_ns}-{stat.st_size}".encode(), digest_size=6).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class ImageEntry:
+    """Картинка в static/images."""
+
+    file_name: str
+    url: str  # имена вариантов содержат хэш содержимого, к остальным URL добавляется версия ?v=
+    size: int
+    mtime: float
+    version: str
+
+
+class ImageManifest:
+    """Индекс файлов static/images: имя файла - URL, размер и время изменения.
+
+    Загружается при старте приложения и обновляется при копировании и извлечении картинок,
+    поэтому проверка наличия картинки - поиск в словаре без обращения к файловой системе.
+    Изменения, сделанные в обход приложения, подхватываются наблюдателем watchfiles.
+    Варианты картинок (миниатюра, полноразмерная) дополнительно индексируются по имени картинки,
+    при нескольких версиях варианта используется самая новая.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str = "/static/images") -> None:
+        """Инициализация пустого индекса."""
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self._entries: dict[str, ImageEntry] = {}
+        self._variants: dict[tuple[str, ImageVariant], ImageEntry] = {}
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        """Количество картинок в индексе."""
+        return len(self._entries)
+
+    def load(self, directory: Path | None = None) -> int:
+        """Полная загрузка индекса из каталога. Возвращает количество картинок."""
+        if directory is not None:
+            self.directory = directory
+        entries, variants = {}, {}
+        if self.directory.is_dir():
+            with os.scandir(self.directory) as files:
+                for file in files:
+                    if file.is_file() and Path(file.name).suffix.lower() in IMAGE_SUFFIXES:
+                        entry = self._entry(file.name, file.stat())
+                        entries[file.name] = entry
+                        self._index_variant(variants, entry)
+        with self._lock:
+            self._entries = entries
+            self._variants = variants
+        log.info("Загружен индекс картинок {directory}: {count} файлов.", directory=self.directory, count=len(entries))
+        return len(entries)
+
+    def _entry(self, file_name: str, stat: os.stat_result) -> ImageEntry:
+        """Запись индекса для файла."""
+        version = file_version(stat)
+        url = f"{self.url_prefix}/{file_name}"
+        if parse_variant_file_name(file_name) is None:
+            url = f"{url}?v={version}"
+        return ImageEntry(file_name=file_name, url=url, size=stat.st_size, mtime=stat.st_mtime, version=version)
+
+    @staticmethod
+    def _index_variant(variants: dict[tuple[str, ImageVariant], ImageEntry], entry: ImageEntry) -> None:
+        """Добавление файла в индекс вариантов, если он является вариантом картинки."""
+        key = parse_variant_file_name(entry.file_name)
+        if key is not None:
+            current = variants.get(key)
+            if current is None or current.mtime <= entry.mtime:
+                variants[key] = entry
+
+    def get(self, file_name: str) -> ImageEntry | None:
+        """Запись индекса по имени файла."""
+        return self._entries.get(file_name)
+
+    def get_variant(self, stem: str, variant: ImageVariant) -> ImageEntry | None:
+        """Самая новая версия варианта картинки stem."""
+        return self._variants.get((stem, variant))
+
+    def add(self, path: Path) -> ImageEntry | None:
+        """Добавление или обновление файла в индексе. Отсутствующий файл удаляется из индекса."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.discard(path.name)
+            return None
+        entry = self._entry(path.name, stat)
+        with self._lock:
+            self._entries[path.name] = entry
+            self._index_variant(self._variants, entry)
+        return entry
+
+    def discard(self, file_name: str) -> None:
+        """Удаление файла из индекса."""
+        with self._lock:
+            self._entries.pop(file_name, None)
+            key = parse_variant_file_name(file_name)
+            if key is not None and (entry := self._variants.get(key)) is not None and entry.file_name == file_name:
+                del self._variants[key]
+
+    def apply_changes(self, changes: set[tuple[Change, str]]) -> None:
+        """Применение изменений файловой системы, полученных от watchfiles."""
+        for change, raw_path in changes:
+            path = Path(raw_path)
+            if path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            if change == Change.deleted:
+                self.discard(path.name)
+            else:
+                self.add(path)
+
+    async def watch(self) -> None:
+        """Отслеживание изменений каталога картинок."""
+        async for changes in awatch(self.directory, recursive=False):
+            self.apply_changes(changes)
+
+    def start(self) -> None:
+        """Запуск наблюдателя за каталогом картинок."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.watch(), name="image-manifest-watch")
+            log.info("Наблюдение за каталогом картинок {directory} запущено.", directory=self.directory)
+
+    async def stop(self) -> None:
+        """Остановка наблюдателя."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+image_manifest = ImageManifest(STATIC_IMAGES_DIR)
@@ -0,0 +1,139 @@
+"""Фоновая подготовка картинок программ и деталей после загрузки из sigma nest."""
+import enum
+import asyncio
+import functools
+
+from collections.abc import Callable, Iterable, Awaitable
+
+from config import settings
+from logger_config import log
+from utils.pics_utils.copy_pics_and_get_links import prepare_part_image, prepare_program_image
+
+
+class ImageKind(enum.StrEnum):
+    """Вид картинки."""
+
+    PROGRAM = "program"  # PNG программы из ODS
+    PART = "part"  # BMP детали
+
+
+class ImagePrewarmQueue:
+    """Очередь фоновой подготовки картинок.
+
+    Картинки программ и деталей, загруженных из sigma nest, готовятся заранее, чтобы первый запрос
+    списков программ не ждал копирования с сетевого диска. Повторно поставленная в очередь картинка
+    не дублируется, одновременно готовится не более workers картинок, ошибки повторяются
+    до max_retries раз с растущей задержкой.
+    """
+
+    def __init__(self,
+                 resolvers: dict[ImageKind, Callable[[str], Awaitable[str | None]]],
+                 workers: int = 2,
+                 max_retries: int = 3,
+                 retry_delay: float = 5.0) -> None:
+        """Инициализация очереди."""
+        self._resolvers = resolvers
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[tuple[ImageKind, str, int]] = asyncio.Queue()
+        self._pending: set[tuple[ImageKind, str]] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._active = 0
+        self._done = 0
+        self._missing = 0
+        self._retried = 0
+        self._failed = 0
+
+    def enqueue(self, kind: ImageKind, names: Iterable[str]) -> int:
+        """Постановка картинок в очередь. Возвращает количество новых задач."""
+        added = 0
+        for name in dict.fromkeys(names):
+            key = (kind, name)
+            if not name or key in self._pending:
+                continue
+            self._pending.add(key)
+            self._queue.put_nowait((kind, name, 0))
+            added += 1
+        if added:
+            log.debug("В очередь подготовки картинок {kind} добавлено {added}", kind=kind, added=added)
+        return added
+
+    def enqueue_programs(self, program_names: Iterable[str]) -> int:
+        """Постановка в очередь картинок программ."""
+        return self.enqueue(ImageKind.PROGRAM, program_names)
+
+    def enqueue_parts(self, part_names: Iterable[str]) -> int:
+        """Постановка в очередь картинок деталей."""
+        return self.enqueue(ImageKind.PART, part_names)
+
+    async def _worker(self) -> None:
+        """Обработка задач очереди."""
+        while True:
+            kind, name, attempt = await self._queue.get()
+            self._active += 1
+            try:
+                url = await self._resolvers[kind](name)
+            except Exception as e:
+                if attempt < self.max_retries:
+                    self._retried += 1
+                    delay = self.retry_delay * 2 ** attempt
+                    asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, (kind, name, attempt + 1))
+                else:
+                    self._failed += 1
+                    self._pending.discard((kind, name))
+                    log.error("Не удалось подготовить картинку {kind} {name}.", kind=kind, name=name)
+                    log.exception(e)
+            else:
+                if url is None:
+                    self._missing += 1
+                else:
+                    self._done += 1
+                self._pending.discard((kind, name))
+            finally:
+                self._active -= 1
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Ожидание обработки всех поставленных задач, включая повторы."""
+        while self._pending:
+            await self._queue.join()
+            if self._pending:
+                await asyncio.sleep(self.retry_delay / 10)
+
+    def stats(self) -> dict[str, int]:
+        """Ход подготовки картинок."""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize(),
+            "pending": len(self._pending),
+            "active": self._active,
+            "done": self._done,
+            "missing": self._missing,
+            "retried": self._retried,
+            "failed": self._failed,
+        }
+
+    def start(self) -> None:
+        """Запуск обработчиков очереди."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(), name=f"image-prewarm-{number}")
+                           for number in range(self.workers)]
+            log.info("Фоновая подготовка картинок запущена, обработчиков: {workers}", workers=self.workers)
+
+    async def stop(self) -> None:
+        """Остановка обработчиков. Необработанные задачи отбрасываются."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+image_prewarm = ImagePrewarmQueue(
+    # картинки перепроверяются: перенесённая программа или изменённый BMP детали получают новую картинку
+    {ImageKind.PROGRAM: functools.partial(prepare_program_image, refresh=True),
+     ImageKind.PART: functools.partial(prepare_part_image, refresh=True)},
+    workers=settings.IMAGES_PREWARM_WORKERS,
+    max_retries=settings.IMAGES_PREWARM_RETRIES,
+    retry_delay=settings.IMAGES_PREWARM_RETRY_DELAY,
+)
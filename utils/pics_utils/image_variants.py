@@ -0,0 +1,99 @@
+"""Сжатые варианты картинок деталей: миниатюры для списков и полноразмерные картинки WebP."""
+import io
+import os
+import re
+import enum
+import glob
+import hashlib
+import tempfile
+
+from pathlib import Path
+from collections.abc import Iterable
+
+from PIL import Image
+
+from config import settings
+
+VARIANT_SUFFIX = ".webp"
+DIGEST_LENGTH = 12
+_VARIANT_NAME = re.compile(rf"^(?P<stem>.+)\.(?P<variant>thumb|full)\.(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}})\.webp$")
+
+
+class ImageVariant(enum.StrEnum):
+    """Вариант картинки."""
+
+    THUMB = "thumb"  # миниатюра для списков
+    FULL = "full"  # полноразмерная картинка для детального просмотра
+
+
+def variant_file_name(stem: str, variant: ImageVariant, digest: str) -> str:
+    """Имя файла варианта: <имя>.<вариант>.<хэш версии исходной картинки>.webp."""
+    return f"{stem}.{variant}.{digest[:DIGEST_LENGTH]}{VARIANT_SUFFIX}"
+
+
+def parse_variant_file_name(file_name: str) -> tuple[str, ImageVariant] | None:
+    """Имя картинки и вариант по имени файла или None, если файл не является вариантом."""
+    match = _VARIANT_NAME.match(file_name)
+    if match is None:
+        return None
+    return match["stem"], ImageVariant(match["variant"])
+
+
+def source_digest(source_path: Path) -> str:
+    """Хэш версии исходной картинки по времени изменения и размеру."""
+    stat = source_path.stat()
+    return hashlib.sha256(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()
+
+
+def _encode_webp(image: Image.Image, *, lossless: bool) -> bytes:
+    """Сжатие картинки в WebP."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=settings.IMAGES_WEBP_QUALITY, lossless=lossless, method=4)
+    return buffer.getvalue()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Запись файла через временный файл, чтобы не отдавать недописанную картинку."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def build_variants(source_path: Path, dest_dir: Path, stem: str) -> dict[ImageVariant, Path]:
+    """Создание миниатюры и полноразмерной картинки WebP из исходной картинки.
+
+    Имена файлов содержат хэш версии исходной картинки, поэтому изменённая картинка получает новый URL,
+    а варианты неизменённой повторно не создаются.
+    """
+    digest = source_digest(source_path)
+    paths = {variant: dest_dir / variant_file_name(stem, variant, digest) for variant in ImageVariant}
+    if all(path.exists() for path in paths.values()):
+        return paths
+
+    with Image.open(source_path) as source:
+        image = source.convert("RGBA" if "A" in source.getbands() or "transparency" in source.info else "RGB")
+    thumbnail = image.copy()
+    thumbnail.thumbnail((settings.IMAGES_THUMB_SIZE, settings.IMAGES_THUMB_SIZE), Image.Resampling.LANCZOS)
+
+    # сглаженные при уменьшении линии миниатюры лучше сжимаются с потерями
+    for variant, variant_image, lossless in ((ImageVariant.THUMB, thumbnail, False),
+                                             (ImageVariant.FULL, image, settings.IMAGES_WEBP_LOSSLESS)):
+        _write_atomic(paths[variant], _encode_webp(variant_image, lossless=lossless))
+    return paths
+
+
+def remove_superseded_variants(dest_dir: Path, stem: str, current: Iterable[Path]) -> list[Path]:
+    """Удаление вариантов картинки stem прежних версий исходной картинки. Возвращает удалённые файлы."""
+    current_names = {path.name for path in current}
+    removed = []
+    for path in dest_dir.glob(f"{glob.escape(stem)}.*{VARIANT_SUFFIX}"):
+        key = parse_variant_file_name(path.name)
+        if key is not None and key[0] == stem and path.name not in current_names:
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
@@ -0,0 +1,144 @@
+"""Кэш отсутствующих исходных файлов картинок на сетевом диске."""
+import os
+import time
+import asyncio
+import threading
+import contextlib
+
+from pathlib import Path
+from collections import OrderedDict, defaultdict
+
+from config import settings
+from logger_config import log
+from utils.executors import ExecutorName, executors
+
+
+class MissingSourceCache:
+    """Кэш отрицательных результатов поиска BMP деталей и ODS программ с TTL и вытеснением LRU.
+
+    Ключ - путь к исходному файлу. Пока запись не истекла, повторные запросы картинок старых программ
+    без рисунков не обращаются к сетевому диску. Записи удаляются по TTL, периодической перепроверкой
+    существования файлов или явной очисткой.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, list_threshold: int = 200) -> None:
+        """Инициализация кэша. list_threshold - записей каталога, с которых перепроверка читает каталог целиком."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.list_threshold = list_threshold
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def is_missing(self, path: Path) -> bool:
+        """Проверка, что файл недавно не был найден."""
+        key = str(path)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True
+                del self._entries[key]
+            self.misses += 1
+            return False
+
+    def add(self, path: Path) -> None:
+        """Запоминание отсутствующего файла с вытеснением давно не использованных записей."""
+        key = str(path)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> int:
+        """Очистка кэша. Возвращает количество удалённых записей."""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        log.debug("Кэш отсутствующих картинок очищен, удалено записей: {removed}", removed=removed)
+        return removed
+
+    def rescan(self) -> int:
+        """Удаление истекших записей и файлов, появившихся на сетевом диске. Возвращает количество удалённых.
+
+        Каталог с list_threshold и более записями читается один раз целиком, в остальных каталогах
+        существование проверяется по файлам: каталог деталей на сетевом диске слишком велик для чтения
+        ради нескольких записей.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        stale = [key for key, expires_at in entries if expires_at <= now]
+        by_directory = defaultdict(list)
+        for key, expires_at in entries:
+            if expires_at > now:
+                by_directory[Path(key).parent].append(key)
+        for directory, keys in by_directory.items():
+            if len(keys) < self.list_threshold:
+                stale.extend(key for key in keys if _exists(Path(key)))
+                continue
+            present = _list_names(directory)
+            stale.extend(key for key in keys if Path(key).name.casefold() in present)
+        with self._lock:
+            for key in stale:
+                self._entries.pop(key, None)
+        if stale:
+            log.debug("Перепроверка отсутствующих картинок: удалено записей {removed}", removed=len(stale))
+        return len(stale)
+
+    def stats(self) -> dict[str, int | float]:
+        """Статистика кэша."""
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+    async def run_forever(self, interval: float) -> None:
+        """Периодическая перепроверка отсутствующих файлов в пуле потоков картинок."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await executors.run(ExecutorName.IMAGES, self.rescan)
+            except Exception as e:
+                log.error("Ошибка перепроверки отсутствующих картинок.")
+                log.exception(e)
+
+    def start(self, interval: float) -> None:
+        """Запуск периодической перепроверки."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever(interval), name="missing-sources-rescan")
+
+    async def stop(self) -> None:
+        """Остановка периодической перепроверки."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def _exists(path: Path) -> bool:
+    """Проверка существования файла. False, если сетевой диск недоступен."""
+    try:
+        return path.exists()
+    except OSError as e:
+        log.warning("Файл {path} недоступен для перепроверки картинок: {error}", path=path, error=e)
+        return False
+
+
+def _list_names(directory: Path) -> set[str]:
+    """Имена файлов каталога без учёта регистра (как на сетевом диске Windows). Пусто, если каталог недоступен."""
+    try:
+        with os.scandir(directory) as files:
+            return {file.name.casefold() for file in files}
+    except OSError as e:
+        log.warning("Каталог {directory} недоступен для перепроверки картинок: {error}", directory=directory, error=e)
+        return set()
+
+
+missing_sources = MissingSourceCache(ttl=settings.IMAGES_MISSING_TTL, max_entries=settings.IMAGES_MISSING_MAX_ENTRIES,
+                                     list_threshold=settings.IMAGES_MISSING_LIST_THRESHOLD)
@@ -1,116 +1,174 @@
 # ruff: noqa
 """Работа с DXF файлами."""
 from pathlib import Path
+from xml.etree import ElementTree as ET
+from collections.abc import Iterable
 
 import ezdxf
+import numpy as np
 import matplotlib.pyplot as plt
 
-from ezdxf.math import Vec2
-from ezdxf.addons.drawing import Frontend, RenderContext
-from ezdxf.addons.drawing.config import ColorPolicy, Configuration
+from ezdxf import bbox
+from ezdxf.math import Vec2, Matrix44, BoundingBox2d
+from ezdxf.layouts import BlockLayout
+from ezdxf.entities import Insert
+from ezdxf.addons.drawing import Frontend, RenderContext, svg, layout
+from ezdxf.addons.drawing.config import ColorPolicy, Configuration, BackgroundPolicy
 from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
 
 
+Bounds = np.ndarray  # [xmin, ymin, xmax, ymax]
+EMPTY_BOUNDS = np.array([np.inf, np.inf, -np.inf, -np.inf])
+_QUADRANTS = np.array([0.0, np.pi / 2, np.pi, 3 * np.pi / 2])
+SVG_PAGE_SIZE = 6.4 * 25.4  # большая сторона SVG, мм: как у фигуры matplotlib 6.4 дюйма
+SVG_FONT_RATIO = 0.02  # высота подписи размеров относительно большей стороны чертежа
+
+
+def arc_bounds(cx: np.ndarray, cy: np.ndarray, radius: np.ndarray, start: np.ndarray, span: np.ndarray) -> Bounds:
+    """Точные габариты дуг: концы дуг и пересечённые дугами точки квадрантов (0, 90, 180, 270 градусов).
+
+    Углы в радианах, дуга идёт против часовой стрелки от start на span.
+    """
+    if not len(cx):
+        return EMPTY_BOUNDS
+    end = start + span
+    xs = np.stack([np.cos(start), np.cos(end)]) * radius + cx
+    ys = np.stack([np.sin(start), np.sin(end)]) * radius + cy
+    crossed = np.mod(_QUADRANTS[:, None] - start, 2 * np.pi) <= span
+    xmax = np.where(crossed[0], cx + radius, xs.max(axis=0))
+    ymax = np.where(crossed[1], cy + radius, ys.max(axis=0))
+    xmin = np.where(crossed[2], cx - radius, xs.min(axis=0))
+    ymin = np.where(crossed[3], cy - radius, ys.min(axis=0))
+    return np.array([xmin.min(), ymin.min(), xmax.max(), ymax.max()])
+
+
+def points_bounds(points: np.ndarray) -> Bounds:
+    """Габариты набора точек (N, 2)."""
+    if not len(points):
+        return EMPTY_BOUNDS
+    return np.concatenate([points.min(axis=0), points.max(axis=0)])
+
+
+def union_bounds(*bounds: Bounds) -> Bounds:
+    """Объединение габаритов."""
+    stacked = np.stack(bounds)
+    return np.concatenate([stacked[:, :2].min(axis=0), stacked[:, 2:].max(axis=0)])
+
+
+def bulge_arcs(start_points: np.ndarray, end_points: np.ndarray, bulges: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Дуги сегментов полилинии с выпуклостью (bulge): центры, радиусы, начальные углы и углы дуг."""
+    chord = end_points - start_points
+    length = np.hypot(chord[:, 0], chord[:, 1])
+    normal = np.stack([-chord[:, 1], chord[:, 0]], axis=1)
+    center = (start_points + end_points) / 2 + normal * ((1 - bulges ** 2) / (4 * bulges))[:, None]
+    radius = length * (1 + bulges ** 2) / (4 * np.abs(bulges))
+    # отрицательная выпуклость - дуга по часовой стрелке, то есть против часовой от конца к началу
+    arc_start = np.where(bulges[:, None] > 0, start_points, end_points) - center
+    start = np.arctan2(arc_start[:, 1], arc_start[:, 0])
+    span = 4 * np.arctan(np.abs(bulges))
+    return center[:, 0], center[:, 1], radius, start, span
+
+
+class BoundsCollector:
+    """Сбор координат примитивов по типам в массивы NumPy и вычисление габаритов.
+
+    Габариты определений блоков вычисляются один раз на блок и переиспользуются всеми вставками.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустого кэша блоков."""
+        self._blocks: dict[str, Bounds] = {}
+
+    def entities_bounds(self, entities: Iterable) -> Bounds:
+        """Габариты набора примитивов."""
+        points: list[tuple[float, float]] = []
+        circles: list[tuple[float, float, float]] = []
+        arcs: list[tuple[float, float, float, float, float]] = []
+        polylines: list[np.ndarray] = []
+        other: list[Bounds] = []
+
+        for entity in entities:
+            dxftype = entity.dxftype()
+            if dxftype == "LINE":
+                start, end = entity.dxf.start, entity.dxf.end
+                points += ((start.x, start.y), (end.x, end.y))
+            elif dxftype == "CIRCLE":
+                center = entity.dxf.center
+                circles.append((center.x, center.y, entity.dxf.radius))
+            elif dxftype == "ARC":
+                center = entity.dxf.center
+                arcs.append((center.x, center.y, entity.dxf.radius, entity.dxf.start_angle, entity.dxf.end_angle))
+            elif dxftype == "LWPOLYLINE":
+                vertices = np.array(entity.get_points("xyb"), dtype=float).reshape(-1, 3)
+                if entity.closed and len(vertices):
+                    vertices = np.vstack([vertices, vertices[:1]])
+                polylines.append(vertices)
+            elif dxftype == "INSERT":
+                other.append(self.insert_bounds(entity))
+            else:  # остальные примитивы (сплайны, эллипсы, тексты) - через ezdxf.bbox
+                box = bbox.extents([entity], fast=True)
+                if box.has_data:
+                    other.append(np.array([box.extmin.x, box.extmin.y, box.extmax.x, box.extmax.y]))
+
+        circle_array = np.array(circles, dtype=float).reshape(-1, 3)
+        cx, cy, radius = circle_array.T
+        parts = [
+            points_bounds(np.array(points, dtype=float).reshape(-1, 2)),
+            np.array([(cx - radius).min(initial=np.inf), (cy - radius).min(initial=np.inf),
+                      (cx + radius).max(initial=-np.inf), (cy + radius).max(initial=-np.inf)]),
+            self._arc_entities_bounds(np.array(arcs, dtype=float).reshape(-1, 5)),
+            *(self._polyline_bounds(vertices) for vertices in polylines),
+            *other,
+        ]
+        return union_bounds(*parts)
+
+    @staticmethod
+    def _arc_entities_bounds(arcs: np.ndarray) -> Bounds:
+        """Габариты примитивов ARC (углы в градусах)."""
+        cx, cy, radius, start_angle, end_angle = arcs.T
+        span = np.mod(end_angle - start_angle, 360.0)
+        return arc_bounds(cx, cy, radius, np.radians(start_angle), np.radians(span))
+
+    @staticmethod
+    def _polyline_bounds(vertices: np.ndarray) -> Bounds:
+        """Габариты полилинии с учётом дуговых сегментов."""
+        if not len(vertices):
+            return EMPTY_BOUNDS
+        bulged = vertices[:-1, 2] != 0
+        if not bulged.any():
+            return points_bounds(vertices[:, :2])
+        arcs = bulge_arcs(vertices[:-1][bulged, :2], vertices[1:][bulged, :2], vertices[:-1][bulged, 2])
+        return union_bounds(points_bounds(vertices[:, :2]), arc_bounds(*arcs))
+
+    def block_bounds(self, block: BlockLayout) -> Bounds:
+        """Габариты определения блока в его системе координат (вычисляются один раз на блок)."""
+        bounds = self._blocks.get(block.name)
+        if bounds is None:
+            base_point = block.block.dxf.base_point
+            bounds = self.entities_bounds(block) - np.array([base_point.x, base_point.y] * 2)
+            self._blocks[block.name] = bounds
+        return bounds
+
+    def insert_bounds(self, insert: Insert) -> Bounds:
+        """Габариты вставки блока: углы габаритов блока с масштабом, поворотом и точкой вставки."""
+        block = insert.block()
+        if block is None:
+            return EMPTY_BOUNDS
+        xmin, ymin, xmax, ymax = self.block_bounds(block)
+        if not np.isfinite(xmin):
+            return EMPTY_BOUNDS
+        corners = np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]])
+        corners *= [insert.dxf.xscale or 1, insert.dxf.yscale or 1]
+        angle = np.radians(insert.dxf.rotation)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        insertion_point = insert.dxf.insert
+        return points_bounds(corners @ rotation.T + [insertion_point.x, insertion_point.y])
+
+
 def get_bounding_box(msp: ezdxf.layouts.Modelspace) -> tuple[Vec2, Vec2]:
     """Получение границы чертежа."""
-    min_point = Vec2(float("inf"), float("inf"))
-    max_point = Vec2(float("-inf"), float("-inf"))
-
-    for entity in msp:
-        if entity.dxftype() == "CIRCLE":  # Обработка окружностей
-            center = Vec2(entity.dxf.center)
-            radius = entity.dxf.radius
-            min_point = Vec2(min(min_point.x, center.x - radius), min(min_point.y, center.y - radius))
-            max_point = Vec2(max(max_point.x, center.x + radius), max(max_point.y, center.y + radius))
-        elif entity.dxftype() == "LINE":  # Обработка линий
-            start = Vec2(entity.dxf.start)
-            end = Vec2(entity.dxf.end)
-            min_point = Vec2(min(min_point.x, start.x, end.x), min(min_point.y, start.y, end.y))
-            max_point = Vec2(max(max_point.x, start.x, end.x), max(max_point.y, start.y, end.y))
-        elif entity.dxftype() == "LWPOLYLINE":  # Обработка полилиний
-            points = [Vec2(p[0], p[1]) for p in entity.get_points()]
-            if points:
-                min_point = Vec2(min(min_point.x, *(p.x for p in points)), min(min_point.y, *(p.y for p in points)))
-                max_point = Vec2(max(max_point.x, *(p.x for p in points)), max(max_point.y, *(p.y for p in points)))
-        elif entity.dxftype() == "ARC":  # Обработка дуг
-            center = Vec2(entity.dxf.center)
-            radius = entity.dxf.radius
-            angle_min = entity.dxf.start_angle
-            angle_max = entity.dxf.end_angle
-            # Вычисляем крайние точки дуги
-            from math import cos, sin, radians
-            start_point = Vec2(center.x + radius * cos(radians(angle_min)), center.y + radius * sin(radians(angle_min)))
-            end_point = Vec2(center.x + radius * cos(radians(angle_max)), center.y + radius * sin(radians(angle_max)))
-            min_point = Vec2(min(min_point.x, start_point.x, end_point.x, center.x - radius),
-                             min(min_point.y, start_point.y, end_point.y, center.y - radius))
-            max_point = Vec2(max(max_point.x, start_point.x, end_point.x, center.x + radius),
-                             max(max_point.y, start_point.y, end_point.y, center.y + radius))
-        elif hasattr(entity, "extents"):  # Обработка других объектов с методом extents()
-            bbox = entity.extents()
-            min_point = Vec2(min(min_point.x, bbox[0].x), min(min_point.y, bbox[0].y))
-            max_point = Vec2(max(max_point.x, bbox[1].x), max(max_point.y, bbox[1].y))
-
-        elif entity.dxftype() == "INSERT":  # Обработка блоков (вставок)
-            insertion_point = Vec2(entity.dxf.insert)  # Точка вставки блока
-            xscale = entity.dxf.xscale if entity.dxf.xscale != 0 else 1  # Масштаб по X
-            yscale = entity.dxf.yscale if entity.dxf.yscale != 0 else 1  # Масштаб по Y
-            rotation = entity.dxf.rotation  # Поворот блока
-
-            # Получаем определение блока через документ
-            block = entity.block()  # Метод block() возвращает определение блока
-            if block is not None:
-                # Находим минимальные и максимальные координаты блока вручную
-                block_min = Vec2(float("inf"), float("inf"))
-                block_max = Vec2(float("-inf"), float("-inf"))
-
-                for e in block:  # Перебираем элементы внутри блока
-                    if e.dxftype() == "CIRCLE":  # Обработка окружностей
-                        center = Vec2(e.dxf.center)
-                        radius = e.dxf.radius
-                        block_min = Vec2(min(block_min.x, center.x - radius), min(block_min.y, center.y - radius))
-                        block_max = Vec2(max(block_max.x, center.x + radius), max(block_max.y, center.y + radius))
-
-                    elif e.dxftype() == "LINE":  # Обработка линий
-                        start = Vec2(e.dxf.start)
-                        end = Vec2(e.dxf.end)
-                        block_min = Vec2(min(block_min.x, start.x, end.x), min(block_min.y, start.y, end.y))
-                        block_max = Vec2(max(block_max.x, start.x, end.x), max(block_max.y, start.y, end.y))
-
-                    elif e.dxftype() == "LWPOLYLINE":  # Обработка полилиний
-                        points = [Vec2(p[0], p[1]) for p in e.get_points()]
-                        if points:
-                            block_min = Vec2(min(block_min.x, *(p.x for p in points)),
-                                             min(block_min.y, *(p.y for p in points)))
-                            block_max = Vec2(max(block_max.x, *(p.x for p in points)),
-                                             max(block_max.y, *(p.y for p in points)))
-
-                    elif hasattr(e, "extents"):  # Обработка других объектов с методом extents()
-                        bbox = e.extents()
-                        block_min = Vec2(min(block_min.x, bbox[0].x), min(block_min.y, bbox[0].y))
-                        block_max = Vec2(max(block_max.x, bbox[1].x), max(block_max.y, bbox[1].y))
-
-                if block_min != Vec2(float("inf"), float("inf")) and block_max != Vec2(float("-inf"), float("-inf")):
-                    # Применяем преобразования блока к его границам
-                    transformed_block_min = insertion_point + Vec2(
-                        (block_min.x * xscale),
-                        (block_min.y * yscale),
-                    ).rotate_deg(rotation)
-
-                    transformed_block_max = insertion_point + Vec2(
-                        (block_max.x * xscale),
-                        (block_max.y * yscale),
-                    ).rotate_deg(rotation)
-
-                    # Обновляем глобальные минимум и максимум
-                    min_point = Vec2(min(min_point.x, transformed_block_min.x, transformed_block_max.x),
-                                     min(min_point.y, transformed_block_min.y, transformed_block_max.y))
-                    max_point = Vec2(max(max_point.x, transformed_block_min.x, transformed_block_max.x),
-                                     max(max_point.y, transformed_block_min.y, transformed_block_max.y))
-
-        else:
-            print(f"Не известный тип фигуры: {entity.dxftype()}") # noqa
-        print(min_point, max_point) # noqa
-    return min_point, max_point
+    xmin, ymin, xmax, ymax = BoundsCollector().entities_bounds(msp)
+    return Vec2(xmin, ymin), Vec2(xmax, ymax)
 
 
 def add_bounding_dimensions(ax: plt.Axes, min_point: Vec2, max_point: Vec2) -> None:
@@ -146,7 +204,10 @@ def add_bounding_dimensions(ax: plt.Axes, min_point: Vec2, max_point: Vec2) -> N
             [min_point.y - axes_offset, max_point.y - axes_offset], "k--")  # Чёрные пунктирные линии
 
 
-def dxf_to_image_with_bounding(dxf_file: Path, output_image: str | None = None) -> None:
+def dxf_to_image_with_bounding(dxf_file: Path, output_image: str | None = None, *,
+                               dpi: int = 300,
+                               color_policy: ColorPolicy = ColorPolicy.BLACK,
+                               dimensions: bool = True) -> None:
     """Рендеринг DXF в изображение с белым фоном и чёрными линиями."""
     # Загрузка DXF-файла
     doc = ezdxf.readfile(dxf_file)
@@ -159,7 +220,7 @@ def dxf_to_image_with_bounding(dxf_file: Path, output_image: str | None = None)
 
     # Настройка конфигурации рендеринга
     config = Configuration(lineweight_scaling=3,
-        color_policy=ColorPolicy.BLACK)
+        color_policy=color_policy)
 
     # Создание backend'a для Matplotlib
     backend = MatplotlibBackend(ax)
@@ -168,16 +229,90 @@ def dxf_to_image_with_bounding(dxf_file: Path, output_image: str | None = None)
     # Рисование элементов DXF
     frontend.draw_layout(msp)
 
-    # Получение границ чертежа
-    min_point, max_point = get_bounding_box(msp)
+    if dimensions:
+        # Получение границ чертежа
+        min_point, max_point = get_bounding_box(msp)
 
-    # Добавление габаритных размеров
-    add_bounding_dimensions(ax, min_point, max_point)
+        # Добавление габаритных размеров
+        add_bounding_dimensions(ax, min_point, max_point)
 
     # Сохранение изображения
-    fig.savefig(output_image, dpi=300, transparent=True, facecolor="white", edgecolor="black")
+    fig.savefig(output_image, dpi=dpi, transparent=True, facecolor="white", edgecolor="black")
     plt.close(fig)
 
+def _add_svg_bounding_dimensions(root: ET.Element, transform: Matrix44, min_point: Vec2, max_point: Vec2,
+                                 axes_offset: float, font_size: float) -> None:
+    """Добавление габаритных размеров в SVG векторными линиями и текстом.
+
+    Координаты чертежа переводятся в координаты SVG матрицей transform бэкенда SVG.
+    """
+    width = max_point.x - min_point.x
+    height = max_point.y - min_point.y
+    scale = transform.transform_direction((1, 0, 0)).magnitude
+
+    def point(x: float, y: float) -> str:
+        view = transform.transform((x, y, 0))
+        return f"{view.x:.0f} {view.y:.0f}"
+
+    group = ET.SubElement(root, "g", {"fill": "black", "stroke": "black", "font-family": "sans-serif",
+                                      "font-size": f"{font_size * scale:.0f}", "text-anchor": "middle"})
+    line_style = {"fill": "none", "stroke-width": f"{font_size * scale / 10:.0f}",
+                  "stroke-dasharray": f"{font_size * scale / 2:.0f}"}
+    # Размер по ширине под чертежом
+    y = min_point.y - axes_offset
+    ET.SubElement(group, "path", {"d": f"M {point(min_point.x, y)} L {point(max_point.x, y)}", **line_style})
+    text_x, text_y = point((min_point.x + max_point.x) / 2, y - font_size * 1.2).split()
+    ET.SubElement(group, "text", {"x": text_x, "y": text_y, "stroke": "none"}).text = f"Ширина: {width:.2f}"
+    # Размер по высоте слева от чертежа
+    x = min_point.x - axes_offset
+    ET.SubElement(group, "path", {"d": f"M {point(x, min_point.y)} L {point(x, max_point.y)}", **line_style})
+    text_x, text_y = point(x - font_size * 0.4, (min_point.y + max_point.y) / 2).split()
+    ET.SubElement(group, "text", {"x": text_x, "y": text_y, "stroke": "none",
+                                  "transform": f"rotate(-90 {text_x} {text_y})"}).text = f"Высота: {height:.2f}"
+
+
+def dxf_to_svg_with_bounding(dxf_file: Path, output_image: str | None = None, *,
+                             color_policy: ColorPolicy = ColorPolicy.BLACK,
+                             dimensions: bool = True) -> str:
+    """Рендеринг DXF в SVG бэкендом ezdxf с белым фоном и габаритными размерами. Возвращает SVG."""
+    doc = ezdxf.readfile(dxf_file)
+    msp = doc.modelspace()
+
+    config = Configuration(lineweight_scaling=3, color_policy=color_policy,
+                           background_policy=BackgroundPolicy.WHITE)
+    backend = svg.SVGBackend()
+    Frontend(RenderContext(doc), backend, config=config).draw_layout(msp)
+
+    render_box = None
+    min_point, max_point = get_bounding_box(msp)
+    dimensions = dimensions and min_point.x <= max_point.x
+    if dimensions:
+        # место под размеры слева и снизу от чертежа
+        font_size = max(max_point.x - min_point.x, max_point.y - min_point.y, 1) * SVG_FONT_RATIO
+        axes_offset = max(10, font_size)
+        margin = axes_offset + font_size * 2
+        render_box = BoundingBox2d([min_point - Vec2(margin, margin), max_point])
+
+    page = layout.Page(0, 0, layout.Units.mm, margins=layout.Margins.all(2),
+                       max_width=SVG_PAGE_SIZE, max_height=SVG_PAGE_SIZE)
+    root = backend.get_xml_root_element(page, render_box=render_box)
+    if dimensions and backend.transformation_matrix is not None:
+        _add_svg_bounding_dimensions(root, backend.transformation_matrix, min_point, max_point,
+                                     axes_offset, font_size)
+    svg_image = ET.tostring(root, encoding="unicode", xml_declaration=True)
+    if output_image is not None:
+        Path(output_image).write_text(svg_image, encoding="utf-8")
+    return svg_image
+
+
+def svg_to_png(svg_image: str, output_image: str, dpi: int = 300) -> None:
+    """Растеризация SVG в PNG через cairosvg."""
+    # cairosvg требует системную библиотеку cairo, поэтому импортируется только при растеризации
+    import cairosvg
+
+    cairosvg.svg2png(bytestring=svg_image.encode(), write_to=output_image, dpi=dpi, background_color="white")
+
+
 if __name__ == "__main__":
     base_path = Path(r"M:\Xranenie\Чертежи на плазму\А КОТЛЫ")
     # file_name = "8СП СТГ2-3.dxf"
@@ -1,32 +1,58 @@
 """Работа с ODS файлами."""
+import shutil
 import zipfile
+import tempfile
 
 from pathlib import Path
 
 from logger_config import log
 
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg")
+COPY_CHUNK_SIZE = 1024 * 1024
 
-def extract_images_from_ods(ods_file_path: Path, output_dir: Path) -> None:
-    """Получение картинки из ODS файла."""
+
+def find_image_member(ods_zip: zipfile.ZipFile) -> zipfile.ZipInfo | None:
+    """Первое изображение ODS по центральному каталогу архива."""
+    for member in ods_zip.infolist():
+        if not member.is_dir() and member.filename.lower().endswith(IMAGE_EXTENSIONS):
+            return member
+    return None
+
+
+def extract_images_from_ods(ods_file_path: Path, output_dir: Path) -> Path | None:
+    """Получение картинки из ODS файла. Возвращает путь к картинке или None, если картинки нет.
+
+    Изображение копируется частями во временный файл рядом с output_dir и переименовывается,
+    поэтому одновременные извлечения одной программы не оставляют недописанных картинок.
+    """
     if not ods_file_path.exists():
-        log.debug("Файл {ods_file_path} не найден.", od_file_path=ods_file_path)
-        return
+        log.debug("Файл {ods_file_path} не найден.", ods_file_path=ods_file_path)
+        return None
 
     try:
         # Открываем ODS как ZIP-архив
         with zipfile.ZipFile(ods_file_path, "r") as ods_zip:
-            # Ищем все файлы с расширением, которое может быть изображением
-            image_extensions = [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg"]
-            for file_name in ods_zip.namelist():
-                # Проверяем, является ли файл изображением
-                if any(file_name.lower().endswith(ext) for ext in image_extensions):
-                    with output_dir.open("wb") as image_file:
-                        image_file.write(ods_zip.read(file_name))
-                    log.debug("Изображение извлечено: {extracted_path}", extracted_path=output_dir)
-                    break
+            member = find_image_member(ods_zip)
+            if member is None:
+                log.debug("В {ods_file_path} нет изображений.", ods_file_path=ods_file_path)
+                return None
+            with ods_zip.open(member) as source, tempfile.NamedTemporaryFile(
+                    "wb", dir=output_dir.parent, prefix=f".{output_dir.name}.", suffix=".tmp",
+                    delete=False) as image_file:
+                tmp_path = Path(image_file.name)
+                try:
+                    shutil.copyfileobj(source, image_file, COPY_CHUNK_SIZE)
+                except BaseException:
+                    image_file.close()
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+            tmp_path.replace(output_dir)
+            log.debug("Изображение извлечено: {extracted_path}", extracted_path=output_dir)
+            return output_dir
     except zipfile.BadZipFile as e:
         log.error("Ошибка: {ods_file_path} не является корректным ODS файлом.", ods_file_path=ods_file_path)
         log.exception(e)
+        return None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""Дисковый кэш отрисованных DXF чертежей с ограничением размера."""
+import os
+import json
+import time
+import tempfile
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+
+from logger_config import log
+
+INDEX_FILE_NAME = ".index.json"
+INDEX_VERSION = 1
+
+
+class RenderCache:
+    """Кэш отрисовок в каталоге static с вытеснением LRU по суммарному размеру файлов.
+
+    Ключ - имя файла отрисовки: хэш содержимого DXF и параметров отрисовки. Порядок использования
+    и размеры файлов хранятся в индексном файле каталога, поэтому после перезапуска приложения
+    вытесняются действительно давно не запрошенные чертежи, а каталог не приходится обходить.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        """Инициализация пустого кэша. Индекс читается в load."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()  # имя файла: (размер, время запроса)
+        self._total_bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # иначе старый снимок индекса может затереть новый
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @property
+    def index_path(self) -> Path:
+        """Путь к индексному файлу."""
+        return self.directory / INDEX_FILE_NAME
+
+    def load(self) -> int:
+        """Загрузка индекса. Файлы без записи в индексе и записи без файлов удаляются.
+
+        Возвращает количество отрисовок в кэше.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if index.get("version") != INDEX_VERSION:
+                index = {}
+        except FileNotFoundError:
+            index = {}
+        except (OSError, ValueError) as e:
+            log.error("Индекс кэша отрисовок {path} повреждён и будет пересоздан.", path=self.index_path)
+            log.exception(e)
+            index = {}
+
+        files = {file.name: file.stat().st_size for file in os.scandir(self.directory)
+                 if file.is_file() and file.name != INDEX_FILE_NAME}
+        entries = OrderedDict()
+        for file_name, (_, last_used) in sorted(index.get("entries", {}).items(), key=lambda item: item[1][1]):
+            if file_name in files:
+                entries[file_name] = (files.pop(file_name), last_used)
+        for file_name in files:  # недописанные и не учтённые в индексе отрисовки
+            (self.directory / file_name).unlink(missing_ok=True)
+        if files:
+            log.debug("Удалено файлов отрисовок без записи в индексе: {count}", count=len(files))
+
+        with self._lock:
+            self._entries = entries
+            self._total_bytes = sum(size for size, _ in entries.values())
+            self._dirty = True
+            evicted = self._evict()
+        self.save()
+        self._remove(evicted)
+        log.info("Загружен кэш отрисовок {directory}: {count} файлов, {size} байт.",
+                 directory=self.directory, count=len(entries), size=self._total_bytes)
+        return len(entries)
+
+    def get(self, file_name: str) -> Path | None:
+        """Путь к отрисовке или None, если её нет в кэше. Найденная отрисовка становится последней в LRU."""
+        path = self.directory / file_name
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is not None and path.exists():
+                self._entries[file_name] = (entry[0], time.time())
+                self._entries.move_to_end(file_name)
+                self._dirty = True
+                self.hits += 1
+                return path
+            if entry is not None:  # файл удалён в обход кэша
+                del self._entries[file_name]
+                self._total_bytes -= entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, file_name: str) -> None:
+        """Учёт новой отрисовки в каталоге кэша с вытеснением давно не запрошенных при превышении размера."""
+        size = (self.directory / file_name).stat().st_size
+        with self._lock:
+            previous = self._entries.pop(file_name, None)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._entries[file_name] = (size, time.time())
+            self._total_bytes += size
+            self._dirty = True
+            evicted = self._evict(keep=file_name)
+        self._remove(evicted)
+        self.save()
+
+    def _evict(self, keep: str | None = None) -> list[str]:
+        """Исключение из индекса давно не запрошенных отрисовок сверх max_bytes. Вызывается под блокировкой."""
+        evicted = []
+        for file_name in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if file_name == keep:
+                continue
+            size, _ = self._entries.pop(file_name)
+            self._total_bytes -= size
+            evicted.append(file_name)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _remove(self, file_names: list[str]) -> None:
+        """Удаление вытесненных файлов."""
+        for file_name in file_names:
+            (self.directory / file_name).unlink(missing_ok=True)
+        if file_names:
+            log.debug("Из кэша отрисовок вытеснено файлов: {count}", count=len(file_names))
+
+    def save(self) -> None:
+        """Запись индекса через временный файл, если он изменился."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                index = {"version": INDEX_VERSION,
+                         "entries": {file_name: list(entry) for file_name, entry in self._entries.items()}}
+                self._dirty = False
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f"{INDEX_FILE_NAME}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                    json.dump(index, tmp_file, ensure_ascii=False)
+                Path(tmp_name).replace(self.index_path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def stats(self) -> dict[str, int]:
+        """Статистика кэша."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evicted": self.evicted}